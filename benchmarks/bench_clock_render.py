@@ -0,0 +1,92 @@
+"""
+Бенчмарк отрисовки часов: Label со шрифтом DSEG7 против SegmentClock.
+
+Для каждого варианта N раз переключается двоеточие (как update_time в
+main.py раз в 0.5 с) и меняется размер окна. Замеряются:
+    cpu   - время обновления виджета (для Label - растеризация текстуры);
+    frame - отрисовка кадра до glFinish(), т.е. включая работу GPU.
+
+Нужен дисплей (окно OpenGL). Запуск из корня репозитория:
+    python benchmarks/bench_clock_render.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # Пути к шрифтам относительные
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.base import EventLoop
+from kivy.core.window import Window
+from kivy.graphics.opengl import glFinish
+
+from ui.base_clock import BaseClockLabel
+from ui.segment_clock import SegmentClock
+
+N = 200
+SIZES = ((1920, 1080), (1280, 720))
+
+
+def draw_frame():
+    """Отрисовывает кадр и ждет завершения работы GPU (без ожидания Clock)."""
+    Window.dispatch('on_draw')
+    glFinish()
+
+
+def measure(widget, update):
+    cpu = frame = 0.0
+    for _ in range(N):
+        started = time.perf_counter()
+        update()
+        cpu += time.perf_counter() - started
+        started = time.perf_counter()
+        draw_frame()
+        frame += time.perf_counter() - started
+    return cpu / N * 1000, frame / N * 1000
+
+
+def measure_resize(widget, update):
+    started = time.perf_counter()
+    for i in range(N // 10):
+        Window.size = SIZES[i % 2]
+        EventLoop.idle()  # Раскладка под новый размер
+        update()
+        draw_frame()
+    return (time.perf_counter() - started) / (N // 10) * 1000
+
+
+def main():
+    EventLoop.ensure_window()
+    Window.size = SIZES[0]
+
+    results = {}
+    for name, factory, update in (
+        ('label', BaseClockLabel, lambda w: w.toggle_colon_visibility),
+        ('segments', SegmentClock, lambda w: w.toggle_colon_visibility),
+    ):
+        widget = factory()
+        Window.add_widget(widget)
+        EventLoop.idle()  # Раскладка и первая отрисовка
+        draw_frame()
+        step = update(widget)
+        cpu, frame = measure(widget, step)
+        resize = measure_resize(widget, lambda: (getattr(widget, 'calculate_font_size', lambda: None)(),
+                                                 getattr(widget, 'texture_update', lambda: None)()))
+        Window.remove_widget(widget)
+        results[name] = (cpu, frame, resize)
+
+    print(f"{N} colon toggles at {SIZES[0][0]}x{SIZES[0][1]}")
+    print(f"{'':10} {'cpu ms':>10} {'frame ms':>10} {'resize ms':>10}")
+    for name, (cpu, frame, resize) in results.items():
+        print(f"{name:10} {cpu:10.3f} {frame:10.3f} {resize:10.3f}")
+    label, segments = results['label'], results['segments']
+    print(f"segments vs label: cpu {label[0] / max(segments[0], 1e-9):.1f}x, "
+          f"frame {label[1] / max(segments[1], 1e-9):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
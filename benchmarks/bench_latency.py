@@ -0,0 +1,64 @@
+"""
+Поведение приложения при разной задержке API (через tools/aladhan_stub_server.py).
+
+Для каждой задержки замеряются:
+    cold   - PrayerTimesManager.get_schedule без кэша (промах памяти и базы);
+    submit - время постановки того же запроса в DataWorker (столько стоит
+             главному потоку; должно быть ~0 при любой задержке);
+    month  - get_prayer_times_bulk за месяц.
+При задержке больше таймаута клиента (10 с) ответ не приходит: результат
+None и время около таймаута.
+
+Запуск из корня репозитория (по умолчанию 0, 0.5 и 10 с):
+    python benchmarks/bench_latency.py [задержка ...]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+logging.basicConfig(level=logging.CRITICAL)
+
+from data.data_worker import DataWorker, direct_dispatch
+from data.prayer_times import PrayerTimesManager
+from tools.aladhan_stub_server import StubServer
+
+LATENCIES = (0.0, 0.5, 10.0)
+
+
+def run(latency):
+    with tempfile.TemporaryDirectory() as tmp, StubServer(latency=latency) as server:
+        manager = PrayerTimesManager(db_path=Path(tmp) / 'prayer_times.db', base_url=server.url)
+
+        started = time.perf_counter()
+        schedule = manager.get_schedule('2024-11-22')
+        cold = time.perf_counter() - started
+
+        worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+        started = time.perf_counter()
+        future = worker.get_schedule('2024-11-23', callback=lambda result: None)
+        submit = time.perf_counter() - started
+        future.result()
+        worker.shutdown(wait=True)
+
+        started = time.perf_counter()
+        days = manager.api.get_prayer_times_bulk('2024-12-01', '2024-12-31')
+        month = time.perf_counter() - started
+    return {'cold': cold, 'ok': schedule is not None, 'submit': submit,
+            'month': month, 'days': len(days or {})}
+
+
+def main():
+    latencies = [float(arg) for arg in sys.argv[1:]] or LATENCIES
+    print(f"{'latency s':>10} {'cold ms':>10} {'result':>7} {'submit ms':>10} {'month ms':>10} {'days':>5}")
+    for latency in latencies:
+        r = run(latency)
+        print(f"{latency:10.1f} {r['cold'] * 1000:10.1f} {'ok' if r['ok'] else 'none':>7} "
+              f"{r['submit'] * 1000:10.3f} {r['month'] * 1000:10.1f} {r['days']:5d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Микробенчмарк SQLite: соединение на каждый вызов против долгоживущего.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_sqlite.py
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.connection import ThreadLocalConnection
+
+N = 2000
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+READ = "SELECT value FROM settings WHERE key = ?"
+WRITE = "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)"
+
+
+def per_call(path):
+    """Прежнее поведение: sqlite3.connect на каждый запрос."""
+    def connect():
+        return sqlite3.connect(path)
+    return connect
+
+
+def rate(fn, n=N):
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - started)
+
+
+def run(label, connect):
+    with connect() as conn:
+        conn.execute(SCHEMA)
+        conn.execute(WRITE, ('color', 'lime'))
+
+    def read(i):
+        with connect() as conn:
+            conn.execute(READ, ('color',)).fetchone()
+
+    def write(i):
+        with connect() as conn:
+            conn.execute(WRITE, ('color', str(i)))
+
+    reads, writes = rate(read), rate(write)
+    print(f"{label:<28} {reads:>12,.0f} reads/s {writes:>12,.0f} writes/s")
+    return reads, writes
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        old = run('per-call connection', per_call(str(Path(tmp) / 'old.db')))
+        pooled = ThreadLocalConnection(Path(tmp) / 'new.db')
+        new = run('persistent WAL connection', pooled)
+        pooled.close()
+    print(f"{'speedup':<28} {new[0] / old[0]:>12.1f}x {'':>6} {new[1] / old[1]:>12.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Бенчмарк холодного старта: импорт main, build() и время до первого кадра.
+
+Каждый запуск - отдельный процесс (холодные sys.modules) во временном
+каталоге со ссылками на fonts/ и audio/ и HOME там же, поэтому
+data/settings.db репозитория и каталог данных пользователя не затрагиваются. Процесс
+выходит сразу после первого on_flip окна. Печатаются медианы по N
+запускам, в миллисекундах от старта интерпретатора.
+
+Нужен дисплей (окно OpenGL). Запуск из корня репозитория:
+    python benchmarks/bench_startup.py [N]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+N = 5
+
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from kivy.clock import Clock
+from kivy.core.window import Window
+marks = {{'import': imported - started}}
+
+class BenchApp(main.ClockApp):
+    def build(self):
+        build_started = time.perf_counter()
+        layout = super().build()
+        marks['build'] = time.perf_counter() - build_started
+        Window.bind(on_flip=self.first_flip)
+        return layout
+
+    def first_flip(self, *args):
+        Window.unbind(on_flip=self.first_flip)
+        marks['first_frame'] = time.perf_counter() - started
+        marks['requests_loaded'] = 'requests' in sys.modules
+        Clock.schedule_once(lambda dt: self.stop(), 0)
+
+BenchApp().run()
+print('BENCH ' + json.dumps(marks))
+"""
+
+
+def run_once():
+    with tempfile.TemporaryDirectory() as cwd:
+        os.makedirs(os.path.join(cwd, 'data'))
+        for name in ('fonts', 'audio'):
+            os.symlink(ROOT / name, os.path.join(cwd, name))
+        env = dict(os.environ, HOME=cwd, KIVY_HOME=os.path.join(cwd, '.kivy'),
+                   KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+        # App.load_kv ищет .kv рядом с исходником класса, поэтому не -c
+        script = os.path.join(cwd, 'startup_child.py')
+        with open(script, 'w') as f:
+            f.write(CHILD.format(root=str(ROOT)))
+        result = subprocess.run([sys.executable, script],
+                                cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+    for line in result.stdout.splitlines():
+        if line.startswith('BENCH '):
+            return json.loads(line[len('BENCH '):])
+    raise RuntimeError(f"startup run failed ({result.returncode})")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    marks = [run_once() for _ in range(runs)]
+    print(f"cold start, median of {runs} runs")
+    for key in ('import', 'build', 'first_frame'):
+        print(f"{key:12} {statistics.median(m[key] for m in marks) * 1000:8.1f} ms")
+    print(f"requests imported before first frame: {any(m['requests_loaded'] for m in marks)}")
+
+
+if __name__ == '__main__':
+    main()
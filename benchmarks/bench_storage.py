@@ -0,0 +1,105 @@
+"""
+Бенчмарк схемы кэша: старая таблица prayer_times (TEXT + JSON)
+против компактной prayer_days (целые числа).
+
+Запуск из корня репозитория:
+    python benchmarks/bench_storage.py [дней]
+"""
+
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.prayer_times import PrayerTimesDB
+from logic.prayer_calc import PrayerTimesCalculator, TIMING_NAMES
+
+LEGACY_SCHEMA = """
+    CREATE TABLE prayer_times (
+        date TEXT PRIMARY KEY, gregorian_date TEXT, hijri_date TEXT, city TEXT, country TEXT,
+        midnight TEXT, fajr TEXT, sunrise TEXT, dhuhr TEXT, asr TEXT, maghrib TEXT, isha TEXT,
+        timestamp INTEGER
+    )
+"""
+
+
+def hijri_blob(day):
+    # Размер и структура как у ответа Aladhan
+    return {
+        'date': f"{day.day:02d}-{day.month:02d}-1446", 'format': 'DD-MM-YYYY', 'day': f"{day.day:02d}",
+        'weekday': {'en': "Al Juma'a", 'ar': 'الجمعة'},
+        'month': {'number': day.month, 'en': 'Jumādá al-ūlá', 'ar': 'جُمادى الأولى', 'days': 30},
+        'year': '1446', 'designation': {'abbreviated': 'AH', 'expanded': 'Anno Hegirae'},
+        'holidays': [], 'adjustedHolidays': [], 'method': 'HJCoSA',
+    }
+
+
+def build_legacy(path, days):
+    calc = PrayerTimesCalculator()
+    start = date(2020, 1, 1)
+    rows = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        payload = calc.get_prayer_times(day.isoformat())['data']
+        timings = payload['timings']
+        rows.append((day.isoformat(), json.dumps(payload['date']['gregorian']), json.dumps(hijri_blob(day)),
+                     'Baku', 'Azerbaijan', *(timings[n] for n in TIMING_NAMES), 0))
+    with sqlite3.connect(path) as conn:
+        conn.execute(LEGACY_SCHEMA)
+        conn.executemany(f"INSERT INTO prayer_times VALUES ({', '.join('?' * 13)})", rows)
+    return start, start + timedelta(days=days - 1)
+
+
+def legacy_read(path, start, end):
+    """Чтение диапазона так, как это делал старый PrayerTimesDB."""
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT * FROM prayer_times WHERE date BETWEEN ? AND ? ORDER BY date",
+                            (start.isoformat(), end.isoformat())).fetchall()
+    return {row[0]: {'gregorian': json.loads(row[1]), 'hijri': json.loads(row[2]),
+                     'meta': {'city': row[3], 'country': row[4]},
+                     'times': dict(zip(TIMING_NAMES, row[5:12])), 'timestamp': row[12]} for row in rows}
+
+
+def best_rate(fn, rows, repeats=5):
+    best = min(_timed(fn) for _ in range(repeats))
+    return rows / best
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(days=3650):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / 'legacy.db'
+        start, end = build_legacy(legacy, days)
+        compact = Path(tmp) / 'compact.db'
+        shutil.copy(legacy, compact)
+
+        old_size = legacy.stat().st_size
+        old_rate = best_rate(lambda: legacy_read(legacy, start, end), days)
+
+        db = PrayerTimesDB(compact)  # миграция + VACUUM
+        db.close()
+        db = PrayerTimesDB(compact)
+        new_size = compact.stat().st_size
+        assert len(db.get_prayer_times_range(start.isoformat(), end.isoformat())) == days
+        new_rate = best_rate(lambda: db.get_prayer_times_range(start.isoformat(), end.isoformat()), days)
+        db.close()
+
+    print(f"{days} cached days")
+    print(f"{'on-disk size':<16} {old_size / 1024:>10,.0f} KiB -> {new_size / 1024:>8,.0f} KiB "
+          f"({100 * (1 - new_size / old_size):.0f}% smaller)")
+    print(f"{'rows read/s':<16} {old_rate:>14,.0f} -> {new_rate:>12,.0f} ({new_rate / old_rate:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
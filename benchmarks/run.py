@@ -0,0 +1,304 @@
+"""
+Набор бенчмарков с сохраненной базовой линией и порогами регрессии.
+
+Работает без сети: данные дает локальный расчет, а загрузка диапазонов
+идет к tools/aladhan_stub_server.py на 127.0.0.1. Бенчмарк размера шрифта
+открывает окно Kivy (SDL2; на Linux без дисплея - offscreen/EGL).
+
+Для каждого бенчмарка выполняется прогрев и repeat замеров; в отчет
+идут медиана и лучшее время на операцию. Быстрые бенчмарки (run()
+короче MIN_SAMPLE) повторяются в одном замере столько раз, чтобы замер
+длился не меньше MIN_SAMPLE: замеры в сотни микросекунд слишком
+зависят от планировщика ОС и дают ложные регрессии. С benchmarks/baseline.json
+сравнивается лучшее время (оно меньше всего зависит от фоновой
+нагрузки), поправленное на скорость машины: перед каждым бенчмарком
+замеряется эталонный цикл на чистом Python. Если поправленное время
+больше базового больше чем в threshold раз, бенчмарк считается
+регрессией и код выхода - 1.
+
+Запуск из корня репозитория:
+    python benchmarks/run.py                    # все, сравнение с baseline
+    python benchmarks/run.py -k db. -r 3        # по подстроке имени
+    python benchmarks/run.py --update-baseline  # записать новую базовую линию
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+# Логи модулей приложения не нужны в отчете (и не должны влиять на замер)
+logging.basicConfig(level=logging.WARNING)
+
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+THRESHOLD = 2.0  # Допустимое замедление относительно базовой линии
+REPEAT = 5
+MIN_SAMPLE = 0.01  # Минимальная длительность одного замера, с
+
+BENCHMARKS = {}
+
+
+def benchmark(name, threshold=None):
+    """
+    Регистрирует бенчмарк.
+
+    Функция получает временный каталог, выполняет подготовку и возвращает
+    (run, ops): run() выполняет ops операций и замеряется целиком.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, threshold)
+        return setup
+    return register
+
+
+YEAR = [(date(2024, 1, 1) + timedelta(days=i)).isoformat() for i in range(366)]
+
+
+def year_schedules():
+    from logic.prayer_calc import PrayerTimesCalculator
+    calc = PrayerTimesCalculator()
+    return [calc.get_prayer_times(day) for day in YEAR]
+
+
+def filled_db(tmp):
+    from data.prayer_times import PrayerTimesDB
+    db = PrayerTimesDB(Path(tmp) / 'prayer_times.db')
+    db.save_prayer_times_bulk(year_schedules())
+    return db
+
+
+@benchmark('db.read')
+def bench_db_read(tmp):
+    db = filled_db(tmp)
+    return lambda: [db.get_prayer_times(day) for day in YEAR], len(YEAR)
+
+
+@benchmark('db.write_bulk')
+def bench_db_write(tmp):
+    from data.prayer_times import PrayerTimesDB
+    db = PrayerTimesDB(Path(tmp) / 'prayer_times.db')
+    payloads = year_schedules()
+    return lambda: db.save_prayer_times_bulk(payloads), len(payloads)
+
+
+def manager_with_db(tmp):
+    from data.prayer_times import PrayerTimesManager
+    filled_db(tmp).close()
+    # Параметры по умолчанию совпадают с PrayerTimesCalculator(): тот же отпечаток
+    return PrayerTimesManager(db_path=Path(tmp) / 'prayer_times.db')
+
+
+@benchmark('manager.hot')
+def bench_manager_hot(tmp):
+    manager = manager_with_db(tmp)
+    days = YEAR[:30]
+    for day in days:
+        manager.get_prayer_times(day)
+
+    def run():
+        for _ in range(10):
+            for day in days:
+                manager.get_prayer_times(day)
+    return run, 10 * len(days)
+
+
+@benchmark('manager.cold')
+def bench_manager_cold(tmp):
+    manager = manager_with_db(tmp)
+    days = YEAR[:100]
+
+    def run():
+        for day in days:
+            manager.cache.clear()
+            manager.get_prayer_times(day)
+    return run, len(days)
+
+
+@benchmark('manager.next_prayer')
+def bench_next_prayer(tmp):
+    from data.prayer_times import PrayerTimesManager
+    manager = PrayerTimesManager(source='local', db_path=Path(tmp) / 'prayer_times.db')
+    start = datetime(2024, 3, 1).timestamp()
+    manager.get_next_prayer(start)
+    # Шаг в минуту: как опрос раз в кадр/секунду, но с переходами через молитвы
+    return lambda: [manager.get_next_prayer(start + i * 60) for i in range(1000)], 1000
+
+
+@benchmark('export.csv')
+def bench_export_csv(tmp):
+    import io
+    from tools.export_timetable import export
+    manager = manager_with_db(tmp)
+
+    def run():
+        return export(manager, YEAR[0], YEAR[-1], 'csv', io.StringIO(newline=''))
+    return run, len(YEAR)
+
+
+@benchmark('format_gregorian_date')
+def bench_format_date(tmp):
+    from data.schedule import format_gregorian_date
+    return lambda: [format_gregorian_date('22-11-2024', 'Friday') for _ in range(1000)], 1000
+
+
+@benchmark('range_fetch.stub', threshold=3.0)
+def bench_range_fetch(tmp):
+    from data.prayer_times import PrayerTimesManager
+    from tools.aladhan_stub_server import StubServer
+    server = StubServer().start()
+    manager = PrayerTimesManager(db_path=Path(tmp) / 'prayer_times.db', base_url=server.url)
+
+    def run():
+        return manager.prefetch(YEAR[0], YEAR[-1], max_workers=3)
+    run.close = server.stop
+    return run, len(YEAR)
+
+
+@benchmark('ui.calculate_font_size')
+def bench_font_size(tmp):
+    os.chdir(ROOT)  # Путь к шрифту относительный
+    from kivy.base import EventLoop
+    from kivy.core.window import Window
+    from ui.base_clock import BaseClockLabel, fitted_font_size
+    EventLoop.ensure_window()
+    Window.size = (1280, 720)
+    label = BaseClockLabel()
+
+    def run():
+        # Без кэша: каждый раз подбор размера заново, как при новом размере окна
+        for _ in range(20):
+            fitted_font_size.cache_clear()
+            label.calculate_font_size()
+    return run, 20
+
+
+def calibrate(repeat=5):
+    """
+    Лучшее время эталонного цикла в микросекундах.
+
+    Отношение к значению из базовой линии показывает, насколько машина
+    сейчас быстрее или медленнее (частота CPU, соседи по хосту).
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        table = {}
+        for i in range(20000):
+            table[i % 97] = table.get(i % 97, 0) + i * 3 // 7
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1e6, 3)
+
+
+def measure(name, setup, repeat, min_sample=MIN_SAMPLE):
+    """
+    Returns:
+        dict: us_per_op (медиана), min_us_per_op, ops (операций в одном
+              замере), calibration_us
+    """
+    calibration = calibrate()
+    with tempfile.TemporaryDirectory() as tmp:
+        run, ops = setup(tmp)
+        try:
+            started = time.perf_counter()
+            run()  # Прогрев; по нему же выбирается число повторов в замере
+            elapsed = time.perf_counter() - started
+            loops = max(1, math.ceil(min_sample / elapsed)) if elapsed > 0 else 1
+            ops *= loops
+            times = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in range(loops):
+                    run()
+                times.append(time.perf_counter() - started)
+        finally:
+            getattr(run, 'close', lambda: None)()
+    return {
+        'us_per_op': round(statistics.median(times) / ops * 1e6, 3),
+        'min_us_per_op': round(min(times) / ops * 1e6, 3),
+        'ops': ops,
+        'calibration_us': calibration,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Сравнивает результаты с базовой линией.
+
+    Returns:
+        list: [(имя, отношение к базовой линии или None, регрессия ли)]
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            rows.append((name, None, False))
+            continue
+        limit = BENCHMARKS.get(name, (None, None))[1] or threshold
+        ratio = result['min_us_per_op'] / base['min_us_per_op']
+        if result.get('calibration_us') and base.get('calibration_us'):
+            ratio /= result['calibration_us'] / base['calibration_us']
+        rows.append((name, ratio, ratio > limit))
+    return rows
+
+
+def load_baseline(path=BASELINE):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='pattern', default='', help='Только бенчмарки, содержащие подстроку')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='Допустимое замедление, раз (по умолчанию %(default)s)')
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--json', help='Записать результаты в файл')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, (setup, _) in BENCHMARKS.items():
+        if args.pattern in name:
+            results[name] = measure(name, setup, args.repeat)
+
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline, args.threshold)
+    print(f"{'benchmark':26} {'us/op':>12} {'min':>12} {'vs base':>9}  (adjusted for machine speed)")
+    for name, ratio, regressed in rows:
+        result = results[name]
+        vs = f"{ratio:8.2f}x" if ratio is not None else f"{'new':>9}"
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{name:26} {result['us_per_op']:12.2f} {result['min_us_per_op']:12.2f} {vs}{flag}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        merged = dict(baseline.get('benchmarks', {}), **results)
+        Path(args.baseline).write_text(json.dumps({
+            'machine': f"{platform.machine()} {platform.system()} Python {platform.python_version()}",
+            'benchmarks': dict(sorted(merged.items())),
+        }, indent=2) + '\n')
+        print(f"baseline written to {args.baseline}")
+        return 0
+    return 1 if any(regressed for _, _, regressed in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
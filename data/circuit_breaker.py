@@ -0,0 +1,112 @@
+"""
+Circuit Breaker Module для MihrEzan.
+Автомат защиты для запросов к API: при недоступной сети не ждать таймаут каждый раз.
+
+    closed    - запросы идут как обычно, сбои подряд считаются;
+    open      - после failure_threshold сбоев подряд запросы сразу
+                отклоняются до retry_at;
+    half_open - по истечении паузы пропускается один пробный запрос:
+                успех закрывает автомат, сбой снова открывает его.
+
+Пауза растет экспоненциально с каждым открытием подряд (base_delay,
+2 * base_delay, ... до max_delay) и случайно укорачивается до jitter
+своей длины, чтобы устройства не стучались в API одновременно.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from logic.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics()
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Attributes:
+        name (str): Имя для логов и метрик ('api' -> api.breaker.*)
+        state (str): closed, open или half_open
+        failures (int): Сбоев подряд
+        opens (int): Открытий подряд (определяет длину паузы)
+        retry_at (float): Когда пропустить пробный запрос (по clock)
+    """
+
+    def __init__(self, name='api', failure_threshold=3, base_delay=5.0, max_delay=600.0,
+                 jitter=0.5, clock=time.monotonic, rng=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.clock = clock
+        self.random = rng or random.Random()
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.retry_at = None
+        self._lock = threading.Lock()
+        metrics.set_gauge(f'{self.name}.breaker.state', STATE_CODES[CLOSED])
+
+    @property
+    def is_open(self):
+        """Связи нет: автомат открыт или ждет результата пробного запроса."""
+        return self.state != CLOSED
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.set_gauge(f'{self.name}.breaker.state', STATE_CODES[state])
+
+    def allow(self):
+        """
+        Можно ли выполнить запрос сейчас.
+
+        Returns:
+            bool: False - запрос нужно отклонить без обращения к сети
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.retry_at:
+                self._set_state(HALF_OPEN)
+                logger.info(f"{self.name} circuit half-open, probing")
+                return True
+        metrics.inc(f'{self.name}.breaker.rejected')
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed, connection restored")
+                metrics.inc(f'{self.name}.breaker.closed')
+            self._set_state(CLOSED)
+            self.failures = 0
+            self.opens = 0
+            self.retry_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.opens += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.opens - 1))
+        delay *= 1 - self.jitter * self.random.random()
+        self.retry_at = self.clock() + delay
+        self._set_state(OPEN)
+        metrics.inc(f'{self.name}.breaker.opened')
+        logger.warning(f"{self.name} circuit open after {self.failures} failures, "
+                       f"next attempt in {delay:.1f}s")
+
+    def seconds_until_retry(self):
+        """Сколько осталось до пробного запроса (0, если автомат закрыт)."""
+        if self.state == CLOSED or self.retry_at is None:
+            return 0.0
+        return max(self.retry_at - self.clock(), 0.0)
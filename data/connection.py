@@ -0,0 +1,56 @@
+"""
+Connection Module для MihrEzan.
+Долгоживущие соединения SQLite: одно на поток и файл базы.
+
+Открытие соединения на каждый запрос стоит дороже самого запроса.
+Соединение открывается один раз, переводится в режим WAL и
+переиспользует кэш подготовленных выражений sqlite3.
+"""
+
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    """
+    Фабрика соединений: по одному долгоживущему соединению на поток.
+
+    Объект можно использовать вместо sqlite3.connect(path): вызов
+    возвращает соединение текущего потока, а `with conn:` фиксирует или
+    откатывает транзакцию, не закрывая соединение.
+
+    Attributes:
+        db_path (str): Путь к файлу базы данных
+        synchronous (str): Уровень PRAGMA synchronous (NORMAL достаточно для WAL)
+    """
+
+    CACHED_STATEMENTS = 64  # Подготовленные выражения на соединение
+
+    def __init__(self, db_path, synchronous='NORMAL'):
+        self.db_path = str(db_path)
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def __call__(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Соединение используется только своим потоком; проверка потока
+            # отключена лишь для того, чтобы close() мог закрыть все сразу
+            conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Закрывает соединения всех потоков."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,113 @@
+"""
+Data Worker Module для MihrEzan.
+Фоновый поток, которому принадлежит весь доступ к SQLite и HTTP.
+
+Главный поток Kivy только ставит задачи и получает результат через
+callback, который доставляется обратно в главный поток через
+Clock.schedule_once. Поэтому промах кэша и медленный API больше не
+останавливают отрисовку часов.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def kivy_dispatch(callback, result):
+    """Передает результат в главный поток Kivy на следующем кадре."""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(result))
+
+
+def direct_dispatch(callback, result):
+    """Вызывает callback сразу в рабочем потоке (без Kivy, для тестов и CLI)."""
+    callback(result)
+
+
+class DataWorker:
+    """
+    Однопоточный исполнитель запросов к PrayerTimesManager.
+
+    Менеджер создается лениво уже внутри рабочего потока, поэтому все его
+    соединения с базой и HTTP-сессия принадлежат только этому потоку.
+
+    Attributes:
+        manager_factory: Функция без аргументов, создающая менеджер
+        dispatch: Функция (callback, result) доставки результата
+    """
+
+    def __init__(self, manager_factory=None, dispatch=kivy_dispatch):
+        if manager_factory is None:
+            from data.prayer_times import PrayerTimesManager
+            manager_factory = PrayerTimesManager
+        self.manager_factory = manager_factory
+        self.dispatch = dispatch
+        self._manager = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mihrezan-data')
+
+    def _get_manager(self):
+        """Возвращает менеджер; вызывается только из рабочего потока."""
+        if self._manager is None:
+            self._manager = self.manager_factory()
+        return self._manager
+
+    def call(self, method, *args, callback=None, **kwargs):
+        """
+        Ставит вызов метода менеджера в очередь рабочего потока.
+
+        Args:
+            method (str): Имя метода PrayerTimesManager
+            callback (callable, optional): Получит результат через dispatch
+
+        Returns:
+            concurrent.futures.Future: Результат вызова
+        """
+        future = self._executor.submit(lambda: getattr(self._get_manager(), method)(*args, **kwargs))
+        if callback is not None:
+            future.add_done_callback(lambda f: self._deliver(method, callback, f))
+        return future
+
+    def _deliver(self, method, callback, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Background call {method} failed: {error}")
+            return
+        self.dispatch(callback, future.result())
+
+    def get_prayer_times(self, date=None, callback=None):
+        """Асинхронный PrayerTimesManager.get_prayer_times."""
+        return self.call('get_prayer_times', date, callback=callback)
+
+    def get_schedule(self, date=None, callback=None):
+        """Асинхронный PrayerTimesManager.get_schedule."""
+        return self.call('get_schedule', date, callback=callback)
+
+    def shutdown(self, wait=False):
+        """Останавливает поток, отменяя еще не начатые задачи."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_data_worker():
+    """Возвращает общий для приложения DataWorker."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = DataWorker()
+        return _worker
+
+
+def shutdown_data_worker():
+    """Останавливает общий DataWorker (при выходе из приложения)."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.shutdown()
+            _worker = None
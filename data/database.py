@@ -1,17 +1,72 @@
 # data/database.py
-from pathlib import Path
+"""
+Settings Database Module для MihrEzan.
+Настройки приложения: словарь в памяти с отложенной записью в SQLite.
+
+Все значения читаются из файла один раз при создании, поэтому
+get_setting - поиск в словаре, без обращения к SQLite. save_setting
+меняет словарь сразу, а в базу изменения уходят из фонового потока
+через write_delay секунд одной транзакцией; повторные записи одного
+ключа за это время объединяются. flush() записывает оставшееся
+немедленно - при выходе из приложения и через atexit.
+
+Кто зависит от настроек, подписывается через add_listener и узнает об
+изменении ключа сразу после save_setting, не дожидаясь записи в файл.
+"""
+
+import atexit
+import logging
 import sqlite3
+import threading
+from pathlib import Path
+
+from data.connection import ThreadLocalConnection
+from data.paths import user_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Прежнее расположение (относительно каталога запуска); переносится при первом старте
+LEGACY_DB_PATH = Path(__file__).resolve().parent / 'settings.db'
+
 
 class SettingsDatabase:
-    def __init__(self):
-        # Создаем директорию data если её нет
-        Path("data").mkdir(exist_ok=True)
-        self.db_path = "data/settings.db"
+    """
+    Хранилище настроек.
+
+    Attributes:
+        db_path (str): Путь к файлу базы данных
+        write_delay (float): Задержка фоновой записи, с (за это время записи объединяются)
+        writes (int): Количество выполненных транзакций записи
+    """
+
+    WRITE_DELAY = 0.5
+
+    def __init__(self, db_path=None, write_delay=WRITE_DELAY, legacy_path=LEGACY_DB_PATH):
+        if db_path is None:
+            db_path = user_data_dir() / 'settings.db'
+        db_path = Path(db_path)
+        is_new = not db_path.exists()
+        # Создаем директорию базы, если её нет
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(db_path)
+        self.write_delay = write_delay
+        self.writes = 0
+        self._connect = ThreadLocalConnection(self.db_path)
+        self._pending = {}
+        self._closed = False
+        self._writer = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._listeners = []
+
         self.init_database()
-    
+        if is_new and legacy_path is not None and Path(legacy_path).exists():
+            self._import_legacy(legacy_path)
+        self._values = self._load()
+
     def init_database(self):
         """Инициализация базы данных"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS settings (
@@ -19,29 +74,121 @@ class SettingsDatabase:
                     value TEXT NOT NULL
                 )
             """)
-            
+
             # Вставляем значение по умолчанию для цвета, если его нет
             cursor.execute("""
-                INSERT OR IGNORE INTO settings (key, value) 
+                INSERT OR IGNORE INTO settings (key, value)
                 VALUES ('color', 'lime')
             """)
             conn.commit()
-    
+
+    def _import_legacy(self, legacy_path):
+        """Переносит настройки из прежнего файла data/settings.db"""
+        try:
+            legacy = sqlite3.connect(f"file:{Path(legacy_path).resolve()}?mode=ro", uri=True)
+            try:
+                rows = legacy.execute("SELECT key, value FROM settings").fetchall()
+            finally:
+                legacy.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Unable to import legacy settings from {legacy_path}: {e}")
+            return
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", rows)
+        logger.info(f"Imported {len(rows)} settings from {legacy_path}")
+
+    def _load(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT key, value FROM settings"))
+
     def get_setting(self, key):
         """Получение значения настройки"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-            result = cursor.fetchone()
-            return result[0] if result else None
-    
+        return self._values.get(key)
+
     def save_setting(self, key, value):
-        """Сохранение значения настройки"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO settings (key, value) 
-                VALUES (?, ?)
-            """, (key, value))
-            conn.commit()
+        """Сохранение значения настройки (в файл - в фоне, с задержкой)"""
+        changed = self._values.get(key) != value
+        self._values[key] = value
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SettingsDatabase is closed")
+            self._pending[key] = value
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_behind, daemon=True,
+                                                name='mihrezan-settings')
+                self._writer.start()
+            self._condition.notify()
+        if changed:
+            for callback in list(self._listeners):
+                callback(key, value)
+
+    def add_listener(self, callback):
+        """Подписка на изменения настроек: callback(key, value) в потоке save_setting"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _write_behind(self):
+        """Фоновый поток: ждет изменений, выжидает write_delay и пишет их разом"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Изменения, пришедшие за время ожидания, попадут в ту же транзакцию
+                self._condition.wait_for(lambda: self._closed, self.write_delay)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Немедленно записывает отложенные изменения"""
+        with self._flush_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                with self._connect() as conn:
+                    conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                     pending.items())
+                self.writes += 1
+            except sqlite3.Error as e:
+                logger.error(f"Error saving settings: {e}")
+                with self._condition:
+                    # Более поздние значения тех же ключей важнее
+                    self._pending = {**pending, **self._pending}
+
+    def close(self):
+        """Записывает отложенные изменения и закрывает соединения с базой данных"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+        self._connect.close()
+
+
+_settings_db = None
+_settings_lock = threading.Lock()
+
+def get_settings_database():
+    """Общий для приложения экземпляр SettingsDatabase (загружается один раз)"""
+    global _settings_db
+    with _settings_lock:
+        if _settings_db is None:
+            _settings_db = SettingsDatabase()
+            atexit.register(_settings_db.close)
+        return _settings_db
+
 
+def flush_settings():
+    """Записывает отложенные изменения общего экземпляра (при выходе из приложения)"""
+    if _settings_db is not None:
+        _settings_db.flush()
@@ -0,0 +1,38 @@
+"""
+Paths Module для MihrEzan.
+Каталог пользовательских данных, не зависящий от текущего каталога.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = 'MihrEzan'
+
+
+def user_data_dir():
+    """
+    Каталог данных приложения для текущей платформы.
+
+    MIHREZAN_DATA_DIR переопределяет выбор (тесты, переносная установка).
+    На Android это приватный каталог приложения, на Windows - %APPDATA%,
+    на macOS - ~/Library/Application Support, иначе $XDG_DATA_HOME
+    (по умолчанию ~/.local/share).
+
+    Returns:
+        Path: Каталог (может еще не существовать)
+    """
+    override = os.environ.get('MIHREZAN_DATA_DIR')
+    if override:
+        return Path(override)
+    # python-for-android выставляет ANDROID_PRIVATE для приватных файлов приложения
+    android = os.environ.get('ANDROID_PRIVATE')
+    if android:
+        return Path(android)
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA')
+        return Path(base) / APP_NAME if base else Path.home() / 'AppData' / 'Roaming' / APP_NAME
+    if sys.platform == 'darwin':
+        return Path.home() / 'Library' / 'Application Support' / APP_NAME
+    base = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+    return Path(base) / APP_NAME.lower()
@@ -4,15 +4,38 @@ Prayer Times Module для MihrEzan.
 """
 
 import json
-import sqlite3
+import time
 import logging
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_cls, datetime, timedelta
+import sqlite3
 import requests
 from pathlib import Path
 
+from logic.prayer_calc import PrayerTimesCalculator, TIMING_NAMES, calculation_fingerprint, format_tune
+from data.schedule import (
+    HHMM, DaySchedule, ScheduleCache, day_from_number, day_number, hhmm_to_minutes,
+    normalize_date, pack_hijri, unpack_hijri,
+)
+# Форматирование дат живет в data.schedule (без requests), но доступно и отсюда
+from data.schedule import format_gregorian_date, format_hijri_date
+from data.connection import ThreadLocalConnection
+from data.paths import user_data_dir
+from data.transport import make_transport
+from data.circuit_breaker import CircuitBreaker
+from logic.prayer_index import PrayerIndex
+from logic.metrics import RateLimitedLogger, get_metrics, lazy_json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Сообщения горячих путей: не чаще раза в минуту на шаблон
+throttled_logger = RateLimitedLogger(logger)
+metrics = get_metrics()
+
+# Прежнее расположение базы; переносится в user_data_dir() при первом старте
+LEGACY_DB_PATH = Path.home() / '.mihrezan' / 'prayer_times.db'
 
 # Полные названия времен молитв для портретной ориентации
 PRAYER_NAMES_PORTRAIT = {
@@ -50,6 +73,30 @@ PRAYER_NAMES_LANDSCAPE_EN = {
 # Для обратной совместимости
 PRAYER_NAMES_LANDSCAPE = PRAYER_NAMES_LANDSCAPE_AZ
 
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Запрос не выполнялся: автомат защиты открыт (сети нет)."""
+
+
+def api_fingerprint_params(city="Baku", country="Azerbaijan", method=13, school=0,
+                           midnight_mode=0, tune=None):
+    """
+    Параметры запроса к API в нормализованном виде для ключа кэша.
+    
+    Не создает клиента API, поэтому годится и для слоя хранения.
+    """
+    return {
+        'city': city.strip().lower(),
+        'country': country.strip().lower(),
+        'method': method,
+        'adjustment': 0,
+        'tune': format_tune(tune),
+        'school': school,
+        'midnightMode': midnight_mode,
+        'timezonestring': 'auto',
+    }
+
+
 class PrayerTimesAPI:
     """
     Класс для работы с API Aladhan.
@@ -58,15 +105,84 @@ class PrayerTimesAPI:
         BASE_URL (str): Базовый URL API
         city (str): Город для получения времен молитв
         country (str): Страна для получения времен молитв
-        method (int): Метод расчета времен молитв (13 для Университета Исламских Наук, Карачи)
+        method (int): Метод расчета времен молитв (13 - Diyanet İşleri Başkanlığı, Турция)
+        transport: HTTP-транспорт (data.transport): живой, запись или воспроизведение
+        breaker (CircuitBreaker): Автомат защиты: без сети запросы отклоняются сразу
     """
     
+    is_local = False
     BASE_URL = "http://api.aladhan.com/v1"
+    MAX_WORKERS = 4  # Не более стольких одновременных запросов к API
+    TIMEOUT = 10  # Таймаут запроса, с
+    
+    REQUIRED_TIMINGS = ['Midnight', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
     
-    def __init__(self, city="Baku", country="Azerbaijan", method=13):
+    def __init__(self, city="Baku", country="Azerbaijan", method=13, school=0,
+                 midnight_mode=0, tune=None, base_url=None, transport=None, breaker=None):
         self.city = city
         self.country = country
         self.method = method
+        self.school = school
+        self.midnight_mode = midnight_mode
+        self.tune = format_tune(tune)
+        self.base_url = base_url or self.BASE_URL
+        self.transport = transport or make_transport(pool_maxsize=self.MAX_WORKERS)
+        self.breaker = breaker or CircuitBreaker('api')
+        self.timeout = self.TIMEOUT
+        self.last_bulk_stats = None
+    
+    def _get_json(self, endpoint, params):
+        """
+        Запрос к API через автомат защиты.
+        
+        Сбои сети, таймауты и ответы 5xx открывают автомат; ответы 4xx
+        (например, неизвестный город) означают, что связь есть.
+        
+        Raises:
+            CircuitOpenError: Автомат открыт, запрос не выполнялся
+            requests.exceptions.RequestException: При ошибке сети или HTTP
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"API unavailable, next attempt in {self.breaker.seconds_until_retry():.0f}s")
+        try:
+            with metrics.timer('http.request'):
+                data = self.transport.get_json(f"{self.base_url}/{endpoint}", params, timeout=self.timeout)
+        except requests.exceptions.HTTPError as e:
+            if 400 <= getattr(e, 'status', 500) < 500:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        except ValueError:
+            self.breaker.record_success()  # Ответ получен, но не разобран: связь есть
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+    
+    def _calculation_params(self):
+        """Параметры расчета, общие для всех эндпоинтов."""
+        return {
+            'city': self.city,
+            'country': self.country,
+            'method': self.method,
+            'adjustment': 0,  # Без корректировки времени
+            'tune': self.tune,  # Смещения в минутах (Imsak,Fajr,...,Midnight)
+            'school': self.school,  # 0 - стандартный Asr, 1 - Ханафи
+            'midnightMode': self.midnight_mode,  # 0 - стандартная полночь, 1 - Джафари
+        }
+    
+    def fingerprint_params(self):
+        """Параметры расчета в нормализованном виде для ключа кэша."""
+        return api_fingerprint_params(self.city, self.country, self.method, self.school,
+                                      self.midnight_mode, self.tune)
+    
+    @property
+    def fingerprint(self):
+        """Отпечаток всех параметров запроса: ключ кэшированных расписаний."""
+        return calculation_fingerprint(self.fingerprint_params())
         
     def get_prayer_times(self, date=None):
         """
@@ -82,27 +198,15 @@ class PrayerTimesAPI:
             if date is None:
                 date = datetime.now().strftime('%Y-%m-%d')
                 
-            params = {
-                'city': self.city,
-                'country': self.country,
-                'method': self.method,
-                'date': date,
-                'adjustment': 0,  # Без корректировки времени
-                'tune': '0,0,0,0,0,0,0,0',  # Без тонкой настройки
-                'school': 0,  # Стандартный метод для Asr
-                'midnightMode': 0,  # Стандартный метод для полуночи
-                'timezonestring': 'auto'  # Автоопределение временной зоны
-            }
-            
-            logger.info(f"Fetching prayer times for {date} from Aladhan API")
-            logger.debug(f"API Parameters: {params}")
-            
-            response = requests.get(f"{self.BASE_URL}/timingsByCity", params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.info("API Response Data:")
-            logger.info(json.dumps(data, indent=2))
+            params = self._calculation_params()
+            params['date'] = date
+            params['timezonestring'] = 'auto'  # Автоопределение временной зоны
+            
+            logger.info("Fetching prayer times for %s from Aladhan API", date)
+            logger.debug("API Parameters: %s", params)
+            
+            data = self._get_json('timingsByCity', params)
+            logger.debug("API Response Data: %s", lazy_json(data))
             
             # Проверяем успешность запроса
             if data.get('code') != 200:
@@ -114,8 +218,7 @@ class PrayerTimesAPI:
                 logger.error("No data received from API")
                 return None
                 
-            required_timings = ['Midnight', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
-            if not all(timing in data['data']['timings'] for timing in required_timings):
+            if not all(timing in data['data']['timings'] for timing in self.REQUIRED_TIMINGS):
                 logger.error("Missing required prayer times in API response")
                 return None
                 
@@ -125,10 +228,15 @@ class PrayerTimesAPI:
             
             return data
             
+        except CircuitOpenError as e:
+            throttled_logger.info("Skipping API request: %s", e)
+            return None
         except requests.exceptions.RequestException as e:
+            metrics.inc('http.error')
             logger.error(f"API request failed: {e}")
             return None
         except (ValueError, KeyError) as e:
+            metrics.inc('http.error')
             logger.error(f"Error parsing API response: {e}")
             return None
             
@@ -160,95 +268,371 @@ class PrayerTimesAPI:
         except ValueError as e:
             logger.error(f"Invalid date format: {e}")
             return None
+    
+    def get_month(self, year, month):
+        """
+        Получает времена молитв за месяц одним запросом к calendarByCity.
+        
+        Args:
+            year (int): Год
+            month (int): Месяц (1-12)
+            
+        Returns:
+            list: Данные по дням в формате ответа timingsByCity
+            
+        Raises:
+            requests.exceptions.RequestException: При ошибке сети (CircuitOpenError - без сети)
+            ValueError: При некорректном ответе API
+        """
+        data = self._get_json(f"calendarByCity/{year}/{month}", self._calculation_params())
+        if data.get('code') != 200 or not isinstance(data.get('data'), list):
+            raise ValueError(f"API returned error code: {data.get('code')}, status: {data.get('status')}")
+        
+        days = []
+        for day in data['data']:
+            # В календаре время приходит с суффиксом зоны: '05:59 (+04)'
+            timings = {name: value.split(' ')[0] for name, value in day['timings'].items()}
+            if not all(timing in timings for timing in self.REQUIRED_TIMINGS):
+                raise ValueError("Missing required prayer times in API response")
+            days.append({
+                'code': 200,
+                'status': 'OK',
+                'data': {'timings': timings, 'date': day['date'], 'meta': day['meta']}
+            })
+        return days
+    
+    def get_prayer_times_bulk(self, start_date, end_date, max_workers=None):
+        """
+        Получает времена молитв для диапазона дат помесячными запросами.
+        
+        Месяцы запрашиваются параллельно через пул из max_workers потоков
+        по общей keep-alive сессии. Статистика последнего вызова (дни,
+        запросы, время, дней в секунду) сохраняется в last_bulk_stats.
+        
+        Args:
+            start_date (str): Начальная дата в формате YYYY-MM-DD
+            end_date (str): Конечная дата в формате YYYY-MM-DD
+            max_workers (int, optional): Размер пула. По умолчанию MAX_WORKERS.
+            
+        Returns:
+            dict: Словарь с временами молитв для каждой даты (YYYY-MM-DD)
+                  или None при некорректных датах
+        """
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError as e:
+            logger.error(f"Invalid date format: {e}")
+            return None
+        
+        months = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            months.append((year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        
+        def fetch(year_month):
+            try:
+                return self.get_month(*year_month)
+            except CircuitOpenError:
+                return []
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                logger.error(f"Failed to fetch {year_month[0]}-{year_month[1]:02d}: {e}")
+                return []
+        
+        started = time.perf_counter()
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers or self.MAX_WORKERS) as pool:
+            for days in pool.map(fetch, months):
+                for day in days:
+                    day_date = datetime.strptime(day['data']['date']['gregorian']['date'], '%d-%m-%Y').date()
+                    if start <= day_date <= end:
+                        results[day_date.isoformat()] = day
+        elapsed = time.perf_counter() - started
+        
+        self.last_bulk_stats = {
+            'days': len(results),
+            'requests': len(months),
+            'seconds': elapsed,
+            'days_per_second': len(results) / elapsed if elapsed > 0 else float('inf'),
+        }
+        logger.info(f"Fetched {len(results)} days in {len(months)} requests, "
+                    f"{elapsed:.2f}s ({self.last_bulk_stats['days_per_second']:.1f} days/s)")
+        return results
 
 class PrayerTimesDB:
     """
     Класс для работы с базой данных времен молитв.
     
+    Расписания хранятся по отпечатку параметров расчета (город, метод,
+    school, tune, midnightMode и т.д.), поэтому данные для разных
+    мест и методов живут рядом и не подменяют друг друга.
+    
     Attributes:
         db_path (Path): Путь к файлу базы данных
+        config_id (int): Идентификатор текущей конфигурации расчета
     """
     
-    def __init__(self, db_path=None):
+    SCHEMA_VERSION = 3
+    
+    def __init__(self, db_path=None, legacy_path=LEGACY_DB_PATH):
         if db_path is None:
-            db_path = Path.home() / '.mihrezan' / 'prayer_times.db'
+            db_path = user_data_dir() / 'prayer_times.db'
         
-        self.db_path = db_path
+        self.db_path = Path(db_path)
+        is_new = not self.db_path.exists()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if is_new and legacy_path is not None and Path(legacy_path).exists():
+            self._import_legacy(legacy_path)
+        self._connect = ThreadLocalConnection(self.db_path)
+        self._config_ids = {}
+        self.config_id = None
         
         self._init_db()
+        self.select_config(*self._default_config())
+    
+    def close(self):
+        """Закрывает соединения с базой данных."""
+        self._connect.close()
+    
+    def _import_legacy(self, legacy_path):
+        """Копирует базу из прежнего расположения ~/.mihrezan (схема обновляется в _init_db)."""
+        try:
+            legacy = sqlite3.connect(f"file:{Path(legacy_path).resolve()}?mode=ro", uri=True)
+            try:
+                target = sqlite3.connect(self.db_path)
+                try:
+                    legacy.backup(target)
+                finally:
+                    target.close()
+            finally:
+                legacy.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Unable to import legacy prayer times from {legacy_path}: {e}")
+            self.db_path.unlink(missing_ok=True)
+            return
+        logger.info(f"Imported prayer times database from {legacy_path}")
+    
+    @staticmethod
+    def _default_config():
+        """Конфигурация по умолчанию: ей принадлежат данные старых версий."""
+        params = api_fingerprint_params()
+        return calculation_fingerprint(params), params
     
     def _init_db(self):
-        """Инициализирует структуру базы данных."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Инициализирует структуру базы данных и переносит старые данные."""
+        with self._connect() as conn:
             cursor = conn.cursor()
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            if version == 2:
+                # Версия 2 хранила дни без конфигурации расчета
+                cursor.execute('ALTER TABLE prayer_days RENAME TO prayer_days_v2')
             
-            # Таблица для кэширования времен молитв
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS prayer_times (
-                    date TEXT PRIMARY KEY,
-                    gregorian_date TEXT,
-                    hijri_date TEXT,
-                    city TEXT,
-                    country TEXT,
-                    midnight TEXT,
-                    fajr TEXT,
-                    sunrise TEXT,
-                    dhuhr TEXT,
-                    asr TEXT,
-                    maghrib TEXT,
-                    isha TEXT,
-                    timestamp INTEGER
+                CREATE TABLE IF NOT EXISTS configs (
+                    id INTEGER PRIMARY KEY,
+                    fingerprint TEXT NOT NULL UNIQUE,
+                    params TEXT NOT NULL
                 )
             ''')
             
+            # Компактная таблица: дата - номер дня от 1970-01-01, времена -
+            # минуты от полуночи, хиджра - упакованное целое (см. pack_hijri).
+            # WITHOUT ROWID хранит строки прямо в первичном ключе, поэтому
+            # индекс (config, day) покрывает все столбцы и поиск не ходит в таблицу.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS prayer_days (
+                    config INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    midnight INTEGER NOT NULL,
+                    fajr INTEGER NOT NULL,
+                    sunrise INTEGER NOT NULL,
+                    dhuhr INTEGER NOT NULL,
+                    asr INTEGER NOT NULL,
+                    maghrib INTEGER NOT NULL,
+                    isha INTEGER NOT NULL,
+                    hijri INTEGER,
+                    fetched INTEGER NOT NULL,
+                    PRIMARY KEY (config, day)
+                ) WITHOUT ROWID
+            ''')
+            
+            migrated = False
+            if version < self.SCHEMA_VERSION:
+                config = self._config_id(cursor, *self._default_config())
+                migrated = self._migrate_v2(cursor, config) | self._migrate_legacy(cursor, config)
+            cursor.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
             conn.commit()
+        
+        if migrated:
+            with self._connect() as conn:
+                conn.execute('VACUUM')  # Возвращаем место, занятое старой таблицей
+    
+    @staticmethod
+    def _table_exists(cursor, name):
+        return cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+    
+    def _migrate_v2(self, cursor, config):
+        """Переносит дни из таблицы версии 2 в конфигурацию по умолчанию."""
+        if not self._table_exists(cursor, 'prayer_days_v2'):
+            return False
+        cursor.execute('''
+            INSERT OR REPLACE INTO prayer_days
+            SELECT ?, day, midnight, fajr, sunrise, dhuhr, asr, maghrib, isha, hijri, fetched
+            FROM prayer_days_v2
+        ''', (config,))
+        cursor.execute('DROP TABLE prayer_days_v2')
+        return True
+    
+    def _migrate_legacy(self, cursor, config):
+        """
+        Переносит строки из таблицы prayer_times (TEXT + JSON) в prayer_days.
+        
+        Returns:
+            bool: True если старая таблица была найдена и удалена
+        """
+        if not self._table_exists(cursor, 'prayer_times'):
+            return False
+        
+        rows = []
+        for row in cursor.execute('''
+            SELECT date, hijri_date, midnight, fajr, sunrise, dhuhr, asr, maghrib, isha, timestamp
+            FROM prayer_times
+        '''):
+            try:
+                # Старые версии сохраняли строки под датой API 'DD-MM-YYYY'
+                day = day_number(normalize_date(row[0]))
+                timings = [hhmm_to_minutes(value) for value in row[2:9]]
+                hijri = pack_hijri(json.loads(row[1])) if row[1] else None
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                logger.warning(f"Skipping legacy row {row[0]}: {e}")
+                continue
+            rows.append((config, day, *timings, hijri, row[9] or 0))
+        
+        cursor.executemany(self.INSERT_SQL, rows)
+        cursor.execute('DROP TABLE prayer_times')
+        logger.info(f"Migrated {len(rows)} cached days to compact schema")
+        return True
+    
+    @staticmethod
+    def _config_id(cursor, fingerprint, params):
+        cursor.execute('INSERT OR IGNORE INTO configs (fingerprint, params) VALUES (?, ?)',
+                       (fingerprint, json.dumps(params, sort_keys=True, ensure_ascii=False)))
+        return cursor.execute('SELECT id FROM configs WHERE fingerprint = ?', (fingerprint,)).fetchone()[0]
+    
+    def select_config(self, fingerprint, params):
+        """
+        Делает конфигурацию расчета текущей для всех чтений и записей.
+        
+        Args:
+            fingerprint (str): Отпечаток параметров (PrayerTimesAPI.fingerprint)
+            params (dict): Сами параметры (сохраняются для справки)
+            
+        Returns:
+            int: Идентификатор конфигурации
+        """
+        config = self._config_ids.get(fingerprint)
+        if config is None:
+            with self._connect() as conn:
+                config = self._config_id(conn.cursor(), fingerprint, params)
+                conn.commit()
+            self._config_ids[fingerprint] = config
+        self.config_id = config
+        return config
+    
+    def cached_configs(self):
+        """
+        Возвращает конфигурации, для которых в базе есть расписания.
+        
+        Returns:
+            dict: {fingerprint: количество дней}
+        """
+        with self._connect() as conn:
+            return dict(conn.execute('''
+                SELECT configs.fingerprint, COUNT(*) FROM prayer_days
+                JOIN configs ON configs.id = prayer_days.config
+                GROUP BY configs.fingerprint
+            ''').fetchall())
+    
+    INSERT_SQL = '''
+        INSERT OR REPLACE INTO prayer_days
+        (config, day, midnight, fajr, sunrise, dhuhr, asr, maghrib, isha, hijri, fetched)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    SELECT_COLUMNS = 'day, midnight, fajr, sunrise, dhuhr, asr, maghrib, isha, hijri'
+    
+    @staticmethod
+    def _row_from_schedule(config, schedule, timestamp):
+        """Преобразует DaySchedule в строку таблицы prayer_days."""
+        timings = schedule.timings
+        return (
+            config,
+            day_number(schedule.date),
+            *(hhmm_to_minutes(timings[name]) for name in TIMING_NAMES),
+            pack_hijri(schedule.hijri),
+            timestamp
+        )
+    
+    @staticmethod
+    def _schedule_from_row(row):
+        """Преобразует строку таблицы prayer_days в DaySchedule."""
+        return DaySchedule(
+            day_from_number(row[0]),
+            dict(zip(TIMING_NAMES, map(HHMM.__getitem__, row[1:8]))),
+            hijri=unpack_hijri(row[8])
+        )
+    
+    @staticmethod
+    def _as_schedule(data):
+        """Принимает DaySchedule или ответ API Aladhan."""
+        return data if isinstance(data, DaySchedule) else DaySchedule.from_api(data)
     
     def save_prayer_times(self, data):
         """
         Сохраняет времена молитв в базу данных.
         
         Args:
-            data (dict): Данные от API Aladhan
+            data: DaySchedule или данные от API Aladhan
         """
-        if not data or 'data' not in data:
+        if not data:
             logger.error("Invalid data format received from API")
             return
         
         try:
-            timings = data['data']['timings']
-            date = data['data']['date']
-            meta = data['data']['meta']
-            
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO prayer_times 
-                    (date, gregorian_date, hijri_date, city, country,
-                     midnight, fajr, sunrise, dhuhr, asr, maghrib, isha,
-                     timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    date['gregorian']['date'],
-                    json.dumps(date['gregorian']),
-                    json.dumps(date['hijri']),
-                    meta.get('city', ''),
-                    meta.get('country', ''),
-                    timings.get('Midnight', ''),
-                    timings.get('Fajr', ''),
-                    timings.get('Sunrise', ''),
-                    timings.get('Dhuhr', ''),
-                    timings.get('Asr', ''),
-                    timings.get('Maghrib', ''),
-                    timings.get('Isha', ''),
-                    int(datetime.now().timestamp())
-                ))
-                
+            row = self._row_from_schedule(self.config_id, self._as_schedule(data),
+                                         int(datetime.now().timestamp()))
+            with self._connect() as conn, metrics.timer('db.write'):
+                conn.execute(self.INSERT_SQL, row)
                 conn.commit()
-        except (KeyError, TypeError) as e:
+        except (KeyError, TypeError, ValueError) as e:
             logger.error(f"Error saving prayer times: {e}")
     
+    def save_prayer_times_bulk(self, payloads):
+        """
+        Сохраняет времена молитв за много дней в одной транзакции.
+        
+        Args:
+            payloads (iterable): DaySchedule или данные от API Aladhan по дням
+            
+        Returns:
+            int: Количество сохраненных дней
+        """
+        timestamp = int(datetime.now().timestamp())
+        rows = []
+        for data in payloads:
+            try:
+                rows.append(self._row_from_schedule(self.config_id, self._as_schedule(data), timestamp))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Error saving prayer times: {e}")
+        
+        with self._connect() as conn, metrics.timer('db.write'):
+            conn.executemany(self.INSERT_SQL, rows)
+            conn.commit()
+        return len(rows)
+    
     def get_prayer_times(self, date=None):
         """
         Получает времена молитв из базы данных.
@@ -257,44 +641,24 @@ class PrayerTimesDB:
             date (str, optional): Дата в формате YYYY-MM-DD. По умолчанию - сегодня.
             
         Returns:
-            dict: Времена молитв или None если данные не найдены
+            DaySchedule: Расписание или None если данные не найдены
         """
-        if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+        date = normalize_date(date)
             
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn, metrics.timer('db.query'):
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT * FROM prayer_times 
-                WHERE date = ?
-            ''', (date,))
+            cursor.execute(f'''
+                SELECT {self.SELECT_COLUMNS} FROM prayer_days 
+                WHERE config = ? AND day = ?
+            ''', (self.config_id, day_number(date)))
             
             row = cursor.fetchone()
             
             if row:
-                data = {
-                    'date': row[0],
-                    'gregorian': json.loads(row[1]),
-                    'hijri': json.loads(row[2]),
-                    'meta': {
-                        'city': row[3],
-                        'country': row[4]
-                    },
-                    'times': {
-                        'Midnight': row[5],
-                        'Fajr': row[6],
-                        'Sunrise': row[7],
-                        'Dhuhr': row[8],
-                        'Asr': row[9],
-                        'Maghrib': row[10],
-                        'Isha': row[11]
-                    },
-                    'timestamp': row[12]
-                }
-                logger.info(f"Database data for {date}:")
-                logger.info(json.dumps(data, indent=2))
-                return data
+                schedule = self._schedule_from_row(row)
+                logger.debug("Database data for %s: %s", date, schedule)
+                return schedule
             
             return None
     
@@ -307,38 +671,21 @@ class PrayerTimesDB:
             end_date (str): Конечная дата в формате YYYY-MM-DD
             
         Returns:
-            dict: Словарь с временами молитв для каждой даты
+            dict: Словарь DaySchedule для каждой даты
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT * FROM prayer_times 
-                WHERE date BETWEEN ? AND ?
-                ORDER BY date
-            ''', (start_date, end_date))
+            cursor.execute(f'''
+                SELECT {self.SELECT_COLUMNS} FROM prayer_days 
+                WHERE config = ? AND day BETWEEN ? AND ?
+                ORDER BY day
+            ''', (self.config_id, day_number(normalize_date(start_date)), day_number(normalize_date(end_date))))
             
             results = {}
             for row in cursor.fetchall():
-                results[row[0]] = {
-                    'date': row[0],
-                    'gregorian': json.loads(row[1]),
-                    'hijri': json.loads(row[2]),
-                    'meta': {
-                        'city': row[3],
-                        'country': row[4]
-                    },
-                    'times': {
-                        'Midnight': row[5],
-                        'Fajr': row[6],
-                        'Sunrise': row[7],
-                        'Dhuhr': row[8],
-                        'Asr': row[9],
-                        'Maghrib': row[10],
-                        'Isha': row[11]
-                    },
-                    'timestamp': row[12]
-                }
+                schedule = self._schedule_from_row(row)
+                results[schedule.date] = schedule
             
             return results
     
@@ -353,16 +700,15 @@ class PrayerTimesDB:
         Returns:
             bool: True если кэш актуален, False если нет
         """
-        if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+        date = normalize_date(date)
             
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
-                SELECT timestamp FROM prayer_times 
-                WHERE date = ?
-            ''', (date,))
+                SELECT fetched FROM prayer_days 
+                WHERE config = ? AND day = ?
+            ''', (self.config_id, day_number(date)))
             
             row = cursor.fetchone()
             
@@ -376,43 +722,176 @@ class PrayerTimesManager:
     """
     Менеджер для работы с временами молитв.
     Объединяет функциональность API и базы данных.
+    
+    При source='local' вместо API используется PrayerTimesCalculator:
+    времена рассчитываются на месте, без сети и без обращения к базе.
+    
+    Без сети (автомат защиты API открыт) менеджер работает в автономном
+    режиме: промах базы сразу отдает локальный расчет, если он возможен
+    для этих параметров. Неудачная загрузка дня запоминается на
+    NEGATIVE_TTL секунд, поэтому повторные промахи не идут в сеть. Таких
+    дней хранится не больше NEGATIVE_CAPACITY (самые давние вытесняются),
+    поэтому долгая работа без сети и выгрузка длинного диапазона не
+    копят запасные расписания в памяти.
     """
     
-    def __init__(self, city="Baku", country="Azerbaijan", method=13):
-        self.api = PrayerTimesAPI(city, country, method)
-        self.db = PrayerTimesDB()
+    NEGATIVE_TTL = 60  # Сколько секунд не запрашивать день после неудачи
+    NEGATIVE_CAPACITY = 64  # Сколько неудачных дней помнить (как ScheduleCache)
+    
+    def __init__(self, city="Baku", country="Azerbaijan", method=13, source='api',
+                 school=0, midnight_mode=0, tune=None, db_path=None, base_url=None,
+                 transport=None, breaker=None, **location):
+        self.db = PrayerTimesDB(db_path)
+        # Один транспорт и автомат на все конфигурации: связь с API общая
+        self.transport = transport
+        self.breaker = breaker or CircuitBreaker('api')
+        # Ключ кэша -> (до какого времени не запрашивать, запасное расписание), по времени неудачи
+        self._failed = OrderedDict()
+        self.cache = ScheduleCache()
+        self.index = PrayerIndex(self.get_schedule)
         self._current_date = None
+        self.configure(city, country, method, source, school, midnight_mode, tune,
+                       base_url=base_url, **location)
+    
+    def configure(self, city="Baku", country="Azerbaijan", method=13, source='api',
+                  school=0, midnight_mode=0, tune=None, base_url=None, **location):
+        """
+        Переключает менеджер на другие параметры расчета.
         
-    def get_prayer_times(self, date=None):
+        Кэш в памяти и база хранят расписания по отпечатку параметров,
+        поэтому возврат к уже использованной конфигурации не требует
+        ни сброса кэша, ни повторных запросов к API.
+        
+        Returns:
+            str: Отпечаток новой конфигурации
         """
-        Получает времена молитв для указанной даты.
-        Сначала проверяет базу данных, если данных нет - запрашивает из API.
+        self.local = None
+        if source == 'local':
+            self.api = PrayerTimesCalculator(city, country, method, school=school,
+                                             midnight_mode=midnight_mode, tune=tune, **location)
+        else:
+            if self.transport is None:
+                self.transport = make_transport(pool_maxsize=PrayerTimesAPI.MAX_WORKERS)
+            self.api = PrayerTimesAPI(city, country, method, school=school, midnight_mode=midnight_mode,
+                                      tune=tune, base_url=base_url, transport=self.transport,
+                                      breaker=self.breaker)
+            try:
+                # Запасной источник без сети; не для всех городов и методов
+                self.local = PrayerTimesCalculator(city, country, method, school=school,
+                                                   midnight_mode=midnight_mode, tune=tune, **location)
+            except ValueError:
+                pass
+        self.fingerprint = self.api.fingerprint
+        self.db.select_config(self.fingerprint, self.api.fingerprint_params())
+        self.index.invalidate()
+        return self.fingerprint
+        
+    def get_schedule(self, date=None):
         """
-        if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+        Получает расписание на указанную дату.
+        Сначала проверяет кэш в памяти, затем базу данных, затем API.
+        
+        Args:
+            date: Дата (YYYY-MM-DD, DD-MM-YYYY, date) или None для сегодня
             
-        logger.info(f"Getting prayer times for date: {date}")
+        Returns:
+            DaySchedule: Расписание или None
+        """
+        day = normalize_date(date)
+        key = (self.fingerprint, day)
+        schedule = self.cache.get(key)
+        if schedule is not None:
+            metrics.inc('cache.hit')
+            return schedule
+        
+        failed = self._failed.get(key)
+        if failed is not None:
+            retry_at, fallback = failed
+            if self.breaker.clock() < retry_at:
+                metrics.inc('cache.negative_hit')
+                return fallback
+            del self._failed[key]
+        
+        metrics.inc('cache.miss')
+        throttled_logger.info("Getting prayer times for date: %s", day)
+        schedule = self._load_schedule(day)
+        if schedule is not None:
+            self.cache.put(key, schedule)
+            return schedule
+        
+        # Загрузить не удалось: запоминаем неудачу и отдаем локальный расчет
+        fallback = self._local_schedule(day)
+        now = self.breaker.clock()
+        self._failed[key] = (now + max(self.NEGATIVE_TTL, self.breaker.seconds_until_retry()), fallback)
+        self._failed.move_to_end(key)
+        # Истекшие записи в начале и все сверх NEGATIVE_CAPACITY вытесняются
+        while self._failed and (len(self._failed) > self.NEGATIVE_CAPACITY
+                                or next(iter(self._failed.values()))[0] <= now):
+            self._failed.popitem(last=False)
+        return fallback
+    
+    @property
+    def offline(self):
+        """Автономный режим: API недоступен, данные из базы и локального расчета."""
+        return not self.api.is_local and self.breaker.is_open
+    
+    def _local_schedule(self, day):
+        """Расписание локального расчета (запасное, в базу не сохраняется) или None."""
+        if self.local is None:
+            return None
+        payload = self.local.get_prayer_times(day)
+        if not payload:
+            return None
+        metrics.inc('api.fallback.local')
+        throttled_logger.info("API unavailable, using locally computed prayer times for %s", day)
+        return DaySchedule.from_api(payload)
+    
+    def _load_schedule(self, key):
+        """Загружает расписание мимо кэша в памяти."""
+        # Локальный расчет дешевле базы данных
+        if self.api.is_local:
+            payload = self.api.get_prayer_times(key)
+            return DaySchedule.from_api(payload) if payload else None
         
         # Пробуем получить данные из базы
-        db_data = self.db.get_prayer_times(date)
-        if db_data:
-            logger.info("Found data in database:")
-            logger.info(json.dumps(db_data, indent=2))
-            return db_data
+        schedule = self.db.get_prayer_times(key)
+        if schedule is not None:
+            metrics.inc('db.hit')
+            logger.debug("Found data in database")
+            return schedule
             
         # Если данных нет в базе, получаем из API
-        logger.info("No data in database, fetching from API")
-        api_data = self.api.get_prayer_times(date)
+        metrics.inc('db.miss')
+        logger.info("No data in database for %s, fetching from API", key)
+        api_data = self.api.get_prayer_times(key)
         if api_data:
-            logger.info("Got data from API:")
-            logger.info(json.dumps(api_data, indent=2))
+            logger.debug("Got data from API: %s", lazy_json(api_data))
+            try:
+                schedule = DaySchedule.from_api(api_data)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Error parsing API response: {e}")
+                return None
             # Сохраняем данные в базу
-            self.db.save_prayer_times(api_data)
-            return api_data
+            self.db.save_prayer_times(schedule)
+            # Связь есть: запасные расписания больше не нужны
+            self._failed.clear()
+            return schedule
             
-        logger.error("Failed to get prayer times from both database and API")
+        if not self.breaker.is_open:
+            logger.error("Failed to get prayer times from both database and API")
         return None
     
+    def get_prayer_times(self, date=None):
+        """
+        Получает времена молитв для указанной даты.
+        
+        Returns:
+            dict: Данные в форме ответа timingsByCity
+                  ({'data': {'timings': ..., 'date': ..., 'meta': ...}}) или None
+        """
+        schedule = self.get_schedule(date)
+        return schedule.to_payload() if schedule is not None else None
+    
     def get_prayer_times_range(self, start_date, end_date):
         """
         Получает времена молитв для диапазона дат.
@@ -424,113 +903,110 @@ class PrayerTimesManager:
         Returns:
             list: Список времен молитв для каждой даты
         """
-        current = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-        result = []
+        return [schedule.to_payload() for schedule in self.iter_schedules(start_date, end_date)]
+    
+    def iter_schedules(self, start_date, end_date):
+        """
+        Генератор расписаний на диапазон дат, по порядку дат.
+        
+        База читается помесячно, поэтому в памяти не больше месяца
+        расписаний при любой длине диапазона. Месяц, которого нет в базе
+        целиком, загружается одним запросом (prefetch); оставшиеся дни -
+        через get_schedule, то есть без сети из локального расчета.
+        
+        Args:
+            start_date: Начальная дата (YYYY-MM-DD, DD-MM-YYYY, date)
+            end_date: Конечная дата включительно
+            
+        Yields:
+            DaySchedule: Расписание на каждый день, для которого оно есть
+        """
+        first = date_cls.fromisoformat(normalize_date(start_date))
+        end = date_cls.fromisoformat(normalize_date(end_date))
+        while first <= end:
+            next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+            last = min(end, next_month - timedelta(days=1))
+            yield from self._iter_month(first, last)
+            first = next_month
+    
+    def _iter_month(self, first, last):
+        days = [(first + timedelta(days=n)).isoformat() for n in range((last - first).days + 1)]
+        if self.api.is_local:
+            for day in days:
+                schedule = self._load_schedule(day)
+                if schedule is not None:
+                    yield schedule
+            return
+        
+        found = self.db.get_prayer_times_range(days[0], days[-1])
+        if len(found) < len(days) and not self.breaker.is_open and self.prefetch(days[0], days[-1]):
+            found = self.db.get_prayer_times_range(days[0], days[-1])
+        for day in days:
+            schedule = found.get(day) or self.get_schedule(day)
+            if schedule is not None:
+                yield schedule
+    
+    def prefetch(self, start_date, end_date, max_workers=None):
+        """
+        Загружает диапазон дат помесячными запросами и сохраняет в базу.
         
-        while current <= end:
-            date_str = current.strftime('%Y-%m-%d')
-            prayer_times = self.get_prayer_times(date_str)
-            if prayer_times:
-                result.append(prayer_times)
-            current += timedelta(days=1)
+        Args:
+            start_date (str): Начальная дата в формате YYYY-MM-DD
+            end_date (str): Конечная дата в формате YYYY-MM-DD
+            max_workers (int, optional): Размер пула потоков
             
-        return result
+        Returns:
+            int: Количество сохраненных дней
+        """
+        if self.api.is_local:
+            return 0  # Локальному источнику кэш не нужен
+        
+        results = self.api.get_prayer_times_bulk(start_date, end_date, max_workers)
+        if not results:
+            return 0
+        return self.db.save_prayer_times_bulk(results.values())
     
-    def get_next_prayer(self):
+    def get_next_prayer(self, now=None):
         """
         Определяет следующую молитву и время до нее.
         
+        Args:
+            now (float, optional): Текущее время в секундах эпохи
+            
         Returns:
             tuple: (название молитвы, время до молитвы в минутах)
         """
-        prayer_times = self.get_prayer_times()
-        if not prayer_times:
+        prayer, seconds = self.index.time_until(now)
+        if prayer is None:
             return None, None
-            
-        now = datetime.now()
-        current_time = now.strftime('%H:%M')
-        
-        # Сортируем молитвы по времени
-        prayers = list(prayer_times['data']['timings'].items())
-        prayers.sort(key=lambda x: x[1])
+        return prayer, int(seconds / 60)
+    
+    def get_upcoming_prayers(self, until=None, now=None):
+        """
+        Моменты ближайших молитв из индекса.
         
-        # Ищем следующую молитву
-        for prayer, time in prayers:
-            if time > current_time:
-                # Вычисляем разницу во времени
-                prayer_time = datetime.strptime(time, '%H:%M').replace(
-                    year=now.year, month=now.month, day=now.day
-                )
-                time_diff = prayer_time - now
-                minutes = int(time_diff.total_seconds() / 60)
-                return prayer, minutes
-        
-        # Если все молитвы на сегодня прошли, возвращаем первую молитву следующего дня
-        tomorrow = (now + timedelta(days=1)).strftime('%Y-%m-%d')
-        tomorrow_prayers = self.get_prayer_times(tomorrow)
-        if tomorrow_prayers:
-            first_prayer = min(tomorrow_prayers['data']['timings'].items(), key=lambda x: x[1])
-            prayer_time = datetime.strptime(first_prayer[1], '%H:%M').replace(
-                year=now.year, month=now.month, day=now.day + 1
-            )
-            time_diff = prayer_time - now
-            minutes = int(time_diff.total_seconds() / 60)
-            return first_prayer[0], minutes
-        
-        return None, None
-    
-    def should_notify(self, prayer_name, minutes_before=15):
+        Args:
+            until (float, optional): Граница в секундах эпохи (не дальше горизонта индекса)
+            now (float, optional): Текущее время в секундах эпохи
+            
+        Returns:
+            list: [(секунды эпохи, название молитвы)] по возрастанию
+        """
+        return self.index.upcoming(now, until)
+    
+    def should_notify(self, prayer_name, minutes_before=15, now=None):
         """
         Проверяет, нужно ли отправить уведомление о предстоящей молитве.
         
         Args:
             prayer_name (str): Название молитвы
             minutes_before (int): За сколько минут до молитвы уведомлять
+            now (float, optional): Текущее время в секундах эпохи
             
         Returns:
             bool: True если нужно отправить уведомление
         """
-        next_prayer, minutes_to_prayer = self.get_next_prayer()
+        next_prayer, minutes_to_prayer = self.get_next_prayer(now)
         return (next_prayer == prayer_name and 
                 minutes_to_prayer is not None and 
                 minutes_to_prayer <= minutes_before)
-
-def format_gregorian_date(date_str, weekday):
-    """
-    Форматирует григорианскую дату в формат 'V - 18.XII.2024'
-    где первое римское число - это номер дня недели
-    Args:
-        date_str: Дата в формате 'DD-MM-YYYY'
-        weekday: День недели (Monday, Tuesday, etc.)
-    Returns:
-        str: Отформатированная дата
-    """
-    ROMAN_MONTHS = {
-        1: 'I', 2: 'II', 3: 'III', 4: 'IV', 5: 'V',
-        6: 'VI', 7: 'VII', 8: 'VIII', 9: 'IX', 10: 'X',
-        11: 'XI', 12: 'XII'
-    }
-    
-    WEEKDAY_ROMAN = {
-        'Monday': 'I',
-        'Tuesday': 'II',
-        'Wednesday': 'III',
-        'Thursday': 'IV',
-        'Friday': 'V',
-        'Saturday': 'VI',
-        'Sunday': 'VII'
-    }
-    
-    day, month, year = map(int, date_str.split('-'))
-    return f"{WEEKDAY_ROMAN[weekday]} - {day}.{ROMAN_MONTHS[month]}.{year}"
-
-def format_hijri_date(date_str):
-    """
-    Возвращает дату хиджри как есть из API
-    Args:
-        date_str: Дата из API
-    Returns:
-        str: Дата хиджри без изменений
-    """
-    return date_str
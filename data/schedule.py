@@ -0,0 +1,300 @@
+"""
+Schedule Module для MihrEzan.
+Каноническая модель расписания на день и LRU-кэш в памяти.
+
+API, база данных и локальный расчет возвращают данные в разной форме;
+DaySchedule приводит их к одной, а ScheduleCache держит последние
+расписания в памяти перед PrayerTimesDB.
+"""
+
+import re
+from collections import OrderedDict
+from datetime import date as date_cls, datetime
+
+from logic.hijri import HIJRI_MONTHS_EN, get_hijri_calendar
+from logic.prayer_calc import TIMING_NAMES
+
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_API_DATE = re.compile(r'^(\d{2})-(\d{2})-(\d{4})$')
+
+# Номер дня 1970-01-01 в пролептическом григорианском календаре
+EPOCH_ORDINAL = date_cls(1970, 1, 1).toordinal()
+
+def normalize_date(value=None):
+    """
+    Приводит дату к ключу кэша в формате YYYY-MM-DD.
+
+    Args:
+        value: None (сегодня), date/datetime, 'YYYY-MM-DD' или 'DD-MM-YYYY' (формат API)
+
+    Returns:
+        str: Дата в формате YYYY-MM-DD
+
+    Raises:
+        ValueError: Если формат даты не распознан
+    """
+    if value is None:
+        return date_cls.today().isoformat()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date_cls):
+        return value.isoformat()
+    if _ISO_DATE.match(value):
+        return value
+    match = _API_DATE.match(value)
+    if match:
+        day, month, year = match.groups()
+        return f"{year}-{month}-{day}"
+    raise ValueError(f"Unrecognized date format: {value}")
+
+
+def day_number(iso_date):
+    """Номер дня от 1970-01-01 для даты YYYY-MM-DD."""
+    return date_cls.fromisoformat(iso_date).toordinal() - EPOCH_ORDINAL
+
+
+def day_from_number(number):
+    """Дата YYYY-MM-DD по номеру дня от 1970-01-01."""
+    return date_cls.fromordinal(number + EPOCH_ORDINAL).isoformat()
+
+
+def hhmm_to_minutes(value):
+    """'HH:MM' -> минуты от полуночи."""
+    return int(value[:2]) * 60 + int(value[3:5])
+
+
+# Все 1440 строк 'HH:MM' заранее: чтение из базы обходится без форматирования
+HHMM = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60))
+
+
+def minutes_to_hhmm(value):
+    """Минуты от полуночи -> 'HH:MM'."""
+    return HHMM[value]
+
+
+def pack_hijri(hijri):
+    """
+    Упаковывает дату хиджры в одно целое: год << 9 | месяц << 5 | день.
+
+    Args:
+        hijri (dict): Дата хиджры в формате API или None
+
+    Returns:
+        int: Упакованная дата или None
+    """
+    if not hijri:
+        return None
+    if 'month' in hijri:
+        day, month, year = int(hijri['day']), int(hijri['month']['number']), int(hijri['year'])
+    else:
+        day, month, year = map(int, hijri['date'].split('-'))
+    return year << 9 | month << 5 | day
+
+
+def unpack_hijri(packed):
+    """
+    Восстанавливает дату хиджры в формате API из упакованного целого.
+
+    Returns:
+        dict: {'date', 'format', 'day', 'month': {'number', 'en'}, 'year'} или None
+    """
+    if packed is None:
+        return None
+    year, month, day = packed >> 9, packed >> 5 & 0xF, packed & 0x1F
+    return {
+        'date': f"{day:02d}-{month:02d}-{year}",
+        'format': 'DD-MM-YYYY',
+        'day': f"{day:02d}",
+        'month': {'number': month, 'en': HIJRI_MONTHS_EN[month - 1]},
+        'year': str(year),
+    }
+
+
+def gregorian_info(iso_date):
+    """Григорианская дата в формате API для даты YYYY-MM-DD."""
+    day = date_cls.fromisoformat(iso_date)
+    return {
+        'date': day.strftime('%d-%m-%Y'),
+        'format': 'DD-MM-YYYY',
+        'day': day.strftime('%d'),
+        'weekday': {'en': day.strftime('%A')},
+        'month': {'number': day.month, 'en': day.strftime('%B')},
+        'year': str(day.year),
+    }
+
+
+def format_gregorian_date(date_str, weekday):
+    """
+    Форматирует григорианскую дату в формат 'V - 18.XII.2024'
+    где первое римское число - это номер дня недели
+    Args:
+        date_str: Дата в формате 'DD-MM-YYYY'
+        weekday: День недели (Monday, Tuesday, etc.)
+    Returns:
+        str: Отформатированная дата
+    """
+    ROMAN_MONTHS = {
+        1: 'I', 2: 'II', 3: 'III', 4: 'IV', 5: 'V',
+        6: 'VI', 7: 'VII', 8: 'VIII', 9: 'IX', 10: 'X',
+        11: 'XI', 12: 'XII'
+    }
+    
+    WEEKDAY_ROMAN = {
+        'Monday': 'I',
+        'Tuesday': 'II',
+        'Wednesday': 'III',
+        'Thursday': 'IV',
+        'Friday': 'V',
+        'Saturday': 'VI',
+        'Sunday': 'VII'
+    }
+    
+    day, month, year = map(int, date_str.split('-'))
+    return f"{WEEKDAY_ROMAN[weekday]} - {day}.{ROMAN_MONTHS[month]}.{year}"
+
+def format_hijri_date(date_str=None):
+    """
+    Форматирует дату хиджры в формат '20 Jumādá al-ūlá 1446'
+    Args:
+        date_str: Дата хиджры 'DD-MM-YYYY' (из API), григорианская дата
+                  (date) или None - тогда дата хиджры вычисляется локально
+    Returns:
+        str: Отформатированная дата ('' вне диапазона таблиц хиджры)
+    """
+    if date_str is None or isinstance(date_str, date_cls):
+        return get_hijri_calendar().format(date_str)
+    try:
+        day, month, year = map(int, date_str.split('-'))
+    except ValueError:
+        return date_str
+    if not 1 <= month <= 12:
+        return date_str
+    return f"{day} {HIJRI_MONTHS_EN[month - 1]} {year}"
+
+
+class DaySchedule:
+    """
+    Расписание молитв на один григорианский день.
+
+    Attributes:
+        date (str): Дата в формате YYYY-MM-DD
+        timings (dict): Время 'HH:MM' для каждого имени из TIMING_NAMES
+        gregorian (dict): Григорианская дата в формате API (строится по
+                          дате при первом обращении, если не передана)
+        hijri (dict): Дата хиджры в формате API или None
+        meta (dict): Параметры расчета и место
+    """
+
+    __slots__ = ('date', 'timings', '_gregorian', 'hijri', 'meta', '_payload')
+
+    def __init__(self, date, timings, gregorian=None, hijri=None, meta=None):
+        self.date = normalize_date(date)
+        self.timings = {name: timings[name] for name in TIMING_NAMES}
+        self._gregorian = gregorian
+        self.hijri = hijri
+        self.meta = meta or {}
+        self._payload = None
+
+    @property
+    def gregorian(self):
+        if self._gregorian is None:
+            self._gregorian = gregorian_info(self.date)
+        return self._gregorian
+
+    @classmethod
+    def from_api(cls, payload):
+        """
+        Создает расписание из ответа API Aladhan (или PrayerTimesCalculator).
+
+        Raises:
+            KeyError: Если в ответе нет обязательных полей
+        """
+        data = payload['data']
+        date_info = data['date']
+        gregorian = date_info['gregorian']
+        return cls(gregorian['date'], data['timings'], gregorian,
+                   date_info.get('hijri'), data.get('meta'))
+
+    def to_payload(self):
+        """
+        Возвращает расписание в форме ответа timingsByCity.
+
+        Словарь строится один раз и переиспользуется, поэтому его нельзя
+        изменять на месте.
+        """
+        if self._payload is None:
+            day = datetime.strptime(self.date, '%Y-%m-%d')
+            date_info = {'readable': day.strftime('%d %b %Y'), 'gregorian': self.gregorian}
+            if self.hijri:
+                date_info['hijri'] = self.hijri
+            self._payload = {
+                'code': 200,
+                'status': 'OK',
+                'data': {'timings': self.timings, 'date': date_info, 'meta': self.meta}
+            }
+        return self._payload
+
+    def __eq__(self, other):
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return (self.date, self.timings, self.hijri) == (other.date, other.timings, other.hijri)
+
+    def __repr__(self):
+        return f"DaySchedule({self.date}, {self.timings})"
+
+
+class ScheduleCache:
+    """
+    Ограниченный LRU-кэш расписаний (ключ - дата или (отпечаток, дата)).
+
+    Attributes:
+        capacity (int): Максимальное количество дней в памяти
+        hits (int): Количество попаданий
+        misses (int): Количество промахов
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """Возвращает расписание по ключу или None."""
+        schedule = self._items.get(key)
+        if schedule is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return schedule
+
+    def put(self, key, schedule):
+        """Добавляет расписание, вытесняя самое давнее при переполнении."""
+        self._items[key] = schedule
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        """Очищает кэш (например, при смене настроек)."""
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict: hits, misses, size, capacity и hit_rate (0..1)
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._items),
+            'capacity': self.capacity,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
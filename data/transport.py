@@ -0,0 +1,188 @@
+"""
+Transport Module для MihrEzan.
+Сменный HTTP-транспорт PrayerTimesAPI: живая сеть, запись и воспроизведение.
+
+Транспорт выполняет GET и возвращает разобранный JSON. Ошибки сети и
+HTTP-статусы передаются исключениями requests, поэтому вызывающий код
+обрабатывает их одинаково для всех режимов.
+
+    live   - HTTPTransport: keep-alive сессия requests;
+    record - RecordingTransport: живые ответы сохраняются в fixtures/;
+    replay - ReplayTransport: ответы только из fixtures/, без сети.
+
+Режим по умолчанию задают переменные окружения MIHREZAN_HTTP_MODE
+(live, record, replay) и MIHREZAN_FIXTURES (каталог записей).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent.parent / 'fixtures' / 'http'
+
+
+def request_key(url, params):
+    """
+    Ключ запроса для записей: путь эндпоинта и отсортированные параметры.
+
+    Хост в ключ не входит, поэтому записи с api.aladhan.com
+    воспроизводятся и для другого base_url.
+    """
+    path = urlsplit(url).path
+    canonical = json.dumps({'path': path, 'params': {k: str(v) for k, v in (params or {}).items()}},
+                           sort_keys=True, ensure_ascii=False)
+    return path, canonical
+
+
+def fixture_path(fixtures_dir, url, params):
+    """Файл записи: <последний сегмент пути>-<хеш ключа>.json"""
+    path, canonical = request_key(url, params)
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+    name = path.rstrip('/').split('/')[-1] or 'root'
+    return Path(fixtures_dir) / f"{name}-{digest}.json"
+
+
+class Transport:
+    """Базовый транспорт: fetch() возвращает (статус, JSON), get_json() проверяет статус."""
+
+    def fetch(self, url, params=None, timeout=10):
+        """
+        Выполняет GET.
+
+        Returns:
+            tuple: (HTTP-статус, разобранный JSON)
+        """
+        raise NotImplementedError
+
+    def get_json(self, url, params=None, timeout=10):
+        """
+        GET с разбором JSON.
+
+        Raises:
+            requests.exceptions.RequestException: Ошибка сети или HTTP-статус >= 400
+            ValueError: Ответ не JSON
+        """
+        status, body = self.fetch(url, params, timeout)
+        if status >= 400:
+            error = requests.exceptions.HTTPError(f"{status} Error for url: {url}")
+            error.status = status
+            raise error
+        return body
+
+    def close(self):
+        pass
+
+
+class HTTPTransport(Transport):
+    """
+    Живой транспорт на общей keep-alive сессии requests.
+
+    Attributes:
+        pool_maxsize (int): Одновременных соединений с хостом
+    """
+
+    def __init__(self, pool_maxsize=4):
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Общая keep-alive сессия: одно TCP/TLS соединение на все запросы."""
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            return self._session
+
+    def fetch(self, url, params=None, timeout=10):
+        response = self.session.get(url, params=params, timeout=timeout)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            if response.status_code >= 400:
+                return response.status_code, None  # Страница ошибки прокси, не JSON
+            raise
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class RecordingTransport(Transport):
+    """Живой транспорт, сохраняющий каждый ответ (и ошибочный) в fixtures_dir."""
+
+    def __init__(self, fixtures_dir=DEFAULT_FIXTURES, inner=None):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.inner = inner or HTTPTransport()
+
+    def fetch(self, url, params=None, timeout=10):
+        status, body = self.inner.fetch(url, params, timeout)
+        path = fixture_path(self.fixtures_dir, url, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        endpoint, _ = request_key(url, params)
+        record = {'request': {'path': endpoint, 'params': {k: str(v) for k, v in (params or {}).items()}},
+                  'status': status, 'body': body}
+        # Запись во временный файл и переименование: параллельные месяцы не видят половину файла
+        tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        tmp.write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp, path)
+        return status, body
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Транспорт без сети: ответы из записей RecordingTransport.
+
+    Отсутствующая запись - ConnectionError, как при недоступной сети.
+
+    Attributes:
+        misses (list): Ключи запросов, для которых не нашлось записи
+    """
+
+    def __init__(self, fixtures_dir=DEFAULT_FIXTURES):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.misses = []
+
+    def fetch(self, url, params=None, timeout=10):
+        path = fixture_path(self.fixtures_dir, url, params)
+        try:
+            record = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            self.misses.append(request_key(url, params)[1])
+            raise requests.exceptions.ConnectionError(f"No recorded response for {url} ({path.name})")
+        return record['status'], record['body']
+
+
+def make_transport(mode=None, fixtures_dir=None, pool_maxsize=4):
+    """
+    Транспорт для режима mode (по умолчанию из MIHREZAN_HTTP_MODE).
+
+    Raises:
+        ValueError: Неизвестный режим
+    """
+    mode = mode or os.environ.get('MIHREZAN_HTTP_MODE', 'live')
+    fixtures_dir = fixtures_dir or os.environ.get('MIHREZAN_FIXTURES') or DEFAULT_FIXTURES
+    if mode == 'live':
+        return HTTPTransport(pool_maxsize)
+    if mode == 'record':
+        logger.info(f"Recording HTTP responses to {fixtures_dir}")
+        return RecordingTransport(fixtures_dir, HTTPTransport(pool_maxsize))
+    if mode == 'replay':
+        logger.info(f"Replaying HTTP responses from {fixtures_dir}")
+        return ReplayTransport(fixtures_dir)
+    raise ValueError(f"Unknown HTTP mode: {mode}")
@@ -0,0 +1,260 @@
+"""
+Adhan Player Module для MihrEzan.
+Воспроизведение азана и сигналов из папки audio/ без задержки на декодирование.
+
+Клип для ближайшего события загружается заранее (за PRELOAD_LEAD секунд),
+поэтому в момент наступления времени остается только вызвать play().
+Короткие сигналы декодируются в память целиком, длинные записи
+открываются потоково (SDL2 Mix_LoadMUS) и в память не читаются.
+Загруженные клипы держатся в ограниченном LRU-кэше и выгружаются при
+вытеснении. Для каждого воспроизведения записывается опоздание
+относительно запланированного времени.
+
+Воспроизведение выключено по умолчанию и включается настройкой
+ENABLED_SETTING; клипы по типам событий берутся из CLIPS_SETTING,
+а DEFAULT_CLIPS - только запасной вариант.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from kivy.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+AUDIO_DIR = Path(__file__).resolve().parent.parent / 'audio'
+
+ENABLED_SETTING = 'adhan_enabled'
+CLIPS_SETTING = 'adhan_clips'
+
+# Клипы по типу события AlarmEvent; None - без звука.
+# ezan.aac не входит в source.include_exts buildozer, поэтому не используется по умолчанию
+DEFAULT_CLIPS = {
+    'prayer': 'AdhanAhmedAlNufais.mp3',
+    'pre_alert': 'zil.mp3',
+    'midnight': None,
+}
+
+
+def is_enabled(value):
+    """Значение ENABLED_SETTING ('1', 'true', 'on'...) -> bool; по умолчанию выключено."""
+    return str(value or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def load_clips(value):
+    """
+    Разбирает клипы из настроек.
+
+    Args:
+        value: JSON-строка или словарь {тип события: имя файла в audio/ или null}
+
+    Returns:
+        dict: Клипы по всем типам DEFAULT_CLIPS; не заданные в value типы
+              и неизвестные типы берутся из DEFAULT_CLIPS / отбрасываются
+    """
+    clips = dict(DEFAULT_CLIPS)
+    if not value:
+        return clips
+    try:
+        items = json.loads(value) if isinstance(value, str) else dict(value)
+        for kind, name in items.items():
+            if kind not in DEFAULT_CLIPS:
+                logger.warning(f"Unknown alarm event kind in clips setting: {kind}")
+            elif name is not None and not isinstance(name, str):
+                raise ValueError(f"clip for {kind} must be a file name or null")
+            else:
+                clips[kind] = name or None
+    except (TypeError, ValueError, AttributeError) as e:
+        logger.warning(f"Invalid adhan clips setting, using defaults: {e}")
+        return dict(DEFAULT_CLIPS)
+    return clips
+
+
+def kivy_loader(path, stream=False):
+    """
+    Загружает звук средствами Kivy.
+
+    Args:
+        path (str): Путь к файлу
+        stream (bool): Открыть потоково (без декодирования в память), если провайдер умеет
+
+    Returns:
+        kivy.core.audio.Sound или None
+    """
+    if stream:
+        try:
+            from kivy.core.audio.audio_sdl2 import MusicSDL2
+        except ImportError:
+            MusicSDL2 = None  # Другие провайдеры (android, gstplayer) и так читают потоково
+        if MusicSDL2 is not None:
+            try:
+                sound = MusicSDL2(source=path)
+                if sound.length > 0:
+                    return sound
+            except Exception as e:
+                logger.warning(f"Streaming load failed for {path}: {e}")
+    from kivy.core.audio import SoundLoader
+    return SoundLoader.load(path)
+
+
+class SoundCache:
+    """
+    Ограниченный LRU-кэш загруженных клипов.
+
+    Attributes:
+        capacity (int): Максимальное количество загруженных клипов
+        loader: Функция (путь, stream) -> звук или None
+    """
+
+    def __init__(self, loader=kivy_loader, capacity=3):
+        self.loader = loader
+        self.capacity = capacity
+        self.loads = 0
+        self._items = OrderedDict()
+
+    def get(self, path, stream=False):
+        """Возвращает загруженный клип, загружая его при промахе."""
+        sound = self._items.get(path)
+        if sound is not None:
+            self._items.move_to_end(path)
+            return sound
+        started = time.perf_counter()
+        sound = self.loader(path, stream)
+        self.loads += 1
+        if sound is None:
+            logger.error(f"Unable to load audio {path}")
+            return None
+        logger.info(f"Loaded audio {Path(path).name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        self._items[path] = sound
+        while len(self._items) > self.capacity:
+            _, evicted = self._items.popitem(last=False)
+            if evicted.state != 'play':
+                evicted.unload()
+        return sound
+
+    def __contains__(self, path):
+        return path in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """Выгружает все клипы."""
+        for sound in self._items.values():
+            sound.stop()
+            sound.unload()
+        self._items.clear()
+
+
+class AdhanPlayer:
+    """
+    Проигрыватель событий AlarmScheduler.
+
+    Attributes:
+        clips (dict): {тип события: имя файла в audio/ или None}
+        cache (SoundCache): Загруженные клипы
+        clock: Источник настенного времени в секундах эпохи
+        schedule_once: Функция (callback, delay) -> событие с cancel()
+        latencies (deque): Опоздания последних воспроизведений в секундах
+    """
+
+    PRELOAD_LEAD = 120  # За сколько секунд до события загружать клип
+    STREAM_THRESHOLD = 1024 * 1024  # Файлы больше 1 МБ открываются потоково
+    HISTORY = 100
+
+    def __init__(self, clips=None, loader=kivy_loader, audio_dir=AUDIO_DIR,
+                 clock=time.time, schedule_once=None):
+        self.clips = dict(DEFAULT_CLIPS if clips is None else clips)
+        self.audio_dir = Path(audio_dir)
+        self.cache = SoundCache(loader)
+        self.clock = clock
+        self.schedule_once = schedule_once or Clock.schedule_once
+        self.latencies = deque(maxlen=self.HISTORY)
+        self._preload = None
+        self._playing = None
+
+    def attach(self, scheduler):
+        """Подписывается на события планировщика."""
+        scheduler.bind(on_alarm=lambda instance, event: self.play(event),
+                       on_armed=lambda instance, event: self.schedule_preload(event))
+
+    def clip_path(self, kind):
+        """Путь к клипу для типа события или None."""
+        name = self.clips.get(kind)
+        return str(self.audio_dir / name) if name else None
+
+    def _is_long(self, path):
+        try:
+            return Path(path).stat().st_size > self.STREAM_THRESHOLD
+        except OSError:
+            return False
+
+    def prepare(self, kind):
+        """
+        Загружает клип для типа события заранее.
+
+        Returns:
+            Загруженный звук или None
+        """
+        path = self.clip_path(kind)
+        if path is None:
+            return None
+        return self.cache.get(path, stream=self._is_long(path))
+
+    def schedule_preload(self, event):
+        """Планирует загрузку клипа за PRELOAD_LEAD секунд до события."""
+        if self._preload is not None:
+            self._preload.cancel()
+            self._preload = None
+        if self.clip_path(event.kind) is None:
+            return
+        delay = max(event.due - self.clock() - self.PRELOAD_LEAD, 0)
+        self._preload = self.schedule_once(lambda dt: self.prepare(event.kind), delay)
+
+    def play(self, event):
+        """
+        Воспроизводит клип события и записывает опоздание.
+
+        Returns:
+            float: Опоздание начала воспроизведения в секундах или None
+        """
+        sound = self.prepare(event.kind)
+        if sound is None:
+            return None
+        if self._playing is not None and self._playing is not sound:
+            self._playing.stop()
+            if self._playing.source not in self.cache:
+                self._playing.unload()  # Был вытеснен из кэша во время воспроизведения
+        sound.play()
+        self._playing = sound
+        late = self.clock() - event.due
+        self.latencies.append(late)
+        logger.info(f"Playing {event.kind} {event.name}, started {late * 1000:.0f} ms late")
+        return late
+
+    def stop(self):
+        """Останавливает воспроизведение и выгружает клипы."""
+        if self._preload is not None:
+            self._preload.cancel()
+            self._preload = None
+        self._playing = None
+        self.cache.clear()
+
+    def stats(self):
+        """
+        Статистика опозданий воспроизведения.
+
+        Returns:
+            dict: count, last, mean и max в секундах
+        """
+        if not self.latencies:
+            return {'count': 0, 'last': None, 'mean': None, 'max': None}
+        return {
+            'count': len(self.latencies),
+            'last': self.latencies[-1],
+            'mean': sum(self.latencies) / len(self.latencies),
+            'max': max(self.latencies),
+        }
@@ -0,0 +1,249 @@
+"""
+Alarm Scheduler Module для MihrEzan.
+Событийный планировщик напоминаний о молитвах.
+
+Ближайшие события (молитвы, предварительные напоминания, полночь)
+хранятся в куче по времени наступления. Взводится ровно один одноразовый
+таймер на самое раннее событие; после срабатывания он перевзводится на
+следующее. Периодических пробуждений нет.
+
+Таймер Kivy идет по монотонным часам, события - по настенным. Поэтому
+расхождение этих часов сверяется при каждом срабатывании и, между
+срабатываниями, в check_clock() из тика часов приложения: перевод часов
+или сон устройства обнаруживаются сразу, таймер перевзводится, а события
+перечитываются.
+"""
+
+import heapq
+import logging
+import time
+from collections import namedtuple
+from datetime import date as date_cls, datetime, timedelta
+from itertools import count
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+
+from data.data_worker import get_data_worker
+
+logger = logging.getLogger(__name__)
+
+# due - секунды эпохи; kind - 'prayer', 'pre_alert' или 'midnight';
+# lead - за сколько минут до молитвы (для 'pre_alert'), late - опоздание доставки
+AlarmEvent = namedtuple('AlarmEvent', 'due kind name lead late')
+
+PRAYERS = ('Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha')
+
+# За сколько минут до молитв напоминать: '15', '15,5'; пустая строка - без напоминаний
+PRE_ALERTS_SETTING = 'pre_alert_minutes'
+DEFAULT_PRE_ALERTS = (15,)
+
+
+def parse_pre_alerts(value):
+    """
+    Разбирает PRE_ALERTS_SETTING.
+
+    Returns:
+        tuple: Минуты по убыванию (DEFAULT_PRE_ALERTS, если значение не задано или неверно)
+    """
+    if value is None:
+        return DEFAULT_PRE_ALERTS
+    try:
+        minutes = {int(part) for part in str(value).replace(' ', '').split(',') if part}
+    except ValueError:
+        logger.warning(f"Invalid pre-alert setting {value!r}, using defaults")
+        return DEFAULT_PRE_ALERTS
+    if any(lead <= 0 for lead in minutes):
+        logger.warning(f"Invalid pre-alert setting {value!r}, using defaults")
+        return DEFAULT_PRE_ALERTS
+    return tuple(sorted(minutes, reverse=True))
+
+
+class AlarmScheduler(EventDispatcher):
+    """
+    Планировщик напоминаний.
+
+    Attributes:
+        pre_alerts (tuple): За сколько минут до молитв напоминать заранее
+        prayers (tuple): Имена молитв, о которых нужно напоминать
+        clock: Источник настенного времени в секундах эпохи
+        monotonic: Источник монотонного времени (для обнаружения перевода часов)
+        schedule_once: Функция (callback, delay) -> событие с cancel()
+
+    Events:
+        on_alarm(event): Наступило событие AlarmEvent
+        on_armed(event): Таймер взведен на следующее событие
+    """
+
+    __events__ = ('on_alarm', 'on_armed')
+
+    HORIZON = 36 * 3600  # Сколько событий держать в куче
+    EARLY_TOLERANCE = 0.05  # Срабатывание раньше срока на эту величину считается вовремя
+    STALE_AFTER = 60  # Пропущенные больше минуты назад напоминания не доставляются
+    JUMP_THRESHOLD = 2  # Расхождение настенных и монотонных часов, считающееся переводом
+
+    def __init__(self, data_worker=None, pre_alerts=DEFAULT_PRE_ALERTS, prayers=PRAYERS,
+                 clock=time.time, monotonic=time.monotonic, schedule_once=None, **kwargs):
+        super().__init__(**kwargs)
+        self.data_worker = data_worker or get_data_worker()
+        self.pre_alerts = tuple(pre_alerts)
+        self.prayers = tuple(prayers)
+        self.clock = clock
+        self.monotonic = monotonic
+        self.schedule_once = schedule_once or Clock.schedule_once
+        self._heap = []
+        self._seq = count()
+        self._timer = None
+        self._armed_at = None
+        self._fired_until = float('-inf')
+        self._generation = 0
+
+    def start(self):
+        """Загружает ближайшие молитвы и взводит таймер."""
+        self.reload()
+
+    def stop(self):
+        """Снимает таймер и очищает кучу."""
+        self._cancel()
+        self._heap.clear()
+        self._generation += 1
+
+    def reload(self):
+        """Перечитывает ближайшие молитвы в фоновом потоке."""
+        self._generation += 1
+        generation = self._generation
+        now = self.clock()
+        self.data_worker.call('get_upcoming_prayers', until=now + self.HORIZON,
+                              callback=lambda items: self._on_upcoming(generation, items))
+
+    def settings_changed(self):
+        """Вызывается после изменения настроек (город, метод, напоминания)."""
+        self.reload()
+
+    def on_setting_saved(self, key, value):
+        """Слушатель SettingsDatabase: новые минуты напоминаний применяются сразу."""
+        if key == PRE_ALERTS_SETTING:
+            self.pre_alerts = parse_pre_alerts(value)
+            if self._heap or self._timer is not None:
+                self.settings_changed()
+
+    def resync(self):
+        """Вызывается после выхода из сна или перевода часов."""
+        logger.info("Alarm scheduler resync")
+        self.reload()
+
+    def check_clock(self, *args):
+        """
+        Сверяет настенные часы с монотонными, не дожидаясь таймера.
+
+        Дешевая проверка для частого вызова (тик часов раз в 0.5 с): без
+        нее перевод часов при взведенном на часы вперед таймере заметен
+        только при его срабатывании, когда событие уже опоздало.
+
+        Returns:
+            bool: Был ли обнаружен перевод часов
+        """
+        if self._timer is None or not self._clock_jumped(self.clock()):
+            return False
+        self._cancel()
+        self._fire()
+        return True
+
+    def pending(self):
+        """
+        Запланированные события по возрастанию времени.
+
+        Returns:
+            list: [AlarmEvent]
+        """
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def _on_upcoming(self, generation, items):
+        """Строит кучу из [(секунды эпохи, имя)] (в главном потоке)."""
+        if generation != self._generation:
+            return  # Ответ на устаревший запрос
+        now = self.clock()
+        heap = []
+        for due, name in items or ():
+            if name not in self.prayers:
+                continue
+            heap.append((due, next(self._seq), AlarmEvent(due, 'prayer', name, 0, 0.0)))
+            for lead in self.pre_alerts:
+                heap.append((due - lead * 60, next(self._seq),
+                             AlarmEvent(due - lead * 60, 'pre_alert', name, lead, 0.0)))
+
+        day = date_cls.fromtimestamp(now)
+        while True:
+            day += timedelta(days=1)
+            midnight = datetime.combine(day, datetime.min.time()).timestamp()
+            if midnight > now + self.HORIZON:
+                break
+            heap.append((midnight, next(self._seq), AlarmEvent(midnight, 'midnight', day.isoformat(), 0, 0.0)))
+
+        # Уже доставленные события не повторяются после перечитывания
+        floor = max(now, self._fired_until)
+        self._heap = [entry for entry in heap if entry[0] > floor]
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def _arm(self):
+        self._cancel()
+        if not self._heap:
+            return
+        delay = max(self._heap[0][0] - self.clock(), 0)
+        self._armed_at = (self.clock(), self.monotonic())
+        self._timer = self.schedule_once(self._fire, delay)
+        self.dispatch('on_armed', self._heap[0][2])
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _clock_jumped(self, now):
+        wall, mono = self._armed_at
+        return abs((now - wall) - (self.monotonic() - mono)) > self.JUMP_THRESHOLD
+
+    def _fire(self, *args):
+        self._timer = None
+        now = self.clock()
+        needs_reload = self._clock_jumped(now)
+        if needs_reload:
+            logger.info("Wall clock jump detected, reloading alarms")
+            # После перевода часов назад прошедшие события снова впереди
+            self._fired_until = min(self._fired_until, now)
+
+        while self._heap and self._heap[0][0] <= now + self.EARLY_TOLERANCE:
+            due, _, event = heapq.heappop(self._heap)
+            self._fired_until = max(self._fired_until, due)
+            late = now - due
+            if event.kind != 'midnight' and late > self.STALE_AFTER:
+                logger.info(f"Skipping missed {event.kind} {event.name} ({late:.0f}s late)")
+                continue
+            self.dispatch('on_alarm', event._replace(late=late))
+            if event.kind == 'midnight':
+                needs_reload = True  # Новые сутки: дополняем кучу
+
+        if needs_reload:
+            self.reload()
+        self._arm()
+
+    def on_alarm(self, event):
+        pass
+
+    def on_armed(self, event):
+        pass
+
+
+_scheduler = None
+
+
+def get_alarm_scheduler():
+    """Возвращает общий для приложения AlarmScheduler с напоминаниями из настроек."""
+    global _scheduler
+    if _scheduler is None:
+        from data.database import get_settings_database
+        db = get_settings_database()
+        _scheduler = AlarmScheduler(pre_alerts=parse_pre_alerts(db.get_setting(PRE_ALERTS_SETTING)))
+        db.add_listener(_scheduler.on_setting_saved)
+    return _scheduler
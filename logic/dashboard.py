@@ -0,0 +1,270 @@
+"""
+Dashboard Module для MihrEzan.
+Общая модель табло с временами молитв для многих городов.
+
+Расписания всех городов считаются одним пакетным вызовом
+compute_timetables на HORIZON дней вперед, поэтому смена дня - это
+выбор строки из готового массива, а не новый расчет. Обновления идут
+по событиям: у каждого города одно ближайшее событие (следующая молитва
+или местная полночь) в куче, и на всю модель взведен один таймер Kivy
+до самого раннего из них. Лишний город добавляет запись в куче, но не
+работу каждую секунду.
+"""
+
+import heapq
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+
+from logic.prayer_batch import MISSING, compute_timetables, date_range, format_minutes
+from logic.prayer_calc import TIMING_NAMES, get_timezone
+
+logger = logging.getLogger(__name__)
+
+CITIES_SETTING = 'dashboard_cities'
+
+MIDNIGHT = TIMING_NAMES.index('Midnight')
+MAGHRIB = TIMING_NAMES.index('Maghrib')
+
+# Города по умолчанию: (название, широта, долгота, часовой пояс)
+DEFAULT_CITIES = (
+    ('Baku', 40.3777, 49.892, 'Asia/Baku'),
+    ('Ganja', 40.6828, 46.3606, 'Asia/Baku'),
+    ('Istanbul', 41.0082, 28.9784, 'Europe/Istanbul'),
+    ('Ankara', 39.9334, 32.8597, 'Europe/Istanbul'),
+    ('Makkah', 21.4225, 39.8262, 'Asia/Riyadh'),
+    ('Madinah', 24.4672, 39.6112, 'Asia/Riyadh'),
+    ('Kazan', 55.7887, 49.1221, 'Europe/Moscow'),
+    ('Tashkent', 41.2995, 69.2401, 'Asia/Tashkent'),
+)
+
+
+class DashboardCity:
+    """
+    Город на табло.
+
+    Attributes:
+        name (str): Подпись строки
+        latitude, longitude (float): Координаты
+        timezone: Имя зоны IANA или смещение в часах
+    """
+
+    __slots__ = ('name', 'latitude', 'longitude', 'timezone', 'tzinfo')
+
+    def __init__(self, name, latitude, longitude, timezone):
+        self.name = name
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.timezone = timezone
+        self.tzinfo = get_timezone(timezone)
+
+    @property
+    def location(self):
+        return self.latitude, self.longitude, self.timezone
+
+    def local_now(self, now):
+        """Местное время города для момента now (секунды эпохи)."""
+        return datetime.fromtimestamp(now, self.tzinfo)
+
+    def __repr__(self):
+        return f"DashboardCity({self.name!r}, {self.latitude}, {self.longitude}, {self.timezone!r})"
+
+
+def load_cities(value):
+    """
+    Разбирает список городов из настроек.
+
+    Args:
+        value: JSON-строка или список; элемент - {'name', 'latitude',
+               'longitude', 'timezone'} или [name, latitude, longitude, timezone]
+
+    Returns:
+        list: DashboardCity (DEFAULT_CITIES, если value пусто или неверно)
+    """
+    try:
+        items = json.loads(value) if isinstance(value, str) else value
+        cities = [DashboardCity(**item) if isinstance(item, dict) else DashboardCity(*item)
+                  for item in items or ()]
+    except (TypeError, ValueError, KeyError) as e:
+        logger.warning(f"Invalid dashboard cities setting, using defaults: {e}")
+        cities = None
+    return cities or [DashboardCity(*city) for city in DEFAULT_CITIES]
+
+
+class CityTimes:
+    """
+    Строка табло: расписание города на его местный день.
+
+    Attributes:
+        date (str): Местная дата города, YYYY-MM-DD
+        timings (dict): Время 'HH:MM' по именам TIMING_NAMES
+        next_prayer (str): Имя следующего времени сегодня или None
+    """
+
+    __slots__ = ('date', 'timings', 'next_prayer')
+
+    def __init__(self, date, timings, next_prayer=None):
+        self.date = date
+        self.timings = timings
+        self.next_prayer = next_prayer
+
+    def __eq__(self, other):
+        if not isinstance(other, CityTimes):
+            return NotImplemented
+        return (self.date, self.timings, self.next_prayer) == (other.date, other.timings, other.next_prayer)
+
+    def __repr__(self):
+        return f"CityTimes({self.date}, next={self.next_prayer})"
+
+
+class DashboardModel(EventDispatcher):
+    """
+    Расписания городов табло и события их смены.
+
+    Attributes:
+        cities (list): DashboardCity
+        rows (list): CityTimes для каждого города (None до start)
+        batches (int): Сколько раз выполнялся пакетный расчет
+
+    Events:
+        on_city_changed(index, row): Строка города index изменилась
+    """
+
+    __events__ = ('on_city_changed',)
+
+    HORIZON = 7  # Дней в одном пакетном расчете
+    EVENT_DELAY = 0.5  # Запас после события, чтобы время уже наступило
+
+    def __init__(self, cities, method=13, school=0, midnight_mode=0, tune=None,
+                 horizon=HORIZON, clock=time.time, schedule_once=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cities = list(cities)
+        self.method = method
+        self.school = school
+        self.midnight_mode = midnight_mode
+        self.tune = tune
+        self.horizon = horizon
+        self.clock = clock
+        self.schedule_once = schedule_once or Clock.schedule_once
+        self.rows = [None] * len(self.cities)
+        self.batches = 0
+        self._table = None
+        self._first_day = None
+        self._queue = []  # (момент события, индекс города)
+        self._event = None
+
+    def start(self):
+        """Пересчитывает все строки и взводит таймер до ближайшего события."""
+        self.stop()
+        now = self.clock()
+        self._queue = []
+        for index in range(len(self.cities)):
+            self._update_city(index, now)
+        self._arm(now)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _compute(self, first_day):
+        """Пакетный расчет всех городов на horizon дней с first_day."""
+        started = time.perf_counter()
+        dates = date_range(first_day, first_day + timedelta(days=self.horizon - 1))
+        self._table = compute_timetables(dates, [city.location for city in self.cities],
+                                         self.method, self.school, self.midnight_mode, self.tune)
+        self._first_day = first_day
+        self.batches += 1
+        logger.info("Dashboard timetables computed for %d cities in %.1f ms",
+                    len(self.cities), (time.perf_counter() - started) * 1000)
+
+    def _minutes(self, index, day):
+        """Минуты от местной полуночи для города index на день day."""
+        offset = None if self._first_day is None else (day - self._first_day).days
+        if offset is None or not 0 <= offset < self.horizon:
+            # Окно с дня перед самым ранним местным днем среди городов:
+            # покрывает их все и полночь прошлой ночи (см. _update_city)
+            now = self.clock()
+            first = min(min(city.local_now(now).date() for city in self.cities), day)
+            first = min(first - timedelta(days=1), day)
+            self._compute(first)
+            offset = (day - first).days
+        return self._table[index, offset]
+
+    def _update_city(self, index, now):
+        city = self.cities[index]
+        local = city.local_now(now)
+        day = local.date()
+        minutes = [int(value) for value in self._minutes(index, day)]
+        timings = {name: format_minutes(value) for name, value in zip(TIMING_NAMES, minutes)}
+
+        # Моменты времен сегодня; полночь после 00:00 - уже следующие сутки (как в PrayerIndex)
+        start = datetime(day.year, day.month, day.day, tzinfo=city.tzinfo)
+        maghrib = minutes[MAGHRIB]
+        instants = []
+        for name, value in zip(TIMING_NAMES, minutes):
+            if value == MISSING:
+                continue
+            moment = start + timedelta(minutes=value)
+            if name == 'Midnight' and value < maghrib:
+                moment += timedelta(days=1)
+            instants.append((moment.timestamp(), name))
+
+        # Полночь прошлой ночи после 00:00 приходится на сегодня: пока она
+        # не наступила, она и есть следующее время и показывается в строке
+        previous = [int(value) for value in self._minutes(index, day - timedelta(days=1))]
+        if previous[MIDNIGHT] != MISSING and previous[MIDNIGHT] < previous[MAGHRIB]:
+            moment = (start + timedelta(minutes=previous[MIDNIGHT])).timestamp()
+            if moment > now:
+                timings['Midnight'] = format_minutes(previous[MIDNIGHT])
+                instants.append((moment, 'Midnight'))
+        instants.sort()
+
+        upcoming = [(moment, name) for moment, name in instants if moment > now]
+        next_prayer = upcoming[0][1] if upcoming else None
+        midnight = datetime(day.year, day.month, day.day, tzinfo=city.tzinfo) + timedelta(days=1)
+        next_event = min([midnight.timestamp()] + [moment for moment, _ in upcoming[:1]])
+        heapq.heappush(self._queue, (next_event, index))
+
+        row = CityTimes(day.isoformat(), timings, next_prayer)
+        if row != self.rows[index]:
+            self.rows[index] = row
+            self.dispatch('on_city_changed', index, row)
+
+    def _arm(self, now):
+        self.stop()
+        if self._queue:
+            delay = self._queue[0][0] - now + self.EVENT_DELAY
+            self._event = self.schedule_once(self._on_timer, max(delay, 0))
+
+    def _on_timer(self, *args):
+        self._event = None
+        now = self.clock()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[1])
+        for index in due:
+            self._update_city(index, now)
+        self._arm(now)
+
+    def on_city_changed(self, index, row):
+        pass
+
+
+_model = None
+
+
+def get_dashboard_model():
+    """Возвращает общую для приложения DashboardModel с городами из настроек."""
+    global _model
+    if _model is None:
+        from data.database import get_settings_database
+        db = get_settings_database()
+        method = db.get_setting('dashboard_method')
+        _model = DashboardModel(load_cities(db.get_setting(CITIES_SETTING)),
+                                method=int(method) if method else 13)
+    return _model
@@ -0,0 +1,149 @@
+"""
+Day Context Module для MihrEzan.
+Общий для приложения контекст текущего дня.
+
+Григорианская дата, дата хиджры и расписание молитв вычисляются один
+раз и публикуются через свойства Kivy. Дата хиджры считается локально
+(logic.hijri) и не ждет расписания из API. Метки подписываются на них вместо
+ежесекундного опроса; обновление происходит только в местную полночь,
+при смене даты хиджры или при изменении настроек.
+"""
+
+import logging
+from datetime import date as date_cls, datetime, timedelta
+
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from kivy.properties import ObjectProperty, StringProperty
+
+from data.data_worker import get_data_worker
+from data.database import get_settings_database
+from data.schedule import format_gregorian_date
+from logic.hijri import ADJUSTMENT_SETTING, get_hijri_calendar
+
+logger = logging.getLogger(__name__)
+
+# Настройки, после изменения которых контекст дня пересчитывается
+CONTEXT_SETTINGS = (ADJUSTMENT_SETTING,)
+
+
+class DayContext(EventDispatcher):
+    """
+    Контекст текущего дня.
+
+    Attributes:
+        gregorian_text (str): Дата в формате 'V - 18.XII.2024'
+        hijri_text (str): Дата хиджры или '' если она неизвестна
+        schedule (DaySchedule): Расписание молитв на сегодня или None
+        hijri_at_maghrib (bool): Переключать дату хиджры на закате, а не в полночь
+        hijri_calendar (HijriCalendar): Локальный календарь хиджры
+
+    Events:
+        on_day_changed: Контекст пересчитан (полночь, Магриб, настройки)
+    """
+
+    gregorian_text = StringProperty('')
+    hijri_text = StringProperty('')
+    schedule = ObjectProperty(None, allownone=True)
+
+    __events__ = ('on_day_changed',)
+
+    RETRY_INTERVAL = 60  # Повтор через минуту, если данных нет (нет сети)
+    ROLLOVER_DELAY = 0.5  # Запас после полуночи, чтобы дата уже сменилась
+
+    def __init__(self, data_worker=None, hijri_at_maghrib=False, hijri_calendar=None, **kwargs):
+        super().__init__(**kwargs)
+        self.data_worker = data_worker or get_data_worker()
+        self.hijri_at_maghrib = hijri_at_maghrib
+        self.hijri_calendar = hijri_calendar or get_hijri_calendar()
+        self._date = None
+        self._event = None
+        self.refresh()
+
+    def refresh(self, *args):
+        """Пересчитывает контекст и планирует следующее обновление."""
+        self._cancel()
+        today = date_cls.today()
+        self._date = today
+        self.gregorian_text = format_gregorian_date(today.strftime('%d-%m-%Y'), today.strftime('%A'))
+        self.hijri_text = self.hijri_calendar.format(today)
+        self.data_worker.get_schedule(today.isoformat(), callback=self._on_schedule)
+
+    def settings_changed(self):
+        """Вызывается после изменения настроек (город, метод расчета, сдвиг хиджры)."""
+        self.refresh()
+
+    def on_setting_saved(self, key, value):
+        """Подписчик SettingsDatabase: пересчет только для настроек контекста дня."""
+        if key in CONTEXT_SETTINGS:
+            self.settings_changed()
+
+    def _on_schedule(self, schedule):
+        """Принимает расписание из фонового потока (в главном потоке)."""
+        if self._date is None or (schedule is not None and schedule.date != self._date.isoformat()):
+            return  # Ответ на устаревший запрос
+        if schedule is None:
+            logger.warning("Day schedule unavailable, retrying later")
+            self._arm(self.RETRY_INTERVAL)
+            return
+
+        self.schedule = schedule
+        now = datetime.now()
+        maghrib = self._maghrib(schedule)
+        hijri_day = self._date
+        if self.hijri_at_maghrib and maghrib is not None and now >= maghrib:
+            # После заката уже наступил следующий день хиджры
+            hijri_day += timedelta(days=1)
+        hijri_text = self.hijri_calendar.format(hijri_day)
+        if self.hijri_calendar.source == 'tabular' and hijri_day == self._date:
+            # Табличный календарь расходится с Умм аль-Кура: дата из данных API точнее
+            hijri_text = self.format_hijri(schedule.hijri) or hijri_text
+        # Вне диапазона таблиц хиджры - дата из данных API
+        self.hijri_text = hijri_text or self.format_hijri(schedule.hijri)
+        self.dispatch('on_day_changed')
+        self._arm_next_rollover(now, maghrib)
+
+    @staticmethod
+    def format_hijri(hijri):
+        """Форматирует дату хиджры из данных API."""
+        if not hijri or 'month' not in hijri:
+            return ''
+        return f"{hijri['day']} {hijri['month']['en']} {hijri['year']}"
+
+    def _maghrib(self, schedule):
+        try:
+            hours, minutes = map(int, schedule.timings['Maghrib'].split(':'))
+        except (KeyError, ValueError):
+            return None
+        return datetime.combine(self._date, datetime.min.time()).replace(hour=hours, minute=minutes)
+
+    def _arm_next_rollover(self, now, maghrib):
+        midnight = datetime.combine(self._date + timedelta(days=1), datetime.min.time())
+        next_event = midnight
+        if self.hijri_at_maghrib and maghrib is not None and now < maghrib:
+            next_event = maghrib
+        self._arm((next_event - now).total_seconds() + self.ROLLOVER_DELAY)
+
+    def _arm(self, delay):
+        self._cancel()
+        self._event = Clock.schedule_once(self.refresh, max(delay, 0))
+
+    def _cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_day_changed(self, *args):
+        pass
+
+
+_context = None
+
+
+def get_day_context():
+    """Возвращает общий для приложения DayContext."""
+    global _context
+    if _context is None:
+        _context = DayContext()
+        get_settings_database().add_listener(_context.on_setting_saved)
+    return _context
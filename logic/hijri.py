@@ -0,0 +1,186 @@
+"""
+Hijri Module для MihrEzan.
+Локальный расчет даты хиджры по таблице начал месяцев.
+
+Таблица начал месяцев (номера дней, как date.toordinal()) строится один
+раз при первом обращении по календарю Умм аль-Кура (logic.ummalqura,
+данные в репозитории). Табличный (арифметический) календарь хиджры
+доступен как запасной; он расходится с Умм аль-Кура на день-два. Плотный индекс "день -> номер
+месяца" делает перевод даты одним обращением к массиву, без поиска и
+без сети. Сдвиг adjustment (±дни) подгоняет дату под местное решение
+о начале месяца.
+"""
+
+import logging
+import threading
+from array import array
+from datetime import date as date_cls
+
+from logic import ummalqura
+
+logger = logging.getLogger(__name__)
+
+# Названия месяцев хиджры в написании API Aladhan
+HIJRI_MONTHS_EN = (
+    'Muḥarram', 'Ṣafar', 'Rabīʿ al-awwal', 'Rabīʿ al-thānī',
+    'Jumādá al-ūlá', 'Jumādá al-ākhirah', 'Rajab', 'Shaʿbān',
+    'Ramaḍān', 'Shawwāl', 'Dhū al-Qaʿdah', 'Dhū al-Ḥijjah',
+)
+
+# Годы таблиц Умм аль-Кура: 1343-01-01 .. 1500-12-30 (1924-08-01 .. 2077-11-16)
+FIRST_YEAR, LAST_YEAR = 1343, 1500
+
+# Начало табличного календаря: 16 июля 622 г. по юлианскому календарю
+ISLAMIC_EPOCH = date_cls(622, 7, 19).toordinal()
+
+ADJUSTMENT_SETTING = 'hijri_adjustment'
+
+
+def tabular_month_start(year, month):
+    """Номер дня 1-го числа месяца в табличном календаре хиджры (цикл 30 лет)."""
+    return (29 * (month - 1) + (6 * month - 1) // 11 + (year - 1) * 354
+            + (3 + 11 * year) // 30 + ISLAMIC_EPOCH)
+
+
+def tabular_month_starts(first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """
+    Начала месяцев табличного календаря.
+
+    Returns:
+        list: Номера дней 1-го числа каждого месяца first_year..last_year
+              и, последним, начало следующего за ними месяца
+    """
+    starts = [tabular_month_start(year, month)
+              for year in range(first_year, last_year + 1) for month in range(1, 13)]
+    starts.append(tabular_month_start(last_year + 1, 1))
+    return starts
+
+
+def ummalqura_month_starts(first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """Начала месяцев календаря Умм аль-Кура (из logic.ummalqura), как tabular_month_starts."""
+    if not FIRST_YEAR <= first_year <= last_year <= LAST_YEAR:
+        raise ValueError(f"Umm al-Qura table covers {FIRST_YEAR}..{LAST_YEAR} only")
+    first = (first_year - ummalqura.FIRST_YEAR) * 12
+    last = (last_year + 1 - ummalqura.FIRST_YEAR) * 12
+    return [start + ummalqura.RJD_OFFSET for start in ummalqura.MONTH_STARTS[first:last + 1]]
+
+
+class HijriCalendar:
+    """
+    Перевод григорианской даты в дату хиджры за O(1).
+
+    Attributes:
+        adjustment (int): Сдвиг в днях (+1 - месяц начинается на день раньше)
+        source (str): 'ummalqura' или 'tabular'
+    """
+
+    def __init__(self, adjustment=0, month_starts=None, first_year=FIRST_YEAR):
+        """
+        Args:
+            adjustment (int): Сдвиг в днях
+            month_starts: Функция () -> список начал месяцев (см. tabular_month_starts);
+                          по умолчанию Умм аль-Кура
+            first_year (int): Год хиджры первого месяца таблицы
+        """
+        self.adjustment = adjustment
+        if month_starts is None:
+            month_starts = ummalqura_month_starts
+        self.source = 'ummalqura' if month_starts is ummalqura_month_starts else 'tabular'
+        self._month_starts = month_starts
+        self.first_year = first_year
+        self._starts = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _tables(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    starts = array('l', self._month_starts())
+                    index = array('H')
+                    for i in range(len(starts) - 1):
+                        index.extend(array('H', (i,)) * (starts[i + 1] - starts[i]))
+                    self._starts = starts
+                    self._index = index
+                    logger.debug("Hijri tables built (%s, %d days)", self.source, len(index))
+        return self._starts, self._index
+
+    def from_gregorian(self, value=None):
+        """
+        Дата хиджры для григорианской даты.
+
+        Args:
+            value: date/datetime, 'YYYY-MM-DD' или None (сегодня)
+
+        Returns:
+            tuple: (год, месяц, день) или None вне диапазона таблиц
+        """
+        if value is None:
+            value = date_cls.today()
+        elif isinstance(value, str):
+            value = date_cls.fromisoformat(value)
+        starts, index = self._tables()
+        offset = value.toordinal() + self.adjustment - starts[0]
+        if not 0 <= offset < len(index):
+            return None
+        month_index = index[offset]
+        year, month = divmod(month_index, 12)
+        return self.first_year + year, month + 1, offset + starts[0] - starts[month_index] + 1
+
+    def month_length(self, year, month):
+        """Количество дней в месяце хиджры (29 или 30)."""
+        starts, _ = self._tables()
+        i = (year - self.first_year) * 12 + month - 1
+        if not 0 <= i < len(starts) - 1:
+            raise ValueError(f"Hijri month {year}-{month} is out of range")
+        return starts[i + 1] - starts[i]
+
+    def format(self, value=None):
+        """Дата хиджры в виде '20 Jumādá al-ūlá 1446' или '' вне диапазона таблиц."""
+        hijri = self.from_gregorian(value)
+        if hijri is None:
+            return ''
+        year, month, day = hijri
+        return f"{day} {HIJRI_MONTHS_EN[month - 1]} {year}"
+
+    def to_api(self, value=None):
+        """Дата хиджры в формате API ({'date', 'day', 'month', 'year'}) или None."""
+        hijri = self.from_gregorian(value)
+        if hijri is None:
+            return None
+        year, month, day = hijri
+        return {
+            'date': f"{day:02d}-{month:02d}-{year}",
+            'format': 'DD-MM-YYYY',
+            'day': f"{day:02d}",
+            'month': {'number': month, 'en': HIJRI_MONTHS_EN[month - 1]},
+            'year': str(year),
+        }
+
+
+def parse_adjustment(value):
+    """Сдвиг из настроек (строка или число) или 0."""
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        logger.warning("Invalid hijri adjustment %r, using 0", value)
+        return 0
+
+
+_calendar = None
+
+
+def get_hijri_calendar():
+    """Возвращает общий для приложения HijriCalendar со сдвигом из настроек."""
+    global _calendar
+    if _calendar is None:
+        from data.database import get_settings_database
+        db = get_settings_database()
+        _calendar = HijriCalendar(parse_adjustment(db.get_setting(ADJUSTMENT_SETTING)))
+        db.add_listener(_on_setting_changed)
+    return _calendar
+
+
+def _on_setting_changed(key, value):
+    if key == ADJUSTMENT_SETTING and _calendar is not None:
+        _calendar.adjustment = parse_adjustment(value)
@@ -0,0 +1,256 @@
+"""
+Metrics Module для MihrEzan.
+Счетчики и гистограммы задержек горячих путей, ленивое логирование.
+
+Регистр потокобезопасен и дешев: счетчик - одно сложение под
+блокировкой, наблюдение задержки - поиск корзины bisect'ом. Снимок
+отдается словарем (для JSON) или одной строкой лога; MetricsReporter
+пишет такую строку раз в interval секунд.
+
+Логирование на горячих путях - только через lazy_json и %-аргументы,
+чтобы строки не собирались при выключенном уровне, и через
+RateLimitedLogger, чтобы повторяющиеся сообщения не заполняли лог.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы в секундах (последняя - все остальное)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """
+    Гистограмма задержек с фиксированными корзинами.
+
+    Attributes:
+        count (int): Количество наблюдений
+        total (float): Сумма задержек, с
+        max (float): Наибольшая задержка, с
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """
+        Оценка квантиля по корзинам.
+
+        Returns:
+            float: Верхняя граница корзины, в которую попадает квантиль
+                   (max для последней корзины), или None без наблюдений
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max if self.count else None,
+        }
+
+
+class MetricsRegistry:
+    """Именованные счетчики, текущие значения (gauges) и гистограммы задержек."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, n=1):
+        """Увеличивает счетчик name на n."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        """Запоминает текущее значение name (состояние, размер очереди)."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        """Добавляет задержку в гистограмму name."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Замеряет длительность блока with в гистограмму name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def count(self, name):
+        """Текущее значение счетчика (или количество наблюдений гистограммы)."""
+        with self._lock:
+            if name in self.counters:
+                return self.counters[name]
+            histogram = self.histograms.get(name)
+            return histogram.count if histogram is not None else 0
+
+    def snapshot(self):
+        """
+        Снимок всех метрик.
+
+        Returns:
+            dict: {'counters': {имя: значение}, 'gauges': {имя: значение},
+                   'latency': {имя: {count, mean, p50, p95, max}}} (секунды)
+        """
+        with self._lock:
+            return {
+                'counters': dict(sorted(self.counters.items())),
+                'gauges': dict(sorted(self.gauges.items())),
+                'latency': {name: self.histograms[name].snapshot() for name in sorted(self.histograms)},
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def format_line(self):
+        """Снимок одной строкой: 'cache.hit=120 db.query=3/0.4ms/p95 1.0ms ...'"""
+        snapshot = self.snapshot()
+        parts = [f"{name}={value}" for name, value in snapshot['counters'].items()]
+        parts.extend(f"{name}={value}" for name, value in snapshot['gauges'].items())
+        for name, stats in snapshot['latency'].items():
+            parts.append(f"{name}={stats['count']}/{stats['mean'] * 1000:.2f}ms"
+                         f"/p95 {stats['p95'] * 1000:.2f}ms")
+        return ' '.join(parts) or 'no metrics'
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+
+class MetricsReporter:
+    """
+    Пишет снимок метрик строкой лога раз в interval секунд.
+
+    Attributes:
+        registry (MetricsRegistry): Источник метрик
+        interval (float): Период, с
+        schedule_interval: Функция (callback, interval) -> событие с cancel()
+    """
+
+    INTERVAL = 300
+
+    def __init__(self, registry=None, interval=INTERVAL, schedule_interval=None, log=logger):
+        self.registry = registry or get_metrics()
+        self.interval = interval
+        self.schedule_interval = schedule_interval
+        self.log = log
+        self._event = None
+
+    def start(self):
+        self.stop()
+        schedule_interval = self.schedule_interval
+        if schedule_interval is None:
+            from kivy.clock import Clock
+            schedule_interval = Clock.schedule_interval
+        self._event = schedule_interval(self.report, self.interval)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def report(self, *args):
+        self.log.info("metrics: %s", self.registry.format_line())
+
+
+class lazy_json:
+    """Аргумент лога, который сериализуется в JSON только при выводе записи."""
+
+    __slots__ = ('value', 'kwargs')
+
+    def __init__(self, value, **kwargs):
+        self.value = value
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return json.dumps(self.value, ensure_ascii=False, **self.kwargs)
+
+
+class RateLimitedLogger:
+    """
+    Обертка логгера: одно и то же сообщение - не чаще раза в interval секунд.
+
+    Сообщения различаются по шаблону (msg без аргументов). Подавленные
+    повторы считаются и дописываются к следующей выведенной записи.
+    Аргументы форматируются лениво, самим logging.
+    """
+
+    def __init__(self, log, interval=60.0, clock=time.monotonic):
+        self.log = log
+        self.interval = interval
+        self.clock = clock
+        self._last = {}  # шаблон -> (время вывода, подавлено)
+        self._lock = threading.Lock()
+
+    def _log(self, level, msg, *args):
+        if not self.log.isEnabledFor(level):
+            return
+        now = self.clock()
+        with self._lock:
+            last, suppressed = self._last.get(msg, (None, 0))
+            if last is not None and now - last < self.interval:
+                self._last[msg] = (last, suppressed + 1)
+                return
+            self._last[msg] = (now, 0)
+        if suppressed:
+            msg = f"{msg} (+{suppressed} similar suppressed)"
+        self.log.log(level, msg, *args)
+
+    def debug(self, msg, *args):
+        self._log(logging.DEBUG, msg, *args)
+
+    def info(self, msg, *args):
+        self._log(logging.INFO, msg, *args)
+
+    def warning(self, msg, *args):
+        self._log(logging.WARNING, msg, *args)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics():
+    """Общий для приложения MetricsRegistry."""
+    return _metrics
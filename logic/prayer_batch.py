@@ -0,0 +1,181 @@
+"""
+Prayer Batch Module для MihrEzan.
+Векторный расчет расписаний молитв для множества мест и дат на NumPy.
+
+Та же модель, что и в PrayerTimesCalculator, но все величины считаются
+массивами формы (места × дни), поэтому год для тысячи городов
+рассчитывается примерно за секунду без цикла по дням.
+"""
+
+import numpy as np
+
+from logic.prayer_calc import (
+    METHODS, MISSING_TIME, TIMING_NAMES, _is_minutes, _value,
+    parse_tune, utc_offset_hours,
+)
+
+# Юлианская дата 1970-01-01 0h UT
+_JD_UNIX_EPOCH = 2440587.5
+
+# Значение в результате для времени, которое не существует (полярный день/ночь)
+MISSING = -1
+
+
+def _as_days(dates):
+    """Преобразует последовательность дат в массив datetime64[D]."""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return dates.astype('datetime64[D]')
+    return np.array([np.datetime64(d, 'D') for d in dates], dtype='datetime64[D]')
+
+
+def date_range(start, end):
+    """
+    Массив дат от start до end включительно.
+
+    Args:
+        start, end: date или строка YYYY-MM-DD
+    """
+    return np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+
+
+def _offsets(timezones, days):
+    """
+    Смещения часовых поясов (часы) формы (места × дни).
+
+    Для именованных зон смещение считается один раз на уникальную зону
+    и дату, числовые смещения просто растягиваются по дням.
+    """
+    result = np.empty((len(timezones), len(days)), dtype=float)
+    by_zone = {}
+    py_days = None
+    for i, tz in enumerate(timezones):
+        if isinstance(tz, (int, float, np.number)):
+            result[i] = float(tz)
+            continue
+        if tz not in by_zone:
+            if py_days is None:
+                py_days = days.astype(object)
+            by_zone[tz] = np.array([utc_offset_hours(tz, d) for d in py_days])
+        result[i] = by_zone[tz]
+    return result
+
+
+def _sun_position(jd):
+    d = jd - 2451545.0
+    g = np.radians(np.mod(357.529 + 0.98560028 * d, 360))
+    q = np.mod(280.459 + 0.98564736 * d, 360)
+    ecl_long = np.radians(np.mod(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g), 360))
+    obliquity = np.radians(23.439 - 0.00000036 * d)
+
+    right_asc = np.degrees(np.arctan2(np.cos(obliquity) * np.sin(ecl_long), np.cos(ecl_long))) / 15
+    equation = q / 15 - np.mod(right_asc, 24)
+    declination = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(ecl_long)))
+    return declination, equation
+
+
+class _Batch:
+    """Промежуточные массивы одного пакетного расчета."""
+
+    def __init__(self, jd, lat):
+        self.jd = jd
+        self.lat = lat
+        self.sin_lat = np.sin(np.radians(lat))
+        self.cos_lat = np.cos(np.radians(lat))
+
+    def mid_day(self, portion):
+        _, equation = _sun_position(self.jd + portion)
+        return np.mod(12 - equation, 24)
+
+    def sun_angle_time(self, angle, portion, ccw=False, declination=None):
+        if declination is None:
+            declination, _ = _sun_position(self.jd + portion)
+        noon = self.mid_day(portion)
+        decl = np.radians(declination)
+        cos_t = ((-np.sin(np.radians(angle)) - np.sin(decl) * self.sin_lat) /
+                 (np.cos(decl) * self.cos_lat))
+        t = np.degrees(np.arccos(cos_t)) / 15  # NaN вне [-1, 1]
+        return noon - t if ccw else noon + t
+
+    def asr_time(self, factor, portion):
+        declination, _ = _sun_position(self.jd + portion)
+        angle = -np.degrees(np.arctan(1 / (factor + np.tan(np.radians(np.abs(self.lat - declination))))))
+        return self.sun_angle_time(angle, portion, declination=declination)
+
+
+def _adjust_high_lat(time, base, angle, night, ccw=False):
+    portion = _value(angle) / 60 * night
+    diff = np.mod(base - time, 24) if ccw else np.mod(time - base, 24)
+    replace = np.isnan(time) | (diff > portion)
+    return np.where(replace, base - portion if ccw else base + portion, time)
+
+
+def compute_timetables(dates, locations, method=13, school=0, midnight_mode=0, tune=None):
+    """
+    Рассчитывает времена молитв для всех пар (место, дата) за один проход.
+
+    Args:
+        dates: Последовательность дат (date, 'YYYY-MM-DD' или datetime64)
+        locations: Последовательность (latitude, longitude, timezone), где
+                   timezone - имя зоны IANA или смещение в часах
+        method, school, midnight_mode, tune: Как в PrayerTimesCalculator
+
+    Returns:
+        numpy.ndarray: Массив int16 формы (места × дни × 7) с минутами от
+        местной полуночи в порядке TIMING_NAMES; MISSING, если времени нет
+    """
+    if method not in METHODS:
+        raise ValueError(f"Calculation method {method} is not supported locally")
+    params = METHODS[method]
+    fajr, isha = params['fajr'], params['isha']
+    maghrib = params.get('maghrib', '0 min')
+    offsets = parse_tune(tune)
+
+    days = _as_days(dates)
+    lat = np.array([float(loc[0]) for loc in locations])[:, None]
+    lng = np.array([float(loc[1]) for loc in locations])[:, None]
+    shift = _offsets([loc[2] for loc in locations], days) - lng / 15
+
+    jd = (days.astype('int64') + _JD_UNIX_EPOCH)[None, :] - lng / (15 * 24)
+    batch = _Batch(jd, lat)
+    angle = 0.833
+
+    with np.errstate(invalid='ignore'):
+        t = {
+            'Fajr': batch.sun_angle_time(_value(fajr), 5 / 24, ccw=True),
+            'Sunrise': batch.sun_angle_time(angle, 6 / 24, ccw=True),
+            'Dhuhr': batch.mid_day(12 / 24),
+            'Asr': batch.asr_time(2 if school == 1 else 1, 13 / 24),
+            'Sunset': batch.sun_angle_time(angle, 18 / 24),
+            'Maghrib': batch.sun_angle_time(_value(maghrib), 18 / 24),
+            'Isha': batch.sun_angle_time(_value(isha), 18 / 24),
+        }
+        for name in t:
+            t[name] = t[name] + shift
+
+        night = np.mod(t['Sunrise'] - t['Sunset'], 24)
+        t['Fajr'] = _adjust_high_lat(t['Fajr'], t['Sunrise'], fajr, night, ccw=True)
+        t['Isha'] = _adjust_high_lat(t['Isha'], t['Sunset'], isha, night)
+        t['Maghrib'] = _adjust_high_lat(t['Maghrib'], t['Sunset'], maghrib, night)
+
+        if _is_minutes(maghrib):
+            t['Maghrib'] = t['Sunset'] + _value(maghrib) / 60
+        if _is_minutes(isha):
+            t['Isha'] = t['Maghrib'] + _value(isha) / 60
+
+        end = t['Fajr'] if midnight_mode == 1 else t['Sunrise']
+        t['Midnight'] = t['Sunset'] + np.mod(end - t['Sunset'], 24) / 2
+
+        result = np.empty(jd.shape + (len(TIMING_NAMES),), dtype=np.int16)
+        for i, name in enumerate(TIMING_NAMES):
+            # Округление как в PrayerTimesCalculator.format_time
+            minutes = np.floor(np.mod((t[name] + offsets[name] / 60) * 60 + 0.5, 1440))
+            result[..., i] = np.where(np.isnan(minutes), MISSING, minutes)
+    return result
+
+
+def format_minutes(value):
+    """Переводит минуты от полуночи в строку 'HH:MM'."""
+    value = int(value)
+    if value == MISSING:
+        return MISSING_TIME
+    return f"{value // 60:02d}:{value % 60:02d}"
@@ -0,0 +1,473 @@
+"""
+Prayer Calculation Module для MihrEzan.
+Локальный астрономический расчет времен молитв по положению Солнца.
+
+Алгоритм повторяет расчет, который использует API Aladhan
+(PrayTimes / islamic-network/prayer-times): одна итерация уточнения,
+коррекция высоких широт по углу (latitudeAdjustmentMethod=3),
+округление до ближайшей минуты. Параметры `method`, `school`,
+`midnightMode` и `tune` имеют тот же смысл, что и в запросе к API.
+"""
+
+import json
+import math
+import hashlib
+import logging
+from datetime import datetime, date as date_cls, timedelta, timezone as fixed_timezone
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # pragma: no cover - старые сборки python-for-android
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+logger = logging.getLogger(__name__)
+
+# Порядок времен, которые отдает приложение (как в PRAYER_NAMES_PORTRAIT)
+TIMING_NAMES = ('Midnight', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha')
+
+# Значение времени, которое в этот день не наступает (полярный день/ночь)
+MISSING_TIME = '-----'
+
+# Порядок значений параметра `tune` в API Aladhan
+TUNE_ORDER = ('Imsak', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Sunset', 'Isha', 'Midnight')
+
+# Методы расчета Aladhan: углы Фаджр/Иша (градусы) или интервалы ('90 min')
+METHODS = {
+    0: {'name': 'Shia Ithna-Ansari', 'fajr': 16, 'isha': 14, 'maghrib': 4},
+    1: {'name': 'University of Islamic Sciences, Karachi', 'fajr': 18, 'isha': 18},
+    2: {'name': 'Islamic Society of North America (ISNA)', 'fajr': 15, 'isha': 15},
+    3: {'name': 'Muslim World League', 'fajr': 18, 'isha': 17},
+    4: {'name': 'Umm Al-Qura University, Makkah', 'fajr': 18.5, 'isha': '90 min'},
+    5: {'name': 'Egyptian General Authority of Survey', 'fajr': 19.5, 'isha': 17.5},
+    7: {'name': 'Institute of Geophysics, University of Tehran', 'fajr': 17.7, 'isha': 14, 'maghrib': 4.5},
+    8: {'name': 'Gulf Region', 'fajr': 19.5, 'isha': '90 min'},
+    9: {'name': 'Kuwait', 'fajr': 18, 'isha': 17.5},
+    10: {'name': 'Qatar', 'fajr': 18, 'isha': '90 min'},
+    11: {'name': 'Majlis Ugama Islam Singapura, Singapore', 'fajr': 20, 'isha': 18},
+    12: {'name': 'Union Organization islamic de France', 'fajr': 12, 'isha': 12},
+    13: {'name': 'Diyanet İşleri Başkanlığı, Turkey', 'fajr': 18, 'isha': 17},
+    14: {'name': 'Spiritual Administration of Muslims of Russia', 'fajr': 16, 'isha': 15},
+    16: {'name': 'Dubai', 'fajr': 18.2, 'isha': 18.2},
+    17: {'name': 'Jabatan Kemajuan Islam Malaysia (JAKIM)', 'fajr': 20, 'isha': 18},
+    18: {'name': 'Tunisia', 'fajr': 18, 'isha': 18},
+    19: {'name': 'Algeria', 'fajr': 18, 'isha': 17},
+    20: {'name': 'KEMENAG - Kementerian Agama Republik Indonesia', 'fajr': 20, 'isha': 18},
+    21: {'name': 'Morocco', 'fajr': 19, 'isha': 17},
+    22: {'name': 'Comunidade Islamica de Lisboa', 'fajr': 18, 'maghrib': '3 min', 'isha': '77 min'},
+    23: {'name': 'Ministry of Awqaf, Islamic Affairs and Holy Places, Jordan', 'fajr': 18, 'isha': 18, 'maghrib': '5 min'},
+}
+
+# Координаты городов, которые API определяет по city/country
+KNOWN_LOCATIONS = {
+    ('baku', 'azerbaijan'): (40.3777, 49.892, 'Asia/Baku'),
+}
+
+
+def _is_minutes(value):
+    """Проверяет, задан ли параметр интервалом в минутах ('90 min')."""
+    return isinstance(value, str) and value.endswith('min')
+
+
+def _value(value):
+    """Числовое значение параметра (угол или количество минут)."""
+    return float(value.split()[0]) if isinstance(value, str) else float(value)
+
+
+def parse_tune(tune):
+    """
+    Разбирает параметр tune в словарь смещений в минутах.
+
+    Args:
+        tune: Строка '0,0,0,...' в порядке TUNE_ORDER, список или словарь
+
+    Returns:
+        dict: Смещения в минутах для каждого времени из TUNE_ORDER
+    """
+    offsets = dict.fromkeys(TUNE_ORDER, 0)
+    if not tune:
+        return offsets
+    if isinstance(tune, dict):
+        offsets.update(tune)
+        return offsets
+    if isinstance(tune, str):
+        tune = tune.split(',')
+    for name, value in zip(TUNE_ORDER, tune):
+        offsets[name] = int(value)
+    return offsets
+
+
+def format_tune(offsets):
+    """Обратное преобразование смещений в строку параметра tune."""
+    offsets = parse_tune(offsets)
+    return ','.join(str(offsets[name]) for name in TUNE_ORDER)
+
+
+def calculation_fingerprint(params):
+    """
+    Стабильный отпечаток параметров расчета.
+
+    Args:
+        params (dict): Все параметры, влияющие на времена молитв
+
+    Returns:
+        str: 16 шестнадцатеричных символов
+    """
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+# Постоянные смещения зон (часы) на случай, если в системе нет базы
+# часовых поясов (Android без tzdata); летнего времени в этих зонах нет
+FIXED_OFFSETS = {
+    'Asia/Baku': 4.0,
+    'Europe/Istanbul': 3.0,
+    'Europe/Moscow': 3.0,
+    'Asia/Riyadh': 3.0,
+    'Asia/Tashkent': 5.0,
+}
+
+
+def resolve_location(city, country):
+    """
+    Возвращает (latitude, longitude, timezone) для известного города.
+
+    Raises:
+        ValueError: Если координаты города неизвестны
+    """
+    key = (city.strip().lower(), country.strip().lower())
+    if key not in KNOWN_LOCATIONS:
+        raise ValueError(f"Unknown location {city}, {country}: pass latitude/longitude/timezone")
+    return KNOWN_LOCATIONS[key]
+
+
+@lru_cache(maxsize=None)
+def get_timezone(timezone):
+    """
+    tzinfo для зоны IANA или смещения в часах.
+
+    Без базы часовых поясов зона из FIXED_OFFSETS заменяется постоянным
+    смещением, чтобы расчет работал и на устройствах без tzdata.
+
+    Raises:
+        ValueError: Если зона неизвестна и смещение для нее не задано
+    """
+    if isinstance(timezone, (int, float)):
+        return fixed_timezone(timedelta(hours=timezone))
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    if timezone in FIXED_OFFSETS:
+        logger.warning("Time zone %s not found, using fixed UTC%+g", timezone, FIXED_OFFSETS[timezone])
+        return fixed_timezone(timedelta(hours=FIXED_OFFSETS[timezone]))
+    raise ValueError(f"Time zone {timezone} not found: install tzdata or pass a numeric offset")
+
+
+def utc_offset_hours(timezone, day):
+    """
+    Смещение часового пояса от UTC в часах на указанную дату.
+
+    Args:
+        timezone: Имя зоны IANA ('Asia/Baku') или число часов
+        day (date): Дата, для которой учитывается летнее время
+    """
+    if isinstance(timezone, (int, float)):
+        return float(timezone)
+    noon = datetime(day.year, day.month, day.day, 12, tzinfo=get_timezone(timezone))
+    return noon.utcoffset().total_seconds() / 3600.0
+
+
+def julian_day(year, month, day):
+    """Юлианская дата на 0h UT указанного григорианского дня."""
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+def _dsin(d):
+    return math.sin(math.radians(d))
+
+
+def _dcos(d):
+    return math.cos(math.radians(d))
+
+
+def _fix(a, b):
+    if math.isnan(a):
+        return a
+    a = a - b * math.floor(a / b)
+    return a + b if a < 0 else a
+
+
+def sun_position(jd):
+    """
+    Склонение Солнца и уравнение времени для юлианской даты.
+
+    Returns:
+        tuple: (склонение в градусах, уравнение времени в часах)
+    """
+    d = jd - 2451545.0
+    g = _fix(357.529 + 0.98560028 * d, 360)
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    ecl_long = _fix(q + 1.915 * _dsin(g) + 0.020 * _dsin(2 * g), 360)
+    obliquity = 23.439 - 0.00000036 * d
+
+    right_asc = math.degrees(math.atan2(_dcos(obliquity) * _dsin(ecl_long), _dcos(ecl_long))) / 15
+    equation = q / 15 - _fix(right_asc, 24)
+    declination = math.degrees(math.asin(_dsin(obliquity) * _dsin(ecl_long)))
+    return declination, equation
+
+
+class PrayerTimesCalculator:
+    """
+    Локальный источник времен молитв с интерфейсом PrayerTimesAPI.
+
+    Attributes:
+        city (str): Город (для meta в ответе)
+        country (str): Страна (для meta в ответе)
+        method (int): Метод расчета Aladhan (13 - Diyanet, Турция)
+        school (int): 0 - Шафии (стандартный Аср), 1 - Ханафи
+        midnight_mode (int): 0 - середина от заката до восхода, 1 - до Фаджра (Джафари)
+        tune (dict): Смещения времен в минутах
+        latitude, longitude (float): Координаты
+        timezone: Имя зоны IANA или смещение в часах
+    """
+
+    is_local = True
+    IMSAK_MINUTES = 10  # Имсак Aladhan по умолчанию: за 10 минут до Фаджра
+
+    def __init__(self, city="Baku", country="Azerbaijan", method=13, school=0,
+                 midnight_mode=0, tune=None, latitude=None, longitude=None,
+                 timezone=None):
+        if method not in METHODS:
+            raise ValueError(f"Calculation method {method} is not supported locally")
+        if latitude is None or longitude is None:
+            latitude, longitude, known_tz = resolve_location(city, country)
+            timezone = timezone if timezone is not None else known_tz
+        self.city = city
+        self.country = country
+        self.method = method
+        self.school = school
+        self.midnight_mode = midnight_mode
+        self.tune = parse_tune(tune)
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.timezone = timezone if timezone is not None else 0
+
+        params = METHODS[method]
+        self._fajr = params['fajr']
+        self._isha = params['isha']
+        self._maghrib = params.get('maghrib', '0 min')
+
+    # --- Астрономия --------------------------------------------------
+
+    def _mid_day(self, jd, portion):
+        _, equation = sun_position(jd + portion)
+        return _fix(12 - equation, 24)
+
+    def _sun_angle_time(self, jd, angle, portion, ccw=False):
+        declination, _ = sun_position(jd + portion)
+        noon = self._mid_day(jd, portion)
+        cos_t = ((-_dsin(angle) - _dsin(declination) * _dsin(self.latitude)) /
+                 (_dcos(declination) * _dcos(self.latitude)))
+        if not -1 <= cos_t <= 1:
+            return math.nan  # Солнце не опускается на этот угол
+        t = math.degrees(math.acos(cos_t)) / 15
+        return noon - t if ccw else noon + t
+
+    def _asr_time(self, jd, portion):
+        declination, _ = sun_position(jd + portion)
+        factor = 2 if self.school == 1 else 1
+        angle = -math.degrees(math.atan(1 / (factor + math.tan(math.radians(abs(self.latitude - declination))))))
+        return self._sun_angle_time(jd, angle, portion)
+
+    @staticmethod
+    def _time_diff(t1, t2):
+        return _fix(t2 - t1, 24)
+
+    def _adjust_high_lat(self, time, base, angle, night, ccw=False):
+        portion = _value(angle) / 60 * night
+        diff = self._time_diff(time, base) if ccw else self._time_diff(base, time)
+        if math.isnan(time) or diff > portion:
+            return base - portion if ccw else base + portion
+        return time
+
+    def compute_hours(self, day):
+        """
+        Рассчитывает времена молитв в часах местного времени.
+
+        Args:
+            day (date): Григорианская дата
+
+        Returns:
+            dict: Время в часах (float, без округления) для каждого имени,
+                  включая Imsak и Sunset
+        """
+        jd = julian_day(day.year, day.month, day.day) - self.longitude / (15 * 24)
+        angle = 0.833  # Рефракция и радиус диска, высота над уровнем моря 0
+
+        # Начальные приближения (часы / 24), одна итерация как в Aladhan
+        t = {
+            'Fajr': self._sun_angle_time(jd, _value(self._fajr), 5 / 24, ccw=True),
+            'Sunrise': self._sun_angle_time(jd, angle, 6 / 24, ccw=True),
+            'Dhuhr': self._mid_day(jd, 12 / 24),
+            'Asr': self._asr_time(jd, 13 / 24),
+            'Sunset': self._sun_angle_time(jd, angle, 18 / 24),
+            'Maghrib': self._sun_angle_time(jd, _value(self._maghrib), 18 / 24),
+            'Isha': self._sun_angle_time(jd, _value(self._isha), 18 / 24),
+        }
+
+        shift = utc_offset_hours(self.timezone, day) - self.longitude / 15
+        for name in t:
+            t[name] += shift
+
+        # Коррекция высоких широт по углу (latitudeAdjustmentMethod=3)
+        night = self._time_diff(t['Sunset'], t['Sunrise'])
+        t['Fajr'] = self._adjust_high_lat(t['Fajr'], t['Sunrise'], self._fajr, night, ccw=True)
+        t['Isha'] = self._adjust_high_lat(t['Isha'], t['Sunset'], self._isha, night)
+        t['Maghrib'] = self._adjust_high_lat(t['Maghrib'], t['Sunset'], self._maghrib, night)
+
+        t['Imsak'] = t['Fajr'] - self.IMSAK_MINUTES / 60
+        if _is_minutes(self._maghrib):
+            t['Maghrib'] = t['Sunset'] + _value(self._maghrib) / 60
+        if _is_minutes(self._isha):
+            t['Isha'] = t['Maghrib'] + _value(self._isha) / 60
+
+        if self.midnight_mode == 1:
+            t['Midnight'] = t['Sunset'] + self._time_diff(t['Sunset'], t['Fajr']) / 2
+        else:
+            t['Midnight'] = t['Sunset'] + self._time_diff(t['Sunset'], t['Sunrise']) / 2
+
+        for name, offset in self.tune.items():
+            t[name] += offset / 60
+        return t
+
+    @staticmethod
+    def format_time(hours):
+        """Округляет время в часах до минут в формате 'HH:MM'."""
+        if math.isnan(hours):
+            return MISSING_TIME
+        hours = _fix(hours + 0.5 / 60, 24)
+        h = math.floor(hours)
+        m = math.floor((hours - h) * 60)
+        return f"{h:02d}:{m:02d}"
+
+    def get_timings(self, day):
+        """
+        Возвращает времена молитв для даты.
+
+        Args:
+            day (date): Григорианская дата
+
+        Returns:
+            dict: {'Midnight': 'HH:MM', 'Fajr': ..., 'Isha': ...}
+        """
+        hours = self.compute_hours(day)
+        return {name: self.format_time(hours[name]) for name in TIMING_NAMES}
+
+    # --- Интерфейс PrayerTimesAPI ------------------------------------
+
+    def fingerprint_params(self):
+        """Параметры расчета в нормализованном виде для ключа кэша."""
+        return {
+            'source': 'local',
+            'method': self.method,
+            'school': self.school,
+            'midnightMode': self.midnight_mode,
+            'tune': format_tune(self.tune),
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'timezone': self.timezone,
+        }
+
+    @property
+    def fingerprint(self):
+        """Отпечаток всех параметров расчета."""
+        return calculation_fingerprint(self.fingerprint_params())
+
+    def get_prayer_times(self, date=None):
+        """
+        Рассчитывает времена молитв в формате ответа API Aladhan.
+
+        Args:
+            date (str, optional): Дата в формате YYYY-MM-DD. По умолчанию - сегодня.
+
+        Returns:
+            dict: Данные в формате {'code': 200, 'data': {...}} или None
+        """
+        try:
+            if date is None:
+                day = date_cls.today()
+            else:
+                day = datetime.strptime(date, '%Y-%m-%d').date()
+            timings = self.get_timings(day)
+        except ValueError as e:
+            logger.error(f"Local prayer time calculation failed: {e}")
+            return None
+
+        return {
+            'code': 200,
+            'status': 'OK',
+            'data': {
+                'timings': timings,
+                'date': {
+                    'readable': day.strftime('%d %b %Y'),
+                    'timestamp': str(int(datetime(day.year, day.month, day.day).timestamp())),
+                    'gregorian': {
+                        'date': day.strftime('%d-%m-%Y'),
+                        'format': 'DD-MM-YYYY',
+                        'day': day.strftime('%d'),
+                        'weekday': {'en': day.strftime('%A')},
+                        'month': {'number': day.month, 'en': day.strftime('%B')},
+                        'year': str(day.year),
+                    },
+                },
+                'meta': {
+                    'latitude': self.latitude,
+                    'longitude': self.longitude,
+                    'timezone': str(self.timezone),
+                    'method': {
+                        'id': self.method,
+                        'name': METHODS[self.method]['name'],
+                        'params': {'Fajr': self._fajr, 'Isha': self._isha},
+                    },
+                    'latitudeAdjustmentMethod': 'ANGLE_BASED',
+                    'midnightMode': 'JAFARI' if self.midnight_mode == 1 else 'STANDARD',
+                    'school': 'HANAFI' if self.school == 1 else 'STANDARD',
+                    'offset': dict(self.tune),
+                    'city': self.city,
+                    'country': self.country,
+                },
+            },
+        }
+
+    def get_prayer_times_range(self, start_date, end_date):
+        """
+        Рассчитывает времена молитв для диапазона дат.
+
+        Args:
+            start_date (str): Начальная дата в формате YYYY-MM-DD
+            end_date (str): Конечная дата в формате YYYY-MM-DD
+
+        Returns:
+            dict: Словарь с временами молитв для каждой даты
+        """
+        try:
+            current = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError as e:
+            logger.error(f"Invalid date format: {e}")
+            return None
+
+        results = {}
+        while current <= end:
+            date_str = current.isoformat()
+            results[date_str] = self.get_prayer_times(date_str)
+            current += timedelta(days=1)
+        return results
@@ -0,0 +1,159 @@
+"""
+Prayer Index Module для MihrEzan.
+Скользящий индекс ближайших молитв в секундах эпохи.
+
+Вместо сортировки строк 'HH:MM' и strptime на каждый запрос моменты
+молитв хранятся отсортированным списком на 48+ часов вперед; поиск
+следующей молитвы - один bisect. Индекс дополняется следующими днями,
+только когда его покрытие становится меньше горизонта.
+"""
+
+import time
+from bisect import bisect_right
+from datetime import date as date_cls, datetime, timedelta
+
+from logic.prayer_calc import MISSING_TIME, TIMING_NAMES
+
+
+def prayer_instants(day, timings):
+    """
+    Переводит расписание дня в моменты времени.
+
+    Полночь (Midnight) после 00:00 относится к ночи после этого дня,
+    поэтому переносится на следующие сутки. Времена, которых в этот день
+    нет (MISSING_TIME в высоких широтах), пропускаются.
+
+    Args:
+        day (date): Григорианский день расписания
+        timings (dict): Время 'HH:MM' по именам TIMING_NAMES
+
+    Returns:
+        list: [(секунды эпохи, имя)] в порядке TIMING_NAMES
+    """
+    maghrib = timings['Maghrib']
+    if maghrib == MISSING_TIME:
+        maghrib = None
+    instants = []
+    for name in TIMING_NAMES:
+        value = timings[name]
+        if value == MISSING_TIME:
+            continue
+        moment = datetime(day.year, day.month, day.day, int(value[:2]), int(value[3:5]))
+        if name == 'Midnight' and maghrib is not None and value < maghrib:
+            moment += timedelta(days=1)
+        # Локальное время -> эпоха с учетом перехода на летнее время
+        instants.append((moment.timestamp(), name))
+    instants.sort()
+    return instants
+
+
+class PrayerIndex:
+    """
+    Отсортированные моменты молитв на ближайшие сутки и больше.
+
+    Attributes:
+        load_schedule: Функция (дата YYYY-MM-DD) -> DaySchedule или None
+        horizon (float): Минимальное покрытие вперед, в секундах
+        clock: Источник текущего времени в секундах эпохи
+    """
+
+    HORIZON = 48 * 3600
+    RETRY_INTERVAL = 60  # Повтор, если расписание дня недоступно
+    KEEP_PAST = 24 * 3600  # Сколько прошедших моментов хранить для current()
+
+    def __init__(self, load_schedule, horizon=HORIZON, clock=time.time):
+        self.load_schedule = load_schedule
+        self.horizon = horizon
+        self.clock = clock
+        self.rebuilds = 0  # Сколько раз индекс дополнялся
+        self.invalidate()
+
+    def invalidate(self):
+        """Сбрасывает индекс (например, при смене настроек)."""
+        self._times = []
+        self._names = []
+        self._next_day = None
+        self._refresh_at = float('-inf')
+
+    def _ensure(self, now):
+        if self._times and now < self._times[0]:
+            self.invalidate()  # Часы переведены назад
+        if now < self._refresh_at:
+            return
+        self.rebuilds += 1
+        yesterday = date_cls.fromtimestamp(now) - timedelta(days=1)
+        if self._next_day is None or self._next_day < yesterday:
+            # Первое построение или часы ушли вперед (например, после сна).
+            # Начинаем со вчера, чтобы не потерять ночную полночь предыдущего дня
+            self.invalidate()
+            self._next_day = yesterday
+
+        # Отбрасываем давно прошедшие моменты
+        start = bisect_right(self._times, now - self.KEEP_PAST)
+        if start:
+            del self._times[:start], self._names[:start]
+
+        while not self._times or self._times[-1] < now + self.horizon:
+            schedule = self.load_schedule(self._next_day.isoformat())
+            if schedule is None:
+                self._refresh_at = now + self.RETRY_INTERVAL
+                return
+            for moment, name in prayer_instants(self._next_day, schedule.timings):
+                self._times.append(moment)
+                self._names.append(name)
+            self._next_day += timedelta(days=1)
+        self._refresh_at = self._times[-1] - self.horizon
+
+    def next(self, now=None):
+        """
+        Следующая молитва.
+
+        Returns:
+            tuple: (имя, секунды эпохи) или (None, None)
+        """
+        now = self.clock() if now is None else now
+        self._ensure(now)
+        i = bisect_right(self._times, now)
+        if i == len(self._times):
+            return None, None
+        return self._names[i], self._times[i]
+
+    def current(self, now=None):
+        """
+        Последняя наступившая молитва.
+
+        Returns:
+            tuple: (имя, секунды эпохи) или (None, None)
+        """
+        now = self.clock() if now is None else now
+        self._ensure(now)
+        i = bisect_right(self._times, now)
+        if i == 0:
+            return None, None
+        return self._names[i - 1], self._times[i - 1]
+
+    def time_until(self, now=None):
+        """
+        Следующая молитва и время до нее.
+
+        Returns:
+            tuple: (имя, секунды до молитвы) или (None, None)
+        """
+        now = self.clock() if now is None else now
+        name, moment = self.next(now)
+        if name is None:
+            return None, None
+        return name, moment - now
+
+    def upcoming(self, now=None, until=None):
+        """
+        Моменты молитв после now (включительно до until).
+
+        Returns:
+            list: [(секунды эпохи, имя)] по возрастанию
+        """
+        now = self.clock() if now is None else now
+        self._ensure(now)
+        start = bisect_right(self._times, now)
+        end = len(self._times) if until is None else bisect_right(self._times, until)
+        return list(zip(self._times[start:end], self._names[start:end]))
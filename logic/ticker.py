@@ -0,0 +1,63 @@
+"""
+Ticker Module для MihrEzan.
+Тик, привязанный к границам секунд настенных часов.
+
+Clock.schedule_interval отсчитывает интервалы от момента запуска и
+накапливает опоздания кадров, поэтому мигание двоеточия уплывает
+относительно реальных секунд. Здесь каждый тик - одноразовый таймер до
+следующей границы интервала по time.time(), а в callback передается
+сама граница, а не момент срабатывания.
+"""
+
+import time
+
+from kivy.clock import Clock
+
+
+class WallClockTicker:
+    """
+    Вызывает callback(граница) на каждой границе interval настенного времени.
+
+    Attributes:
+        callback: Функция (секунды эпохи границы)
+        interval (float): Шаг в секундах (делитель секунды: 0.5, 1)
+        clock: Источник настенного времени
+        schedule_once: Функция (callback, delay) -> событие с cancel()
+        max_error (float): Наибольшее отклонение срабатывания от границы, с
+    """
+
+    def __init__(self, callback, interval=0.5, clock=time.time, schedule_once=None):
+        self.callback = callback
+        self.interval = interval
+        self.clock = clock
+        self.schedule_once = schedule_once or Clock.schedule_once
+        self.ticks = 0
+        self.max_error = 0.0
+        self._event = None
+
+    def start(self):
+        """Сразу вызывает callback для текущего интервала и запускает тики."""
+        self.stop()
+        now = self.clock()
+        self.callback(now - now % self.interval)
+        self._arm(now)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _arm(self, now):
+        # Следующая граница строго после now
+        boundary = (int(now / self.interval) + 1) * self.interval
+        self._event = self.schedule_once(self._tick, boundary - now)
+
+    def _tick(self, *args):
+        now = self.clock()
+        # Таймер Kivy срабатывает на кадре рядом с границей, чуть раньше
+        # или позже; ближайшая граница и есть та, ради которой он взведен
+        boundary = round(now / self.interval) * self.interval
+        self.max_error = max(self.max_error, abs(now - boundary))
+        self.ticks += 1
+        self.callback(boundary)
+        self._arm(max(now, boundary))
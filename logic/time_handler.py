@@ -6,8 +6,8 @@ class TimeHandler:
     NBSP = chr(0x00A0)
     
     @staticmethod
-    def get_formatted_time(show_colon=True):
+    def get_formatted_time(show_colon=True, now=None):
         """Форматирование времени с двоеточием или пробелом"""
-        current_time = datetime.now().strftime("%H%M")
+        current_time = (now or datetime.now()).strftime("%H%M")
         separator = ':' if show_colon else TimeHandler.NBSP
         return f"{current_time[:2]}{separator}{current_time[2:]}"
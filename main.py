@@ -3,7 +3,7 @@ import kivy
 kivy.require('2.2.1')
 
 import logging
-logging.basicConfig(level=logging.DEBUG,
+logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -13,46 +13,77 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.clock import Clock
 from kivy.animation import Animation
 
-from ui.portrait_clock import PortraitClockLayout
-from ui.landscape_clock import LandscapeClockLabel
+from ui.colors import COLORS
+from data.database import flush_settings, get_settings_database
+from data.data_worker import shutdown_data_worker
+from logic.metrics import MetricsReporter
+from logic.ticker import WallClockTicker
+# Виджеты часов, планировщик и проигрыватель импортируются по месту:
+# до первого кадра загружается только нужное для него
 
 class ClockApp(App):
+    TRANSITION = 0.15  # Длительность анимации смены ориентации, с
+    
     # Список доступных цветов
-    colors = {
-        'lime': (0, 1, 0, 1),
-        'aqua': (0, 1, 1, 1),
-        'blue': (0, 0, 1, 1),
-        'red': (1, 0, 0, 1),
-        'yellow': (1, 1, 0, 1),
-        'magenta': (1, 0, 1, 1),
-        'pink': (1, 0.75, 0.8, 1),
-        'grey': (0.7, 0.7, 0.7, 1),
-        'white': (1, 1, 1, 1)
-    }
+    colors = COLORS
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.clock_label = None
         self.current_orientation = None
+        # 'label' - шрифт DSEG7, 'segments' - сегменты на canvas (дешевле на слабых устройствах)
+        self.renderer = 'label'
+        # 'clock' - часы с датами, 'dashboard' - табло с временами молитв нескольких городов
+        self.layout_mode = 'clock'
+        self._orientation_widgets = {}
+        self.adhan_player = None
+        self.alarm_scheduler = None
+        self.metrics_reporter = MetricsReporter()
         
     def build(self):
         # Черный фон
         Window.clearcolor = (0, 0, 0, 1)
+        self.renderer = get_settings_database().get_setting('clock_renderer') or 'label'
+        self.layout_mode = get_settings_database().get_setting('layout') or 'clock'
         
         # Использование FloatLayout для гибкого размещения
         self.layout = FloatLayout()
         
-        # Определение initial orientation
-        self.check_and_set_orientation()
+        if self.layout_mode == 'dashboard':
+            # Табло одно для обеих ориентаций
+            self.show_dashboard()
+        else:
+            # Определение initial orientation
+            self.check_and_set_orientation()
+            
+            # Привязка события изменения размера
+            Window.bind(on_resize=self.on_window_resize)
         
-        # Привязка события изменения размера
-        Window.bind(on_resize=self.on_window_resize)
+        # Запуск обновления времени на границах полусекунд настенных часов
+        self.ticker = WallClockTicker(self.update_time, interval=0.5)
+        self.ticker.start()
         
-        # Запуск обновления времени
-        Clock.schedule_interval(self.update_time, 0.5)
+        # Напоминания о молитвах запускаются после первого кадра
+        Window.bind(on_flip=self._on_first_frame)
         
         return self.layout
     
+    def _on_first_frame(self, *args):
+        Window.unbind(on_flip=self._on_first_frame)
+        Clock.schedule_once(self.start_background_services, 0)
+    
+    def start_background_services(self, *args):
+        """Напоминания о молитвах (если включены): один таймер на ближайшее событие"""
+        from logic.adhan_player import AdhanPlayer, CLIPS_SETTING, ENABLED_SETTING, is_enabled, load_clips
+        db = get_settings_database()
+        if is_enabled(db.get_setting(ENABLED_SETTING)):
+            from logic.alarm_scheduler import get_alarm_scheduler
+            self.alarm_scheduler = get_alarm_scheduler()
+            self.adhan_player = AdhanPlayer(clips=load_clips(db.get_setting(CLIPS_SETTING)))
+            self.adhan_player.attach(self.alarm_scheduler)
+            self.alarm_scheduler.start()
+        self.metrics_reporter.start()
+    
     def on_window_resize(self, instance, width, height):
         """Обработчик изменения размера окна с задержкой"""
         # Отменяем предыдущий запланированный вызов, если он есть
@@ -84,6 +115,41 @@ class ClockApp(App):
             
         self.switch_orientation(new_orientation)
     
+    def get_orientation_widget(self, orientation):
+        """
+        Виджет часов для ориентации. Создается один раз и переиспользуется,
+        поэтому повороты не плодят подписки, таймеры и соединения с базой.
+        """
+        widget = self._orientation_widgets.get(orientation)
+        if widget is None:
+            segments = self.renderer == 'segments'
+            if orientation == 'landscape':
+                if segments:
+                    from ui.segment_clock import LandscapeSegmentClock as widget_class
+                else:
+                    from ui.landscape_clock import LandscapeClockLabel as widget_class
+                widget = widget_class()
+            else:
+                from ui.portrait_clock import PortraitClockLayout
+                clock_class = None
+                if segments:
+                    from ui.segment_clock import PortraitSegmentClock as clock_class
+                widget = PortraitClockLayout(clock_class=clock_class)
+            self._orientation_widgets[orientation] = widget
+        return widget
+    
+    def show_dashboard(self):
+        """Табло городов вместо часов; строки обновляются по событиям модели"""
+        from ui.dashboard import DashboardLayout
+        self.clock_widget = DashboardLayout()
+        self.clock_widget.attach()
+        self.layout.add_widget(self.clock_widget)
+    
+    @staticmethod
+    def _clock_of(widget):
+        """Сам виджет часов (в портретной раскладке он вложен)"""
+        return getattr(widget, 'clock_label', widget)
+    
     def switch_orientation(self, new_orientation):
         """
         Плавное переключение между портретной и ландшафтной ориентациями.
@@ -92,51 +158,70 @@ class ClockApp(App):
             new_orientation (str): Новая ориентация ('landscape' или 'portrait')
             
         Реализует:
-        1. Создание нового виджета для выбранной ориентации
+        1. Подключение кэшированного виджета для выбранной ориентации
         2. Передачу текущих настроек цвета
-        3. Плавную анимацию перехода между виджетами
+        3. Плавную анимацию перехода и отключение старого виджета
         """
-        # Создаем новый виджет в соответствии с ориентацией
-        new_widget = LandscapeClockLabel() if new_orientation == 'landscape' else PortraitClockLayout()
-        new_widget.opacity = 0
+        # Завершаем незаконченный переход: старый виджет снимается в on_complete
+        for child in list(self.layout.children):
+            Animation.stop_all(child)
         
-        # Добавляем новый виджет в layout
-        self.layout.add_widget(new_widget)
+        new_widget = self.get_orientation_widget(new_orientation)
+        old_widget = getattr(self, 'clock_widget', None)
+        new_widget.opacity = 0
+        new_widget.attach()
+        if new_widget.parent is None:
+            self.layout.add_widget(new_widget)
         
         # Если есть предыдущий виджет, выполняем плавный переход
-        if hasattr(self, 'clock_widget'):
+        if old_widget is not None:
             # Передаем цвет от старого виджета к новому
-            if hasattr(self.clock_widget, 'clock_label'):
-                new_widget.color = self.clock_widget.clock_label.color
-            else:
-                new_widget.color = self.clock_widget.color
+            self._clock_of(new_widget).color = self._clock_of(old_widget).color
                 
             # Анимация затухания старого виджета
-            anim_old = Animation(opacity=0, duration=0.15)
+            anim_old = Animation(opacity=0, duration=self.TRANSITION)
             
             def on_complete(*args):
-                self.layout.remove_widget(self.clock_widget)
-                self.clock_widget = new_widget
+                # Снимаем подписки и убираем с экрана; сам виджет остается в кэше
+                old_widget.detach()
+                self.layout.remove_widget(old_widget)
             
             anim_old.bind(on_complete=on_complete)
-            anim_old.start(self.clock_widget)
-        else:
-            self.clock_widget = new_widget
+            anim_old.start(old_widget)
+        self.clock_widget = new_widget
         
         # Анимация появления нового виджета
-        anim_new = Animation(opacity=1, duration=0.15)
+        anim_new = Animation(opacity=1, duration=self.TRANSITION)
         anim_new.start(new_widget)
         
         # Сохраняем текущую ориентацию
         self.current_orientation = new_orientation
     
-    def update_time(self, dt):
-        """Обновление времени и переключение видимости двоеточия"""
+    def on_resume(self):
+        """После сна устройства настенные часы могли уйти вперед"""
+        if self.alarm_scheduler is not None:
+            self.alarm_scheduler.resync()
+    
+    def on_stop(self):
+        """Останавливаем фоновые потоки и сохраняем настройки при выходе"""
+        self.ticker.stop()
+        Window.unbind(on_flip=self._on_first_frame)
+        if self.alarm_scheduler is not None:
+            self.alarm_scheduler.stop()
+        if self.adhan_player is not None:
+            self.adhan_player.stop()
+        shutdown_data_worker()
+        flush_settings()
+        self.metrics_reporter.stop()
+        self.metrics_reporter.report()
+    
+    def update_time(self, now):
+        """Обновление времени и видимости двоеточия (now - граница полусекунды)"""
         if hasattr(self, 'clock_widget'):
-            if isinstance(self.clock_widget, PortraitClockLayout):
-                self.clock_widget.clock_label.toggle_colon_visibility()
-            else:
-                self.clock_widget.toggle_colon_visibility()
+            self._clock_of(self.clock_widget).update_clock(now)
+        if self.alarm_scheduler is not None:
+            # Перевод часов замечается в течение тика, а не при срабатывании таймера
+            self.alarm_scheduler.check_clock()
 
     def update_color(self, color_name):
         """Обновление цвета часов"""
@@ -145,11 +230,7 @@ class ClockApp(App):
                 # Преобразуем название цвета в нижний регистр
                 color_key = color_name.lower()
                 color_tuple = self.colors.get(color_key, (1, 1, 1, 1))
-                
-                if isinstance(self.clock_widget, PortraitClockLayout):
-                    self.clock_widget.clock_label.color = color_tuple
-                else:
-                    self.clock_widget.color = color_tuple
+                self._clock_of(self.clock_widget).color = color_tuple
         except Exception as e:
             logger.error(f"Error updating color: {e}")
 
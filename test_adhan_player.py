@@ -0,0 +1,96 @@
+import os
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from logic.adhan_player import DEFAULT_CLIPS, AdhanPlayer, SoundCache, is_enabled, load_clips
+from logic.alarm_scheduler import AlarmEvent
+
+
+class FakeSound:
+    def __init__(self, source, stream):
+        self.source, self.stream = source, stream
+        self.state = 'stop'
+        self.unloaded = False
+
+    def play(self):
+        self.state = 'play'
+
+    def stop(self):
+        self.state = 'stop'
+
+    def unload(self):
+        self.unloaded = True
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.timers = []
+
+    def __call__(self):
+        return self.now
+
+    def schedule_once(self, callback, delay):
+        timer = [callback, delay]
+        self.timers.append(timer)
+        timer_obj = type('Timer', (), {'cancel': lambda _: self.timers.remove(timer)})()
+        return timer_obj
+
+
+def make_player(now=1000.0):
+    clock = FakeClock(now)
+    loaded = []
+
+    def loader(path, stream):
+        loaded.append((os.path.basename(path), stream))
+        return FakeSound(path, stream)
+
+    player = AdhanPlayer(loader=loader, clock=clock, schedule_once=clock.schedule_once)
+    return player, clock, loaded
+
+
+def test_preload_before_event_and_stream_long_clips():
+    player, clock, loaded = make_player()
+    event = AlarmEvent(clock.now + 600, 'prayer', 'Fajr', 0, 0.0)
+    player.schedule_preload(event)
+    assert [delay for _, delay in clock.timers] == [600 - AdhanPlayer.PRELOAD_LEAD]
+
+    callback, _ = clock.timers.pop()
+    callback(0)
+    # Запись азана (3 МБ) открывается потоково, короткий сигнал - нет
+    assert loaded == [('AdhanAhmedAlNufais.mp3', True)]
+    player.prepare('pre_alert')
+    assert loaded[-1] == ('zil.mp3', False)
+
+    clock.now = event.due + 0.02
+    assert abs(player.play(event) - 0.02) < 1e-9
+    assert len(loaded) == 2  # В момент события ничего не загружается
+    assert player.stats()['count'] == 1
+
+
+def test_silent_events_are_not_preloaded():
+    player, clock, loaded = make_player()
+    player.schedule_preload(AlarmEvent(clock.now + 60, 'midnight', '2024-01-01', 0, 0.0))
+    assert clock.timers == []
+    assert player.play(AlarmEvent(clock.now, 'midnight', '2024-01-01', 0, 0.0)) is None
+    assert loaded == []
+
+
+def test_cache_evicts_and_unloads():
+    sounds = []
+    cache = SoundCache(lambda path, stream: sounds.append(FakeSound(path, stream)) or sounds[-1], capacity=2)
+    for path in ('a', 'b', 'a', 'c'):
+        cache.get(path)
+    assert cache.loads == 3
+    assert 'b' not in cache and len(cache) == 2
+    assert [s.unloaded for s in sounds] == [False, True, False]
+
+
+def test_clips_and_switch_from_settings():
+    assert not is_enabled(None) and not is_enabled('0') and is_enabled('1')
+    assert load_clips(None) == DEFAULT_CLIPS
+    clips = load_clips('{"prayer": "ezan.aac", "pre_alert": null, "bogus": "x.mp3"}')
+    assert clips == {'prayer': 'ezan.aac', 'pre_alert': None, 'midnight': None}
+    assert load_clips('not json') == DEFAULT_CLIPS
+    assert load_clips('{"prayer": 5}') == DEFAULT_CLIPS
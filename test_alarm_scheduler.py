@@ -0,0 +1,159 @@
+import os
+import time
+from datetime import datetime
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.clock import Clock
+
+from data.data_worker import DataWorker, direct_dispatch
+from logic.alarm_scheduler import PRE_ALERTS_SETTING, AlarmScheduler, parse_pre_alerts
+
+
+class StubManager:
+    def __init__(self, items):
+        self.items = items
+        self.calls = 0
+
+    def get_upcoming_prayers(self, until=None, now=None):
+        self.calls += 1
+        return [item for item in self.items if until is None or item[0] <= until]
+
+
+class FakeTimers:
+    """Часы и одноразовые таймеры под управлением теста."""
+
+    class Timer:
+        def __init__(self, timers, callback, due):
+            self.timers, self.callback, self.due = timers, callback, due
+
+        def cancel(self):
+            self.timers.active.remove(self)
+
+    def __init__(self, now):
+        self.wall = now
+        self.mono = 0.0
+        self.active = []
+
+    def schedule_once(self, callback, delay):
+        timer = self.Timer(self, callback, self.mono + delay)
+        self.active.append(timer)
+        return timer
+
+    def advance(self, seconds, wall_jump=0.0):
+        """Идет время; срабатывают наступившие таймеры."""
+        self.mono += seconds
+        self.wall += seconds + wall_jump
+        for timer in [t for t in self.active if t.due <= self.mono]:
+            self.active.remove(timer)
+            timer.callback(0)
+
+
+def make_scheduler(items, now, **kwargs):
+    timers = FakeTimers(now)
+    manager = StubManager(items)
+    worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+    scheduler = AlarmScheduler(data_worker=worker, clock=lambda: timers.wall,
+                               monotonic=lambda: timers.mono, schedule_once=timers.schedule_once,
+                               **kwargs)
+    fired = []
+    scheduler.bind(on_alarm=lambda instance, event: fired.append(event))
+    scheduler.start()
+    worker.shutdown(wait=True)
+    # Дальнейшие перечитывания выполняются синхронно
+    worker.call = lambda method, callback=None, **kw: callback(getattr(manager, method)(**kw))
+    return scheduler, timers, manager, fired
+
+
+NOW = datetime(2023, 11, 14, 6, 0).timestamp()
+
+
+def test_single_timer_and_event_order():
+    items = [(NOW + 3600, 'Dhuhr'), (NOW + 7200, 'Sunrise'), (NOW + 9000, 'Asr')]
+    scheduler, timers, _, fired = make_scheduler(items, NOW, pre_alerts=(10,))
+
+    kinds = [(e.kind, e.name) for e in scheduler.pending()]
+    assert kinds[:4] == [('pre_alert', 'Dhuhr'), ('prayer', 'Dhuhr'), ('pre_alert', 'Asr'), ('prayer', 'Asr')]
+    assert len(timers.active) == 1
+    assert timers.active[0].due == 3000
+
+    timers.advance(3000)
+    timers.advance(600)
+    assert [(e.kind, e.name, e.late) for e in fired] == [('pre_alert', 'Dhuhr', 0), ('prayer', 'Dhuhr', 0)]
+    assert len(timers.active) == 1
+
+
+def test_wall_clock_jump_forward_skips_missed_and_reloads():
+    items = [(NOW + 3600, 'Dhuhr'), (NOW + 9000, 'Asr')]
+    scheduler, timers, manager, fired = make_scheduler(items, NOW, pre_alerts=())
+
+    # Часы переведены на час вперед; таймер Kivy этого не заметил
+    timers.advance(3600, wall_jump=3600)
+    assert fired == []
+    assert manager.calls == 2
+    assert [e.name for e in scheduler.pending() if e.kind == 'prayer'] == ['Asr']
+
+
+def test_backward_jump_rearms_for_remaining_time():
+    items = [(NOW + 3600, 'Dhuhr')]
+    scheduler, timers, _, fired = make_scheduler(items, NOW, pre_alerts=())
+
+    timers.advance(3600, wall_jump=-600)
+    assert fired == []
+    assert len(timers.active) == 1 and timers.active[0].due == 3600 + 600
+    timers.advance(600)
+    assert [e.name for e in fired] == ['Dhuhr']
+
+
+def test_check_clock_rearms_between_timer_firings():
+    items = [(NOW + 5 * 3600, 'Dhuhr')]
+    scheduler, timers, manager, fired = make_scheduler(items, NOW, pre_alerts=())
+
+    timers.advance(60)
+    assert scheduler.check_clock() is False
+    # Часы переведены на 2 часа вперед задолго до срабатывания таймера
+    timers.advance(0.5, wall_jump=2 * 3600)
+    assert scheduler.check_clock() is True
+    assert manager.calls == 2
+    assert len(timers.active) == 1 and timers.active[0].due == 3 * 3600
+
+    timers.advance(3 * 3600 - timers.mono)
+    assert [(e.name, e.late) for e in fired] == [('Dhuhr', 0)]
+
+
+def test_pre_alerts_from_settings():
+    assert parse_pre_alerts(None) == (15,)
+    assert parse_pre_alerts('') == ()
+    assert parse_pre_alerts('5, 15') == (15, 5)
+    assert parse_pre_alerts('soon') == (15,)
+
+    items = [(NOW + 3600, 'Dhuhr')]
+    scheduler, _, manager, _ = make_scheduler(items, NOW)
+    scheduler.on_setting_saved(PRE_ALERTS_SETTING, '30')
+    assert manager.calls == 2
+    assert [(e.kind, e.lead) for e in scheduler.pending()][:2] == [('pre_alert', 30), ('prayer', 0)]
+
+
+def test_midnight_event_reloads():
+    scheduler, timers, manager, fired = make_scheduler([], NOW)
+    midnight = scheduler.pending()[0]
+    assert midnight.kind == 'midnight'
+    timers.advance(midnight.due - NOW)
+    assert [e.kind for e in fired] == ['midnight']
+    assert manager.calls == 2
+    assert scheduler.pending()[0].due > midnight.due
+
+
+def test_kivy_clock_delivery_within_100ms():
+    now = time.time()
+    scheduler, _, _, fired = make_scheduler([(now + 0.3, 'Fajr')], now, pre_alerts=())
+    scheduler.clock, scheduler.monotonic, scheduler.schedule_once = time.time, time.monotonic, Clock.schedule_once
+    scheduler.reload()
+
+    deadline = time.time() + 2
+    while not fired and time.time() < deadline:
+        Clock.tick()
+    scheduler.stop()
+    assert [e.name for e in fired] == ['Fajr']
+    assert abs(fired[0].late) < 0.1
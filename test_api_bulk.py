@@ -0,0 +1,60 @@
+import calendar
+import json
+import sqlite3
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from data.prayer_times import PrayerTimesManager
+from logic.prayer_calc import PrayerTimesCalculator
+
+
+class CalendarHandler(BaseHTTPRequestHandler):
+    """Заглушка эндпоинта calendarByCity на основе локального расчета."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    calculator = PrayerTimesCalculator()
+    requests_seen = []
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/').split('/')
+        year, month = int(path[-2]), int(path[-1])
+        self.requests_seen.append((year, month))
+        days = []
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            payload = self.calculator.get_prayer_times(date(year, month, day).isoformat())['data']
+            payload['timings'] = {k: f"{v} (+04)" for k, v in payload['timings'].items()}
+            payload['date']['hijri'] = {'date': '01-01-1446'}
+            days.append(payload)
+        body = json.dumps({'code': 200, 'status': 'OK', 'data': days}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_bulk_fetch_year_into_db(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db',
+                                     base_url=f"http://127.0.0.1:{server.server_port}/v1")
+        saved = manager.prefetch('2024-01-15', '2024-12-31', max_workers=3)
+    finally:
+        server.shutdown()
+
+    assert saved == 352
+    assert sorted(CalendarHandler.requests_seen) == [(2024, m) for m in range(1, 13)]
+    stats = manager.api.last_bulk_stats
+    assert stats['days'] == 352 and stats['requests'] == 12
+    assert stats['days_per_second'] > 0
+
+    with sqlite3.connect(tmp_path / 'prayer_times.db') as conn:
+        count, fajr = conn.execute(
+            "SELECT COUNT(*), MAX(fajr) FROM prayer_days").fetchone()
+    assert count == 352
+    assert 0 < fajr < 24 * 60
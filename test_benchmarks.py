@@ -0,0 +1,36 @@
+from benchmarks import run
+
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = {'benchmarks': {'db.read': {'min_us_per_op': 10.0},
+                               'range_fetch.stub': {'min_us_per_op': 100.0}}}
+    results = {'db.read': {'min_us_per_op': 25.0},
+               'range_fetch.stub': {'min_us_per_op': 250.0},  # Собственный порог 3.0
+               'new.bench': {'min_us_per_op': 1.0}}
+    rows = {name: (ratio, regressed) for name, ratio, regressed in run.compare(results, baseline)}
+    assert rows['db.read'] == (2.5, True)
+    assert rows['range_fetch.stub'] == (2.5, False)
+    assert rows['new.bench'] == (None, False)
+
+
+def test_compare_adjusts_for_machine_speed():
+    baseline = {'benchmarks': {'db.read': {'min_us_per_op': 10.0, 'calibration_us': 100.0}}}
+    # Машина вдвое медленнее: и эталонный цикл, и бенчмарк
+    results = {'db.read': {'min_us_per_op': 30.0, 'calibration_us': 200.0}}
+    assert run.compare(results, baseline) == [('db.read', 1.5, False)]
+
+
+def test_baseline_covers_every_benchmark():
+    assert set(run.load_baseline()['benchmarks']) == set(run.BENCHMARKS)
+
+
+def test_offline_benchmark_runs(tmp_path):
+    result = run.measure('format_gregorian_date', run.BENCHMARKS['format_gregorian_date'][0], repeat=1)
+    assert result['ops'] % 1000 == 0 and result['us_per_op'] > 0
+
+
+def test_fast_benchmarks_are_repeated_to_min_sample():
+    calls = []
+    result = run.measure('tiny', lambda tmp: (lambda: calls.append(1), 1), repeat=2, min_sample=0.005)
+    # Каждый из двух замеров длится не меньше min_sample
+    assert result['ops'] > 1 and len(calls) == 1 + 2 * result['ops']
@@ -0,0 +1,108 @@
+from data.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from data.prayer_times import PrayerTimesManager
+from logic.metrics import get_metrics
+from tools.aladhan_stub_server import StubServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FixedRandom:
+    def random(self):
+        return 0.5
+
+
+def make_breaker(clock):
+    return CircuitBreaker('test', failure_threshold=3, base_delay=10, max_delay=60,
+                          jitter=0.5, clock=clock, rng=FixedRandom())
+
+
+def test_opens_after_failures_and_backs_off():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+    # 10 с, укороченные джиттером на 0.5 * 0.5
+    assert breaker.seconds_until_retry() == 7.5
+
+    clock.now += 7.5
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Только один пробный запрос
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.seconds_until_retry() == 15.0
+
+    for _ in range(5):
+        clock.now += breaker.seconds_until_retry()
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.seconds_until_retry() == 45.0  # max_delay 60 с джиттером
+
+    clock.now += breaker.seconds_until_retry()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.opens == 0 and breaker.allow()
+    assert get_metrics().snapshot()['gauges']['test.breaker.state'] == 0
+
+
+def test_manager_goes_offline_and_recovers(tmp_path):
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    with StubServer(error_rate=1) as server:
+        manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db', base_url=server.url,
+                                     breaker=breaker)
+        schedules = [manager.get_schedule(f'2024-11-{day:02d}') for day in range(1, 11)]
+        # Три запроса открыли автомат, остальные дни - сразу из локального расчета
+        assert server.requests_seen['timingsByCity'] == 3
+        assert manager.offline
+        assert all(s is not None for s in schedules)
+        assert schedules[0].timings == manager.local.get_prayer_times('2024-11-01')['data']['timings']
+
+        # Повторный промах того же дня не идет в сеть и не считает заново
+        assert manager.get_schedule('2024-11-01') is schedules[0]
+        assert server.requests_seen['timingsByCity'] == 3
+
+        server.faults.update(error_rate=0)
+        clock.now += breaker.seconds_until_retry() + 1
+        schedule = manager.get_schedule('2024-11-20')
+        assert not manager.offline and server.requests_seen['timingsByCity'] == 4
+        assert manager.db.get_prayer_times('2024-11-20').timings == schedule.timings
+        # Запасные расписания отброшены: день снова загружается из API
+        manager.get_schedule('2024-11-01')
+        assert server.requests_seen['timingsByCity'] == 5
+    assert manager.db.get_prayer_times('2024-11-02') is None  # Локальный расчет не сохраняется
+    manager.db.close()
+
+
+def test_client_errors_do_not_open_breaker(tmp_path):
+    breaker = make_breaker(FakeClock())
+    with StubServer() as server:
+        manager = PrayerTimesManager('Atlantis', 'Nowhere', db_path=tmp_path / 'prayer_times.db',
+                                     base_url=server.url, breaker=breaker)
+        for day in range(1, 6):
+            assert manager.get_schedule(f'2024-11-{day:02d}') is None
+        assert breaker.state == CLOSED
+        assert manager.local is None  # Город неизвестен локальному расчету
+    manager.db.close()
+
+
+def test_offline_export_keeps_negative_cache_bounded(tmp_path):
+    clock = FakeClock()
+    manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db', base_url='http://127.0.0.1:9/v1',
+                                 breaker=make_breaker(clock))
+    days = sum(1 for _ in manager.iter_schedules('2024-01-01', '2026-12-31'))
+    assert days == 1096 and manager.offline
+    assert len(manager._failed) == PrayerTimesManager.NEGATIVE_CAPACITY
+    # Записи с истекшим сроком вытесняются при следующей неудаче
+    clock.now += 3600
+    manager.get_schedule('2027-01-01')
+    assert len(manager._failed) == 1
+    manager.db.close()
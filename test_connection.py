@@ -0,0 +1,29 @@
+import threading
+
+from data.connection import ThreadLocalConnection
+from data.prayer_times import PrayerTimesDB
+
+
+def test_one_wal_connection_per_thread(tmp_path):
+    connect = ThreadLocalConnection(tmp_path / 'test.db')
+    conn = connect()
+    assert connect() is conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    connect.close()
+    assert connect() is not conn
+
+
+def test_db_reuses_connection(tmp_path):
+    db = PrayerTimesDB(tmp_path / 'prayer_times.db')
+    first = db._connect()
+    db.get_prayer_times('2024-11-22')
+    db.is_cache_valid('2024-11-22')
+    assert db._connect() is first
+    db.close()
@@ -0,0 +1,128 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from logic.dashboard import DEFAULT_CITIES, DashboardCity, DashboardModel, load_cities
+from logic.prayer_calc import PrayerTimesCalculator
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.scheduled = []
+
+    def __call__(self):
+        return self.now
+
+    def schedule_once(self, callback, delay):
+        event = FakeEvent(callback, self.now + delay)
+        self.scheduled.append(event)
+        return event
+
+    def run_until(self, moment):
+        """Срабатывают взведенные таймеры до moment; возвращает их количество."""
+        fired = 0
+        while True:
+            pending = [e for e in self.scheduled if not e.cancelled and e.at <= moment]
+            if not pending:
+                break
+            event = min(pending, key=lambda e: e.at)
+            event.cancelled = True
+            self.now = event.at
+            event.callback(0)
+            fired += 1
+        self.now = moment
+        return fired
+
+
+class FakeEvent:
+    def __init__(self, callback, at):
+        self.callback = callback
+        self.at = at
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def make_model(cities, now):
+    clock = FakeClock(now)
+    model = DashboardModel(cities, clock=clock, schedule_once=clock.schedule_once)
+    changes = []
+    model.bind(on_city_changed=lambda model, index, row: changes.append(index))
+    model.start()
+    return model, clock, changes
+
+
+def test_batched_rows_match_single_city_calculation():
+    now = datetime(2024, 11, 22, 10, 0, tzinfo=timezone.utc).timestamp()
+    model, clock, changes = make_model(load_cities(None), now)
+    assert model.batches == 1 and changes == list(range(len(DEFAULT_CITIES)))
+    baku = model.rows[0]
+    assert baku.date == '2024-11-22'
+    assert baku.timings == PrayerTimesCalculator().get_prayer_times('2024-11-22')['data']['timings']
+    # 14:00 в Баку: следующее время - Аср 14:59
+    assert baku.next_prayer == 'Asr'
+    assert len([e for e in clock.scheduled if not e.cancelled]) == 1
+
+
+def test_thirty_cities_update_only_at_their_own_events():
+    cities = [DashboardCity(f'City {i}', 30 + i, 10 * (i % 12) - 50, (i % 12) - 4) for i in range(30)]
+    now = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc).timestamp()
+    model, clock, changes = make_model(cities, now)
+    changes.clear()
+
+    # Сутки: у каждого города 7 времен и полночь, один таймер на всю модель
+    fired = clock.run_until(now + 86400)
+    assert len([e for e in clock.scheduled if not e.cancelled]) == 1
+    assert fired <= 30 * 8
+    assert 30 * 6 <= len(changes) <= 30 * 8
+    assert model.batches == 1  # Смена дня - строка готового массива
+    for city, row in zip(cities, model.rows):
+        assert row.date == city.local_now(clock.now).date().isoformat()
+
+    # После горизонта пакет пересчитывается один раз на все города
+    clock.run_until(now + 8 * 86400)
+    assert model.batches == 2
+
+
+def test_previous_night_midnight_is_next_after_local_midnight():
+    baku = load_cities(None)[:1]
+    now = datetime(2025, 1, 2, 0, 10, tzinfo=baku[0].tzinfo).timestamp()
+    model, clock, changes = make_model(baku, now)
+    row = model.rows[0]
+    # Полночь ночи на 2 января (00:44) еще впереди, до Фаджра 06:26
+    assert (row.next_prayer, row.timings['Midnight'], row.timings['Fajr']) == ('Midnight', '00:44', '06:26')
+
+    clock.run_until(now + 40 * 60)
+    row = model.rows[0]
+    today = PrayerTimesCalculator().get_prayer_times('2025-01-02')['data']['timings']
+    assert (row.next_prayer, row.timings) == ('Fajr', today)
+    assert model.batches == 1 and changes == [0, 0]
+
+
+def test_load_cities_from_settings():
+    cities = load_cities('[{"name": "Baku", "latitude": 40.4, "longitude": 49.9, "timezone": "Asia/Baku"},'
+                         ' ["Offset", 0, 0, 3]]')
+    assert [city.name for city in cities] == ['Baku', 'Offset']
+    assert cities[1].tzinfo.utcoffset(None) == timedelta(hours=3)
+    assert len(load_cities('not json')) == len(DEFAULT_CITIES)
+
+
+def test_dashboard_layout_renders_model_rows():
+    from ui.dashboard import NEXT_COLOR, DashboardLayout
+    now = datetime(2024, 11, 22, 10, 0, tzinfo=timezone.utc).timestamp()
+    clock = FakeClock(now)
+    model = DashboardModel(load_cities(None), clock=clock, schedule_once=clock.schedule_once)
+    layout = DashboardLayout(model=model)
+    layout.attach()
+    assert layout.cells[0][0].text == 'Baku'
+    assert layout.cells[0][2].text == '05:59'
+    assert tuple(layout.cells[0][5].color) == NEXT_COLOR  # Asr
+
+    layout.detach()
+    assert all(e.cancelled for e in clock.scheduled)
+    layout.clock_label.update_clock(now)
+    assert len(layout.clock_label.text) == 5
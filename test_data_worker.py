@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from datetime import date
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from data.data_worker import DataWorker, direct_dispatch, kivy_dispatch
+
+FRAME_BUDGET = 0.016  # 60 FPS
+
+
+class SlowManager:
+    """Менеджер, имитирующий промах кэша с медленным API."""
+
+    def __init__(self, delay=0.3):
+        self.delay = delay
+        self.threads = set()
+
+    def get_prayer_times(self, date=None):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return {'data': {'date': {'hijri': {'day': '20', 'month': {'en': 'Jumādá al-ūlá'}, 'year': '1446'}}}}
+
+    def fail(self):
+        raise RuntimeError('boom')
+
+
+def test_calls_run_on_worker_thread_without_blocking():
+    manager = SlowManager()
+    worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+    received = []
+    done = threading.Event()
+
+    started = time.perf_counter()
+    future = worker.get_prayer_times(callback=lambda data: (received.append(data), done.set()))
+    assert time.perf_counter() - started < FRAME_BUDGET
+
+    assert done.wait(2)
+    assert received[0] == future.result()
+    assert manager.threads and threading.get_ident() not in manager.threads
+
+    errors = []
+    worker.call('fail', callback=errors.append).exception(timeout=2)
+    assert errors == []
+    worker.shutdown(wait=True)
+
+
+def test_day_context_frames_stay_within_budget(monkeypatch):
+    from kivy.clock import Clock
+    from data.schedule import DaySchedule
+    from logic.day_context import DayContext
+    import ui.date_labels as date_labels
+
+    class SlowScheduleManager(SlowManager):
+        def get_schedule(self, date=None):
+            hijri = self.get_prayer_times(date)['data']['date']['hijri']
+            timings = dict.fromkeys(('Midnight', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha'), '23:59')
+            return DaySchedule(date, timings, hijri=hijri)
+
+    frame_costs = []
+
+    def timed(fn):
+        def wrapper(*args):
+            started = time.perf_counter()
+            fn(*args)
+            frame_costs.append(time.perf_counter() - started)
+        return wrapper
+
+    monkeypatch.setattr(DayContext, 'refresh', timed(DayContext.refresh))
+    monkeypatch.setattr(DayContext, '_on_schedule', timed(DayContext._on_schedule))
+
+    worker = DataWorker(lambda: SlowScheduleManager(delay=0.5), dispatch=kivy_dispatch)
+    context = DayContext(data_worker=worker)
+    monkeypatch.setattr(date_labels, 'get_day_context', lambda: context)
+    label = date_labels.HijriDateLabel()
+
+    deadline = time.perf_counter() + 2
+    while context.schedule is None and time.perf_counter() < deadline:
+        Clock.tick()
+    context._cancel()
+    worker.shutdown(wait=True)
+
+    assert label.opacity == 1
+    assert label.text == context.hijri_calendar.format(date.today())
+    assert max(frame_costs) < FRAME_BUDGET, f"slowest frame {max(frame_costs) * 1000:.1f} ms"
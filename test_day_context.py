@@ -0,0 +1,97 @@
+import os
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from data.data_worker import DataWorker, direct_dispatch
+from data.schedule import DaySchedule
+from logic.day_context import DayContext
+from logic.hijri import HijriCalendar, tabular_month_starts
+
+
+class StubManager:
+    def __init__(self):
+        self.calls = []
+
+    def get_schedule(self, day=None):
+        self.calls.append(day)
+        timings = dict.fromkeys(('Midnight', 'Fajr', 'Sunrise', 'Dhuhr', 'Asr', 'Maghrib', 'Isha'), '00:01')
+        return DaySchedule(day, timings, hijri={'day': '1', 'month': {'en': 'Muharram'}, 'year': '1447'})
+
+
+def make_context(**kwargs):
+    manager = StubManager()
+    worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+    context = DayContext(data_worker=worker, **kwargs)
+    worker.shutdown(wait=True)
+    return context, manager
+
+
+def test_context_loads_once_and_waits_for_midnight():
+    events = []
+    context, manager = make_context()
+    context.bind(on_day_changed=lambda *args: events.append(1))
+
+    assert manager.calls == [date.today().isoformat()]
+    assert context.hijri_text == HijriCalendar().format(date.today())
+    assert context.gregorian_text.endswith(f".{date.today().year}")
+
+    midnight = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    remaining = (midnight - datetime.now()).total_seconds()
+    assert abs(context._event.timeout - remaining) < 2
+    context._cancel()
+
+
+def test_settings_change_republishes():
+    events = []
+    context, manager = make_context()
+    context.bind(on_day_changed=lambda *args: events.append(1))
+    context.data_worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+    context.settings_changed()
+    context.data_worker.shutdown(wait=True)
+    assert len(manager.calls) == 2
+    assert events == [1]
+    context._cancel()
+
+
+def test_tabular_calendar_prefers_api_hijri_date():
+    context, _ = make_context(hijri_calendar=HijriCalendar(month_starts=tabular_month_starts))
+    assert context.hijri_text == '1 Muharram 1447'
+    context._cancel()
+
+
+class OfflineManager:
+    def get_schedule(self, day=None):
+        return None
+
+
+def test_hijri_date_does_not_need_schedule():
+    worker = DataWorker(OfflineManager, dispatch=direct_dispatch)
+    context = DayContext(data_worker=worker, hijri_calendar=HijriCalendar(adjustment=1))
+    worker.shutdown(wait=True)
+    assert context.schedule is None
+    assert context.hijri_text == HijriCalendar().format(date.today() + timedelta(days=1))
+    context._cancel()
+
+
+def test_hijri_adjustment_setting_refreshes_context(monkeypatch, tmp_path):
+    import data.database as database
+    import logic.day_context as day_context
+    import logic.hijri as hijri
+
+    db = database.SettingsDatabase(tmp_path / 'settings.db')
+    monkeypatch.setattr(database, '_settings_db', db)
+    monkeypatch.setattr(hijri, '_calendar', None)
+    monkeypatch.setattr(day_context, '_context', None)
+    monkeypatch.setattr(day_context, 'get_settings_database', lambda: db)
+    worker = DataWorker(StubManager, dispatch=direct_dispatch)
+    monkeypatch.setattr(day_context, 'get_data_worker', lambda: worker)
+
+    context = day_context.get_day_context()
+    today = context.hijri_text
+    db.save_setting('hijri_adjustment', '1')
+    worker.shutdown(wait=True)
+    assert context.hijri_text == HijriCalendar().format(date.today() + timedelta(days=1)) != today
+    context._cancel()
+    db.close()
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from data.prayer_times import PRAYER_NAMES_PORTRAIT, PrayerTimesManager
+from data.schedule import DaySchedule
+from tools import export_timetable
+from tools.aladhan_stub_server import StubServer
+
+
+def local_manager(tmp_path):
+    return PrayerTimesManager(source='local', db_path=tmp_path / 'prayer_times.db')
+
+
+def test_csv_and_jsonl_stream_every_day(tmp_path):
+    manager = local_manager(tmp_path)
+    out = io.StringIO(newline='')
+    assert export_timetable.export(manager, '2024-02-25', '2024-03-05', 'csv', out) == 10
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ['date', 'hijri', *PRAYER_NAMES_PORTRAIT.values()]
+    assert [row[0] for row in rows[1:3]] == ['2024-02-25', '2024-02-26']
+    assert rows[-1][0] == '2024-03-05' and rows[-1][1].endswith('-1445')
+
+    out = io.StringIO()
+    assert export_timetable.export(manager, '2024-11-22', '2024-11-22', 'jsonl', out, names='en') == 1
+    day = json.loads(out.getvalue())
+    assert day['date'] == '2024-11-22' and day['timings']['Fajr'] == '05:59'
+
+
+def test_ics_events(tmp_path):
+    manager = local_manager(tmp_path)
+    out = io.StringIO(newline='')
+    export_timetable.export(manager, '2024-11-22', '2024-11-23', 'ics', out, names='en', tzid='Asia/Baku')
+    text = out.getvalue()
+    assert text.startswith('BEGIN:VCALENDAR\r\n') and text.endswith('END:VCALENDAR\r\n')
+    assert text.count('BEGIN:VEVENT') == 14
+    assert 'DTSTART;TZID=Asia/Baku:20241122T055900\r\nSUMMARY:Fajr' in text
+    # Полночь 00:26 после 22 ноября - уже 23 ноября
+    assert f'UID:20241122-midnight-{manager.fingerprint[:12]}@mihrezan\r\n' in text
+    assert 'DTSTART;TZID=Asia/Baku:20241123T002600\r\nSUMMARY:Midnight' in text
+    # TZID ссылается на VTIMEZONE календаря; у Баку одно смещение без перехода
+    assert ('BEGIN:VTIMEZONE\r\nTZID:Asia/Baku\r\nBEGIN:STANDARD\r\nDTSTART:19700101T000000\r\n'
+            'TZOFFSETFROM:+0400\r\nTZOFFSETTO:+0400\r\n') in text
+    assert text.count('BEGIN:STANDARD') == 1 and 'DAYLIGHT' not in text
+
+
+def test_ics_uses_location_zone_and_converts_to_tz(tmp_path):
+    manager = local_manager(tmp_path)
+    out = io.StringIO(newline='')
+    export_timetable.export(manager, '2024-11-22', '2024-11-22', 'ics', out, names='en')
+    assert 'DTSTART;TZID=Asia/Baku:20241122T055900\r\nSUMMARY:Fajr' in out.getvalue()
+
+    # Времена Баку (UTC+4) переводятся в Берлин (UTC+1), а не просто подписываются
+    out = io.StringIO(newline='')
+    export_timetable.export(manager, '2024-11-22', '2024-11-22', 'ics', out, names='en', tzid='Europe/Berlin')
+    text = out.getvalue()
+    assert 'DTSTART;TZID=Europe/Berlin:20241122T025900\r\nSUMMARY:Fajr' in text
+    assert 'DTSTART;TZID=Europe/Berlin:20241122T212600\r\nSUMMARY:Midnight' in text
+    manager.db.close()
+
+
+def test_ics_skips_times_missing_in_polar_day():
+    tromso = DaySchedule('2025-06-21', {'Midnight': '-----', 'Fajr': '-----', 'Sunrise': '-----', 'Dhuhr': '12:46',
+                                        'Asr': '17:58', 'Maghrib': '-----', 'Isha': '-----'})
+    text = ''.join(export_timetable.ics_lines([tromso], export_timetable.NAME_STYLES['en'], 'x', 'Europe/Oslo'))
+    assert text.count('BEGIN:VEVENT') == 2 and 'T----' not in text
+    assert 'DTSTART;TZID=Europe/Oslo:20250621T124600\r\nSUMMARY:Dhuhr' in text
+
+
+def test_command_line_location_options(tmp_path):
+    output = tmp_path / 'tromso.ics'
+    assert export_timetable.main(['--source', 'local', '--db', str(tmp_path / 'prayer_times.db'),
+                                  '--city', 'Tromso', '--country', 'Norway', '--latitude', '69.65',
+                                  '--longitude', '18.96', '--timezone', 'Europe/Oslo',
+                                  '--from', '2025-06-21', '--to', '2025-06-21', '-f', 'ics',
+                                  '--names', 'en', '-o', str(output)]) == 0
+    text = output.read_bytes().decode('utf-8')
+    assert text.count('BEGIN:VEVENT') == 2
+    assert 'DTSTART;TZID=Europe/Oslo:20250621T124600\r\nSUMMARY:Dhuhr' in text
+
+
+def test_vtimezone_follows_dst_transitions():
+    lines = export_timetable.vtimezone_lines('Europe/Berlin', date(2025, 1, 1), date(2025, 12, 31))
+    text = '\n'.join(lines)
+    assert 'BEGIN:DAYLIGHT\nDTSTART:20250330T020000\nTZOFFSETFROM:+0100\nTZOFFSETTO:+0200' in text
+    assert 'BEGIN:STANDARD\nDTSTART:20251026T030000\nTZOFFSETFROM:+0200\nTZOFFSETTO:+0100' in text
+    assert lines[0] == 'BEGIN:VTIMEZONE' and lines[-1] == 'END:VTIMEZONE'
+
+
+@pytest.mark.parametrize('argv', [['--from', '2025-13-01', '--to', '2025-12-31'],
+                                  ['--from', '2025-02-01', '--to', '2025-01-01'],
+                                  ['--from', '2025-01-01', '--to', '2025-01-02', '--tz', 'Mars/Base'],
+                                  ['--source', 'local', '--city', 'Paris', '--country', 'France',
+                                   '--from', '2025-01-01', '--to', '2025-01-02'],
+                                  ['--latitude', '48.8', '--from', '2025-01-01', '--to', '2025-01-02']])
+def test_command_line_rejects_bad_arguments(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        export_timetable.main(argv)
+    assert exit_info.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+
+def test_api_source_fills_missing_months_with_one_request(tmp_path):
+    with StubServer() as server:
+        manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db', base_url=server.url)
+        schedules = list(manager.iter_schedules('2024-11-20', '2025-01-10'))
+        assert [s.date for s in schedules[:2]] == ['2024-11-20', '2024-11-21']
+        assert len(schedules) == 52
+        assert server.requests_seen['calendarByCity'] == 3
+        assert 'timingsByCity' not in server.requests_seen
+
+        # Второй проход - только из базы
+        assert len(manager.get_prayer_times_range('2024-11-20', '2025-01-10')) == 52
+        assert server.requests_seen['calendarByCity'] == 3
+    manager.db.close()
+
+
+def test_command_line(tmp_path, capsys):
+    output = tmp_path / 'timetable.jsonl'
+    assert export_timetable.main(['--source', 'local', '--db', str(tmp_path / 'prayer_times.db'),
+                                  '--from', '2024-01-01', '--to', '2024-12-31',
+                                  '-f', 'jsonl', '-o', str(output)]) == 0
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 366
+    assert '366 days exported' in capsys.readouterr().err
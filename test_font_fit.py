@@ -0,0 +1,39 @@
+import math
+import os
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+import ui.base_clock as base_clock
+
+
+def fake_measure(calls, shape):
+    def measure(text, font_name, font_size):
+        calls.append(font_size)
+        return shape(font_size)
+    return measure
+
+
+def test_fit_takes_few_measurements(monkeypatch):
+    # Ширина с округлением хинтинга и ненулевыми боковыми отступами
+    for shape in (lambda s: math.floor(s * 2.93) + 4,
+                  lambda s: math.ceil(s ** 1.04 * 2.5)):
+        for width in (800, 1280, 1920, 2560):
+            calls = []
+            monkeypatch.setattr(base_clock, 'measure_text_width', fake_measure(calls, shape))
+            size = base_clock.fit_font_size('88:88', 'font.ttf', width)
+            assert shape(size) <= width
+            assert shape(size + 0.5) > width - 3
+            assert len(calls) <= 6
+
+
+def test_fitted_size_is_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(base_clock, 'measure_text_width', fake_measure(calls, lambda s: s * 3))
+    base_clock.fitted_font_size.cache_clear()
+    first = base_clock.fitted_font_size(1920, 1080, 'font.ttf', '88:88')
+    measured = len(calls)
+    assert base_clock.fitted_font_size(1920, 1080, 'font.ttf', '88:88') == first
+    assert len(calls) == measured
+    base_clock.fitted_font_size(1920, 1000, 'font.ttf', '88:88')
+    assert len(calls) > measured
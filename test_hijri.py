@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pytest
+
+from data.schedule import format_hijri_date
+from logic.hijri import HijriCalendar, tabular_month_starts, ummalqura_month_starts
+
+
+def test_tabular_calendar_known_dates():
+    calendar = HijriCalendar(month_starts=tabular_month_starts)
+    assert calendar.source == 'tabular'
+    assert calendar.from_gregorian('2024-11-22') == (1446, 5, 20)
+    assert calendar.from_gregorian(date(2024, 3, 11)) == (1445, 9, 1)
+    assert calendar.from_gregorian('2023-07-19') == (1445, 1, 1)
+    assert calendar.format('2024-11-22') == '20 Jumādá al-ūlá 1446'
+    assert calendar.to_api('2024-11-22')['date'] == '20-05-1446'
+    assert {calendar.month_length(1446, month) for month in range(1, 13)} == {29, 30}
+
+
+@pytest.mark.parametrize('month_starts', [tabular_month_starts, ummalqura_month_starts])
+def test_days_are_consecutive_across_whole_table(month_starts):
+    calendar = HijriCalendar(month_starts=month_starts)
+    day = date.fromordinal(month_starts()[0])
+    previous = calendar.from_gregorian(day)
+    assert previous == (1343, 1, 1) and calendar.from_gregorian(day - timedelta(days=1)) is None
+    while True:
+        day += timedelta(days=1)
+        current = calendar.from_gregorian(day)
+        if current is None:
+            break
+        year, month, number = previous
+        if number == calendar.month_length(year, month):
+            year, month, number = (year + 1, 1, 0) if month == 12 else (year, month + 1, 0)
+        assert current == (year, month, number + 1)
+        previous = current
+    assert previous == (1500, 12, calendar.month_length(1500, 12))
+
+
+def test_adjustment_shifts_days():
+    calendar = HijriCalendar(adjustment=-1, month_starts=tabular_month_starts)
+    assert calendar.from_gregorian('2024-03-11') == (1445, 8, 29)
+    calendar.adjustment = 1
+    assert calendar.from_gregorian('2024-03-11') == (1445, 9, 2)
+    assert calendar.format('2100-01-01') == '' and calendar.to_api('2100-01-01') is None
+
+
+def test_format_hijri_date():
+    assert format_hijri_date('20-5-1446') == '20 Jumādá al-ūlá 1446'
+    assert format_hijri_date('20-05-1446') == '20 Jumādá al-ūlá 1446'
+    assert format_hijri_date('garbage') == 'garbage'
+    assert format_hijri_date(date(2024, 11, 22)).endswith(' 1446')
+    assert format_hijri_date() == HijriCalendar().format(date.today())
+
+
+def test_ummalqura_calendar_is_default_and_differs_from_tabular():
+    calendar = HijriCalendar()
+    tabular = HijriCalendar(month_starts=tabular_month_starts)
+    assert calendar.source == 'ummalqura'
+    assert calendar.from_gregorian('2024-07-07') == (1446, 1, 1)
+    assert calendar.from_gregorian('2025-06-26') == (1447, 1, 1)
+    assert tabular.from_gregorian('2024-07-07') == (1445, 12, 30)
+    assert tabular.from_gregorian('2025-06-26') == (1446, 12, 29)
+    assert calendar.from_gregorian('1924-08-01') == (1343, 1, 1)
+    assert calendar.from_gregorian('2077-11-16') == (1500, 12, 30)
+    assert calendar.from_gregorian('2077-11-17') is None
+
+
+def test_ummalqura_tables_match_hijri_converter():
+    converter = pytest.importorskip('hijri_converter')
+    calendar = HijriCalendar(month_starts=ummalqura_month_starts)
+    for day in (date(1924, 8, 1), date(2024, 7, 7), date(2024, 11, 22), date(2077, 11, 16)):
+        assert calendar.from_gregorian(day) == tuple(converter.Gregorian.fromdate(day).to_hijri().datetuple())
@@ -0,0 +1,73 @@
+import json
+import logging
+
+from data.prayer_times import PrayerTimesManager
+from logic.metrics import MetricsRegistry, MetricsReporter, RateLimitedLogger, get_metrics, lazy_json
+
+
+def test_counters_and_histograms_snapshot():
+    registry = MetricsRegistry()
+    registry.inc('cache.hit')
+    registry.inc('cache.hit', 2)
+    for seconds in (0.0002, 0.0004, 0.003, 0.2):
+        registry.observe('db.query', seconds)
+
+    snapshot = json.loads(registry.to_json())
+    assert snapshot['counters'] == {'cache.hit': 3}
+    latency = snapshot['latency']['db.query']
+    assert latency['count'] == 4 and latency['max'] == 0.2
+    assert latency['p50'] == 0.0005  # Верхняя граница корзины медианы
+    assert latency['p95'] == 0.2
+    assert registry.format_line().startswith('cache.hit=3 db.query=4/')
+
+
+def test_reporter_logs_a_line_per_interval(caplog):
+    registry = MetricsRegistry()
+    registry.inc('http.error')
+    scheduled = []
+    reporter = MetricsReporter(registry, interval=60,
+                               schedule_interval=lambda callback, interval: scheduled.append(
+                                   (callback, interval)) or type('Event', (), {'cancel': lambda self: None})())
+    reporter.start()
+    assert scheduled[0][1] == 60
+    with caplog.at_level(logging.INFO, logger='logic.metrics'):
+        scheduled[0][0](60)
+    assert caplog.messages == ['metrics: http.error=1']
+
+
+def test_rate_limited_logger_suppresses_repeats(caplog):
+    now = [0.0]
+    log = RateLimitedLogger(logging.getLogger('test.rate'), interval=60, clock=lambda: now[0])
+    with caplog.at_level(logging.INFO, logger='test.rate'):
+        for day in range(5):
+            log.info("Getting prayer times for date: %s", day)
+        now[0] = 61
+        log.info("Getting prayer times for date: %s", 5)
+    assert caplog.messages == ["Getting prayer times for date: 0",
+                               "Getting prayer times for date: 5 (+4 similar suppressed)"]
+
+
+def test_lazy_json_not_serialized_when_disabled(caplog):
+    serialized = []
+
+    class Tracked(lazy_json):
+        def __str__(self):
+            serialized.append(self.value)
+            return super().__str__()
+
+    with caplog.at_level(logging.INFO):
+        logging.getLogger('test.lazy').debug("payload %s", Tracked({'a': 1}))
+        assert serialized == []
+        logging.getLogger('test.lazy').info("payload %s", Tracked({'a': 1}))
+    assert caplog.messages == ['payload {"a": 1}']
+
+
+def test_manager_counts_cache_hits(tmp_path):
+    manager = PrayerTimesManager(source='local', db_path=tmp_path / 'prayer_times.db')
+    before = get_metrics().snapshot()['counters']
+    for _ in range(3):
+        manager.get_schedule('2024-11-22')
+    after = get_metrics().snapshot()['counters']
+    assert after.get('cache.miss', 0) - before.get('cache.miss', 0) == 1
+    assert after.get('cache.hit', 0) - before.get('cache.hit', 0) == 2
+    manager.db.close()
@@ -0,0 +1,73 @@
+import gc
+import os
+import tracemalloc
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.uix.floatlayout import FloatLayout
+
+import data.database as database
+import logic.day_context as day_context
+from data.data_worker import DataWorker, direct_dispatch
+from test_day_context import StubManager
+from ui.base_clock import BaseClockLabel
+
+
+def make_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, '_settings_db', database.SettingsDatabase(tmp_path / 'settings.db'))
+    manager = StubManager()
+    worker = DataWorker(lambda: manager, dispatch=direct_dispatch)
+    monkeypatch.setattr(day_context, '_context', day_context.DayContext(data_worker=worker))
+    worker.shutdown(wait=True)
+
+    from main import ClockApp
+    app = ClockApp()
+    app.layout = FloatLayout()
+    return app
+
+
+def rotate(app, times):
+    for i in range(times):
+        app.switch_orientation('portrait' if i % 2 == 0 else 'landscape')
+    for child in list(app.layout.children):
+        Animation.stop_all(child)
+
+
+def test_rotation_reuses_widgets_and_leaks_nothing(monkeypatch, tmp_path):
+    resizes = []
+
+    def on_window_resize(self, *args):
+        resizes.append(self)
+
+    monkeypatch.setattr(BaseClockLabel, 'on_window_resize', on_window_resize)
+    app = make_app(monkeypatch, tmp_path)
+    context = day_context.get_day_context()
+
+    rotate(app, 10)
+    gc.collect()
+    events = len(Clock.get_events())
+    observers = len(context.get_property_observers('hijri_text'))
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    rotate(app, 1000)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    assert len(Clock.get_events()) == events
+    assert len(context.get_property_observers('hijri_text')) == observers
+    growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    assert growth < 256 * 1024
+
+    # Один виджет на ориентацию; на окно подписан только видимый
+    assert len(app._orientation_widgets) == 2
+    assert sum(issubclass(type(obj), BaseClockLabel) for obj in gc.get_objects()) == 2
+    assert app.layout.children == [app.clock_widget]
+    Window.dispatch('on_resize', *Window.size)
+    assert resizes == [app._clock_of(app.clock_widget)]
+    context._cancel()
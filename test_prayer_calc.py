@@ -0,0 +1,88 @@
+from datetime import date
+
+from logic.prayer_calc import PrayerTimesCalculator, TIMING_NAMES, parse_tune
+
+
+def minutes(hhmm):
+    hours, mins = map(int, hhmm.split(':'))
+    return hours * 60 + mins
+
+
+def test_payload_matches_api_shape():
+    data = PrayerTimesCalculator().get_prayer_times('2024-11-22')
+    assert data['code'] == 200
+    assert list(data['data']['timings']) == list(TIMING_NAMES)
+    assert data['data']['date']['gregorian']['date'] == '22-11-2024'
+    assert data['data']['date']['gregorian']['weekday']['en'] == 'Friday'
+
+
+def test_baku_solstice_regression():
+    # Восход/закат в Баку 21.06.2024 по астрономическим таблицам: 05:11 / 20:14
+    timings = PrayerTimesCalculator().get_timings(date(2024, 6, 21))
+    assert abs(minutes(timings['Sunrise']) - minutes('05:11')) <= 1
+    assert abs(minutes(timings['Maghrib']) - minutes('20:14')) <= 1
+    assert timings['Dhuhr'] == '12:42'
+
+
+def test_timings_are_ordered():
+    calc = PrayerTimesCalculator()
+    for month in range(1, 13):
+        timings = calc.get_timings(date(2024, month, 15))
+        day_order = [minutes(timings[name]) for name in TIMING_NAMES[1:]]
+        assert day_order == sorted(day_order)
+
+
+def test_tune_school_and_midnight_mode():
+    day = date(2024, 3, 10)
+    base = PrayerTimesCalculator().get_timings(day)
+    tuned = PrayerTimesCalculator(tune='0,2,0,0,0,-3,0,0,0').get_timings(day)
+    assert minutes(tuned['Fajr']) - minutes(base['Fajr']) == 2
+    assert minutes(tuned['Maghrib']) - minutes(base['Maghrib']) == -3
+
+    hanafi = PrayerTimesCalculator(school=1).get_timings(day)
+    assert minutes(hanafi['Asr']) > minutes(base['Asr'])
+
+    jafari = PrayerTimesCalculator(midnight_mode=1).get_timings(day)
+    assert jafari['Midnight'] != base['Midnight']
+
+
+def test_interval_isha_method():
+    timings = PrayerTimesCalculator(method=4).get_timings(date(2024, 3, 10))
+    assert minutes(timings['Isha']) - minutes(timings['Maghrib']) == 90
+
+
+def test_parse_tune():
+    offsets = parse_tune('1,2,3')
+    assert (offsets['Imsak'], offsets['Fajr'], offsets['Sunrise'], offsets['Isha']) == (1, 2, 3, 0)
+
+
+def test_batch_matches_scalar_calculator():
+    from logic.prayer_batch import compute_timetables, date_range, format_minutes
+
+    days = date_range('2024-01-01', '2024-12-31')
+    locations = [(40.3777, 49.892, 'Asia/Baku'), (59.93, 30.36, 3), (-33.87, 151.21, 10)]
+    table = compute_timetables(days, locations, method=13, tune='0,1,0,0,2,0,0,0,0')
+    assert table.shape == (3, 366, 7)
+
+    for i, (lat, lon, tz) in enumerate(locations):
+        calc = PrayerTimesCalculator(tune='0,1,0,0,2,0,0,0,0', latitude=lat, longitude=lon, timezone=tz)
+        for j in range(0, 366, 5):
+            timings = calc.get_timings(days[j].astype(object))
+            assert [format_minutes(v) for v in table[i, j]] == [timings[n] for n in TIMING_NAMES]
+
+
+def test_missing_timezone_database_uses_fixed_offset(monkeypatch):
+    import logic.prayer_calc as prayer_calc
+
+    def no_database(name):
+        raise prayer_calc.ZoneInfoNotFoundError(name)
+
+    monkeypatch.setattr(prayer_calc, 'ZoneInfo', no_database)
+    prayer_calc.get_timezone.cache_clear()
+    try:
+        expected = PrayerTimesCalculator(timezone=4).get_prayer_times('2024-11-22')['data']['timings']
+        assert PrayerTimesCalculator().get_prayer_times('2024-11-22')['data']['timings'] == expected
+        unknown = PrayerTimesCalculator(latitude=0, longitude=0, timezone='Mars/Olympus')
+        assert unknown.get_prayer_times('2024-11-22') is None
+    finally:
+        prayer_calc.get_timezone.cache_clear()
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+from data.prayer_times import PrayerTimesManager
+from data.schedule import DaySchedule
+from logic.prayer_calc import PrayerTimesCalculator
+from logic.prayer_index import PrayerIndex
+
+
+class CountingLoader:
+    """Загрузчик расписаний с подсчетом обращений."""
+
+    def __init__(self):
+        self.calc = PrayerTimesCalculator()
+        self.days = []
+
+    def __call__(self, day):
+        self.days.append(day)
+        return DaySchedule.from_api(self.calc.get_prayer_times(day))
+
+
+def at(*args):
+    return datetime(*args).timestamp()
+
+
+def test_next_prayer_across_month_end():
+    loader = CountingLoader()
+    index = PrayerIndex(loader)
+    # После Иши 31 января следующая - полночь, затем Фаджр 1 февраля
+    fajr = loader.calc.get_timings(datetime(2024, 2, 1).date())['Fajr']
+    name, moment = index.next(at(2024, 1, 31, 23, 59))
+    if name == 'Midnight':
+        name, moment = index.next(moment)
+    assert name == 'Fajr'
+    assert datetime.fromtimestamp(moment) == datetime(2024, 2, 1, *map(int, fajr.split(':')))
+
+
+def test_index_covers_horizon_and_is_reused():
+    loader = CountingLoader()
+    index = PrayerIndex(loader)
+    now = at(2024, 6, 10, 12, 0)
+    upcoming = index.upcoming(now)
+    assert upcoming[-1][0] - now >= PrayerIndex.HORIZON
+    loaded = len(loader.days)
+
+    # Запросы в течение часа не трогают загрузчик
+    for minute in range(60):
+        index.time_until(now + minute * 60)
+    assert len(loader.days) == loaded and index.rebuilds == 1
+
+    # Через сутки индекс дополняется только новыми днями
+    index.next(now + 86400)
+    assert len(loader.days) == loaded + 1
+    assert len(set(loader.days)) == len(loader.days)
+
+
+def test_clock_jumps_rebuild_index():
+    loader = CountingLoader()
+    index = PrayerIndex(loader)
+    index.next(at(2024, 6, 10, 12, 0))
+    name, moment = index.next(at(2024, 3, 1, 12, 0))
+    assert datetime.fromtimestamp(moment).date().isoformat() == '2024-03-01'
+    name, moment = index.next(at(2024, 9, 1, 12, 0))
+    assert datetime.fromtimestamp(moment).date().isoformat() == '2024-09-01'
+
+
+def test_manager_next_prayer_and_notify(tmp_path):
+    manager = PrayerTimesManager(source='local', db_path=tmp_path / 'prayer_times.db')
+    timings = manager.api.get_timings(datetime(2024, 12, 31).date())
+    hours, minutes = map(int, timings['Maghrib'].split(':'))
+    now = at(2024, 12, 31, hours, minutes) - 600
+    assert manager.get_next_prayer(now) == ('Maghrib', 10)
+    assert manager.should_notify('Maghrib', 15, now=now)
+    assert not manager.should_notify('Isha', 15, now=now)
+
+    manager.configure(source='local', tune='0,0,0,0,0,5,0,0,0')
+    assert manager.get_next_prayer(now) == ('Maghrib', 15)
+
+
+def test_polar_day_skips_missing_times(tmp_path):
+    manager = PrayerTimesManager('Tromso', 'Norway', source='local', latitude=69.65, longitude=18.96,
+                                 timezone='Europe/Oslo', db_path=tmp_path / 'prayer_times.db')
+    now = at(2025, 6, 21, 10, 0)
+    timings = manager.get_schedule('2025-06-21').timings
+    assert timings['Maghrib'] == timings['Midnight'] == '-----'
+    name, _ = manager.get_next_prayer(now)
+    assert name == 'Dhuhr'
+    names = {name for _, name in manager.get_upcoming_prayers(until=now + 86400, now=now)}
+    assert names == {'Dhuhr', 'Asr'}
+    manager.db.close()
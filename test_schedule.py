@@ -0,0 +1,148 @@
+import sqlite3
+
+from data.prayer_times import PrayerTimesDB, PrayerTimesManager
+from data.schedule import DaySchedule, ScheduleCache, normalize_date
+from logic.prayer_calc import PrayerTimesCalculator
+
+
+class CountingAPI:
+    """Источник, считающий обращения к сети."""
+
+    is_local = False
+
+    def __init__(self):
+        self.calls = 0
+        self.calculator = PrayerTimesCalculator()
+
+    def get_prayer_times(self, date=None):
+        self.calls += 1
+        payload = self.calculator.get_prayer_times(date)
+        payload['data']['date']['hijri'] = {'date': '20-05-1446', 'day': '20'}
+        return payload
+
+
+def test_normalize_date():
+    assert normalize_date('2024-11-22') == '2024-11-22'
+    assert normalize_date('22-11-2024') == '2024-11-22'
+
+
+def test_lru_eviction_and_stats():
+    cache = ScheduleCache(capacity=2)
+    for key in ('a', 'b'):
+        cache.put(key, key)
+    assert cache.get('a') == 'a'
+    cache.put('c', 'c')  # вытесняет 'b'
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 2, 'capacity': 2, 'hit_rate': 0.5}
+
+
+def test_manager_hits_memory_then_db(tmp_path):
+    manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db')
+    manager.api = api = CountingAPI()
+
+    first = manager.get_prayer_times('2024-11-22')
+    again = manager.get_prayer_times('2024-11-22')
+    assert again is first
+    assert api.calls == 1
+    assert manager.cache.stats()['hits'] == 1
+
+    # Новый процесс: кэш в памяти пуст, данные находятся в базе под ISO-датой
+    manager.cache.clear()
+    schedule = manager.get_schedule('2024-11-22')
+    assert api.calls == 1
+    assert schedule.timings == first['data']['timings']
+    assert schedule.hijri['day'] == '20'
+
+
+LEGACY_SCHEMA = """
+    CREATE TABLE prayer_times (
+        date TEXT PRIMARY KEY, gregorian_date TEXT, hijri_date TEXT, city TEXT, country TEXT,
+        midnight TEXT, fajr TEXT, sunrise TEXT, dhuhr TEXT, asr TEXT, maghrib TEXT, isha TEXT,
+        timestamp INTEGER
+    )
+"""
+
+
+def test_legacy_rows_are_migrated(tmp_path):
+    path = tmp_path / 'prayer_times.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute(LEGACY_SCHEMA)
+        # Старые версии сохраняли строки под датой API 'DD-MM-YYYY'
+        conn.execute("INSERT INTO prayer_times VALUES ('22-11-2024', '{}', ?, 'Baku', 'Azerbaijan',"
+                     " '00:26', '05:59', '07:35', '12:27', '14:59', '17:18', '18:48', 0)",
+                     ('{"date": "20-05-1446", "day": "20", "month": {"number": 5}, "year": "1446"}',))
+    schedule = PrayerTimesDB(path).get_prayer_times('2024-11-22')
+    assert isinstance(schedule, DaySchedule)
+    assert schedule.timings['Fajr'] == '05:59'
+    assert schedule.hijri['month']['en'] == 'Jumādá al-ūlá'
+    assert schedule.gregorian['weekday']['en'] == 'Friday'
+
+    with sqlite3.connect(path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'prayer_days', 'configs'}
+
+
+def test_v2_rows_move_to_default_config(tmp_path):
+    path = tmp_path / 'prayer_times.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE prayer_days (day INTEGER PRIMARY KEY, midnight INTEGER, fajr INTEGER,'
+                     ' sunrise INTEGER, dhuhr INTEGER, asr INTEGER, maghrib INTEGER, isha INTEGER,'
+                     ' hijri INTEGER, fetched INTEGER) WITHOUT ROWID')
+        conn.execute('INSERT INTO prayer_days VALUES (20049, 26, 359, 455, 747, 899, 1038, 1128, NULL, 0)')
+        conn.execute('PRAGMA user_version = 2')
+    db = PrayerTimesDB(path)
+    assert db.get_prayer_times('2024-11-22').timings['Fajr'] == '05:59'
+
+    # Другая конфигурация не видит чужих данных
+    db.select_config('other', {'method': 3})
+    assert db.get_prayer_times('2024-11-22') is None
+
+
+def test_switching_configs_reuses_cache(tmp_path):
+    manager = PrayerTimesManager(db_path=tmp_path / 'prayer_times.db')
+    api = CountingAPI()
+    manager.api = api
+    first = manager.get_schedule('2024-11-22')
+
+    default = manager.fingerprint
+    other = manager.configure(method=2)
+    assert other != default
+    manager.api = other_api = CountingAPI()
+    other_api.calculator = PrayerTimesCalculator(method=2)
+    second = manager.get_schedule('2024-11-22')
+    assert second.timings['Fajr'] != first.timings['Fajr']
+    assert (api.calls, other_api.calls) == (1, 1)
+
+    # Возврат к первой конфигурации обслуживается из памяти, затем из базы
+    manager.configure()
+    assert manager.get_schedule('2024-11-22') is first
+    manager.cache.clear()
+    assert manager.get_schedule('2024-11-22').timings == first.timings
+    assert (api.calls, other_api.calls) == (1, 1)
+    assert manager.db.cached_configs() == {default: 1, other: 1}
+
+
+def test_db_does_not_build_network_objects(monkeypatch, tmp_path):
+    import data.prayer_times as prayer_times
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("storage layer must not create API objects")
+
+    monkeypatch.setattr(prayer_times, 'make_transport', forbidden)
+    monkeypatch.setattr(prayer_times, 'CircuitBreaker', forbidden)
+    db = prayer_times.PrayerTimesDB(tmp_path / 'prayer_times.db')
+    assert db.config_id is not None
+    db.close()
+
+
+def test_default_path_imports_legacy_database(tmp_path, monkeypatch):
+    legacy = tmp_path / 'home' / '.mihrezan' / 'prayer_times.db'
+    db = PrayerTimesDB(legacy, legacy_path=None)
+    db.save_prayer_times(PrayerTimesCalculator().get_prayer_times('2024-11-22'))
+    db.close()
+
+    monkeypatch.setenv('MIHREZAN_DATA_DIR', str(tmp_path / 'data'))
+    db = PrayerTimesDB(legacy_path=legacy)
+    assert db.db_path == tmp_path / 'data' / 'prayer_times.db'
+    assert db.get_prayer_times('2024-11-22').timings['Fajr'] == '05:59'
+    assert legacy.exists()
@@ -0,0 +1,37 @@
+import os
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from ui.segment_clock import DIGIT_SEGMENTS, SegmentClock, TOTAL_W
+
+
+def lit(clock, position):
+    return ''.join(name for name, color in clock._segments[position].items() if color.a > 0)
+
+
+def test_digit_change_toggles_only_changed_segments():
+    clock = SegmentClock()
+    assert clock.set_digits('0000') <= 28
+    assert clock.set_digits('0000') == 0
+    # 0 -> 1 гасит a, d, e, f
+    assert clock.set_digits('0001') == 4
+    assert lit(clock, 3) == 'bc'
+    assert lit(clock, 0) == 'abcdef'
+
+
+def test_colon_and_color_do_not_rebuild_canvas():
+    clock = SegmentClock()
+    clock.set_digits('1234')
+    instructions = len(clock.canvas.children)
+
+    clock.toggle_colon_visibility()  # Показывает текущее время
+    assert clock._colon.a == 0
+    clock.color = (1, 0, 0, 1)
+    assert lit(clock, 3) == DIGIT_SEGMENTS[clock._digits[3]]
+    assert clock._segments[3]['g'].rgba[:3] == [1, 0, 0]
+    assert clock._colon.a == 0
+
+    clock.size = (1920, 1080)
+    assert abs(clock._scale.x * TOTAL_W - 1920 * clock.fill) < 1e-6
+    assert len(clock.canvas.children) == instructions
@@ -0,0 +1,83 @@
+import sqlite3
+import time
+
+from data.database import SettingsDatabase
+from data.paths import user_data_dir
+
+
+def stored(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT key, value FROM settings"))
+    finally:
+        conn.close()
+
+
+def test_reads_do_not_touch_sqlite(tmp_path):
+    db = SettingsDatabase(tmp_path / 'settings.db', legacy_path=None)
+    assert db.get_setting('color') == 'lime'
+    db._connect.close()
+    db._connect = None  # Любое обращение к базе упадет
+    assert db.get_setting('color') == 'lime'
+    assert db.get_setting('missing') is None
+
+
+def test_writes_are_coalesced_in_background(tmp_path):
+    path = tmp_path / 'settings.db'
+    db = SettingsDatabase(path, write_delay=0.2, legacy_path=None)
+    for color in ('red', 'blue', 'aqua'):
+        db.save_setting('color', color)
+    db.save_setting('clock_renderer', 'segments')
+    assert db.get_setting('color') == 'aqua'
+    assert stored(path)['color'] == 'lime'  # Еще не записано
+
+    deadline = time.monotonic() + 5
+    while db.writes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert db.writes == 1
+    assert stored(path) == {'color': 'aqua', 'clock_renderer': 'segments'}
+    db.close()
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    path = tmp_path / 'settings.db'
+    db = SettingsDatabase(path, write_delay=60, legacy_path=None)
+    db.save_setting('color', 'red')
+    db.close()
+    assert stored(path)['color'] == 'red'
+    assert SettingsDatabase(path, legacy_path=None).get_setting('color') == 'red'
+
+
+def test_legacy_settings_imported_once(tmp_path):
+    legacy = SettingsDatabase(tmp_path / 'legacy.db', legacy_path=None)
+    legacy.save_setting('color', 'pink')
+    legacy.close()
+
+    path = tmp_path / 'user' / 'settings.db'
+    assert SettingsDatabase(path, legacy_path=tmp_path / 'legacy.db').get_setting('color') == 'pink'
+    # Существующий файл не перезаписывается прежними настройками
+    db = SettingsDatabase(path, write_delay=0, legacy_path=None)
+    db.save_setting('color', 'grey')
+    db.close()
+    assert SettingsDatabase(path, legacy_path=tmp_path / 'legacy.db').get_setting('color') == 'grey'
+
+
+def test_user_data_dir_ignores_cwd(monkeypatch, tmp_path):
+    monkeypatch.delenv('MIHREZAN_DATA_DIR', raising=False)
+    monkeypatch.delenv('ANDROID_PRIVATE', raising=False)
+    first = user_data_dir()
+    monkeypatch.chdir(tmp_path)
+    assert user_data_dir() == first and first.is_absolute()
+    monkeypatch.setenv('MIHREZAN_DATA_DIR', str(tmp_path / 'portable'))
+    assert user_data_dir() == tmp_path / 'portable'
+
+
+def test_listeners_see_changed_values_only(tmp_path):
+    db = SettingsDatabase(tmp_path / 'settings.db', write_delay=0.01, legacy_path=None)
+    seen = []
+    db.add_listener(lambda key, value: seen.append((key, value)))
+    db.save_setting('color', 'lime')  # Значение по умолчанию - не изменение
+    db.save_setting('hijri_adjustment', '1')
+    db.save_setting('hijri_adjustment', '1')
+    assert seen == [('hijri_adjustment', '1')]
+    db.close()
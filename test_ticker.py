@@ -0,0 +1,58 @@
+import os
+from datetime import datetime
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from logic.ticker import WallClockTicker
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.pending = None
+
+    def schedule_once(self, callback, delay):
+        self.pending = (callback, delay)
+        return self
+
+    def cancel(self):
+        self.pending = None
+
+    def run(self, jitter):
+        """Срабатывает отложенный таймер с опозданием (или опережением) jitter."""
+        callback, delay = self.pending
+        self.now += delay + jitter
+        callback(0)
+
+
+def test_ticks_stay_on_wall_clock_boundaries():
+    clock = FakeClock(1_700_000_000.13)
+    boundaries = []
+    ticker = WallClockTicker(boundaries.append, clock=lambda: clock.now, schedule_once=clock.schedule_once)
+    ticker.start()
+    assert abs(clock.pending[1] - 0.37) < 1e-6
+
+    # Кадры опаздывают и опережают, но ошибка не накапливается
+    for i in range(1000):
+        clock.run(jitter=(0.016, -0.004, 0.03)[i % 3])
+    assert boundaries[0] == 1_700_000_000.0 and boundaries[-1] == 1_700_000_000.0 + 500
+    assert all(b % 0.5 == 0 for b in boundaries)
+    assert len(set(boundaries)) == len(boundaries)
+    assert ticker.max_error <= 0.03 + 1e-6
+
+
+def test_label_rerenders_digits_once_per_minute():
+    from ui.base_clock import BaseClockLabel
+
+    label = BaseClockLabel()
+    texts = []
+    label.bind(text=lambda instance, text: texts.append(text))
+    start = datetime(2024, 5, 1, 10, 0).timestamp()
+    for i in range(2 * 3600):  # Час тиков по полсекунды
+        label.update_clock(start + i * 0.5)
+        assert label.colon_label.opacity == (1 if i % 2 == 0 else 0)
+    assert len(texts) == 60
+    assert texts[0] == '10 00' and ':' not in ''.join(texts)
+    assert label.colon_label.text == BaseClockLabel.COLON_TEMPLATE
+    assert label.colon_label.font_size == label.font_size
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+import requests
+
+from data.prayer_times import PrayerTimesManager
+from data.transport import HTTPTransport, RecordingTransport, ReplayTransport, make_transport
+from tools.aladhan_stub_server import StubServer
+
+
+def test_record_then_replay_offline(tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    with StubServer() as server:
+        recorder = RecordingTransport(fixtures)
+        manager = PrayerTimesManager(db_path=tmp_path / 'recorded.db', base_url=server.url,
+                                     transport=recorder)
+        recorded = manager.get_schedule('2024-11-22')
+        assert manager.prefetch('2024-12-01', '2024-12-31') == 31
+    assert len(list(fixtures.glob('*.json'))) == 2
+
+    # Сервер остановлен: ответы приходят только из записей, base_url не важен
+    replay = ReplayTransport(fixtures)
+    manager = PrayerTimesManager(db_path=tmp_path / 'replayed.db', transport=replay)
+    assert manager.get_schedule('2024-11-22').timings == recorded.timings
+    assert manager.prefetch('2024-12-01', '2024-12-31') == 31
+    assert replay.misses == []
+
+    # Незаписанный запрос - как недоступная сеть: отдается локальный расчет
+    assert manager.get_schedule('2024-11-23') is not None
+    assert manager.db.get_prayer_times('2024-11-23') is None
+    assert len(replay.misses) == 1
+
+
+def test_make_transport_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv('MIHREZAN_HTTP_MODE', 'replay')
+    monkeypatch.setenv('MIHREZAN_FIXTURES', str(tmp_path))
+    transport = make_transport()
+    assert isinstance(transport, ReplayTransport) and transport.fixtures_dir == tmp_path
+    with pytest.raises(ValueError):
+        make_transport('offline')
+
+
+def test_stub_injects_latency_errors_and_timeouts():
+    transport = HTTPTransport()
+    params = {'date': '2024-11-22', 'method': 13}
+    with StubServer(latency=0.2) as server:
+        url = f"{server.url}/timingsByCity"
+        started = time.perf_counter()
+        assert transport.get_json(url, params)['data']['timings']['Fajr'] == '05:59'
+        assert time.perf_counter() - started >= 0.2
+
+        server.faults.update(latency=0, error_rate=1, error_status=500)
+        with pytest.raises(requests.exceptions.HTTPError):
+            transport.get_json(url, params)
+
+        # Параметры меняются и по HTTP
+        faults = transport.get_json(server.url.replace('/v1', '/__faults'),
+                                    {'error_rate': 0, 'timeout_rate': 1, 'hang': 1})
+        assert faults['timeout_rate'] == 1.0
+        with pytest.raises(requests.exceptions.Timeout):
+            transport.get_json(url, params, timeout=0.2)
+        assert server.requests_seen['timingsByCity'] == 3
+    transport.close()
+
+
+def test_stub_calendar_and_bad_request():
+    transport = HTTPTransport()
+    with StubServer() as server:
+        month = transport.get_json(f"{server.url}/calendarByCity/2024/2", {})
+        assert len(month['data']) == 29
+        assert month['data'][0]['timings']['Fajr'].endswith('(+04)')
+        with pytest.raises(requests.exceptions.HTTPError):
+            transport.get_json(f"{server.url}/timingsByCity", {'city': 'Atlantis'})
+    transport.close()
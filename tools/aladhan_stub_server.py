@@ -0,0 +1,268 @@
+"""
+Локальная замена api.aladhan.com для нагрузочных тестов и профилирования.
+
+Отдает timingsByCity и calendarByCity в формате Aladhan; времена
+рассчитывает PrayerTimesCalculator (известные ему города, методы с
+локальным расчетом). По запросу добавляет задержку, ошибки и таймауты:
+
+    latency       - задержка ответа, с (плюс случайная до jitter);
+    error_rate    - доля ответов со статусом error_status;
+    timeout_rate  - доля запросов, на которые сервер молчит hang секунд
+                    и закрывает соединение (клиент получает таймаут).
+
+Параметры меняются на лету: GET /__faults?latency=0.5&error_rate=0.1
+(ответ - текущие значения). Из кода:
+
+    with StubServer(latency=0.5) as server:
+        manager = PrayerTimesManager(base_url=server.url)
+
+Из командной строки (из корня репозитория):
+    python tools/aladhan_stub_server.py --port 8765 --latency 0.5
+и PrayerTimesManager(base_url='http://127.0.0.1:8765/v1').
+"""
+
+import argparse
+import calendar
+import json
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logic.prayer_calc import PrayerTimesCalculator
+
+FAULT_FIELDS = {
+    'latency': float, 'jitter': float, 'error_rate': float, 'error_status': int,
+    'timeout_rate': float, 'hang': float,
+}
+
+
+class Faults:
+    """Текущие параметры внедряемых сбоев (меняются на лету)."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 timeout_rate=0.0, hang=30.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def update(self, **values):
+        with self.lock:
+            for name, value in values.items():
+                setattr(self, name, FAULT_FIELDS[name](value))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FAULT_FIELDS}
+
+    def draw(self):
+        """
+        Решение для очередного запроса.
+
+        Returns:
+            tuple: (задержка в секундах, 'ok' | 'error' | 'timeout')
+        """
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            roll = self.random.random()
+            if roll < self.timeout_rate:
+                return self.hang, 'timeout'
+            if roll < self.timeout_rate + self.error_rate:
+                return delay, 'error'
+            return delay, 'ok'
+
+
+def calculator_for(query):
+    """PrayerTimesCalculator для параметров запроса Aladhan."""
+    return PrayerTimesCalculator(
+        query.get('city', 'Baku'), query.get('country', 'Azerbaijan'),
+        int(query.get('method', 13)), school=int(query.get('school', 0)),
+        midnight_mode=int(query.get('midnightMode', 0)), tune=query.get('tune') or None,
+    )
+
+
+def parse_day(value):
+    """Дата из параметра date: DD-MM-YYYY (как у Aladhan) или YYYY-MM-DD."""
+    for fmt in ('%d-%m-%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value}")
+
+
+def timings_body(query):
+    day = parse_day(query['date']) if query.get('date') else date.today()
+    return calculator_for(query).get_prayer_times(day.isoformat())
+
+
+def calendar_body(query, year, month):
+    calc = calculator_for(query)
+    days = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        payload = calc.get_prayer_times(date(year, month, day).isoformat())['data']
+        # В календаре Aladhan время приходит с суффиксом зоны: '05:59 (+04)'
+        payload['timings'] = {name: f"{value} (+04)" for name, value in payload['timings'].items()}
+        days.append(payload)
+    return {'code': 200, 'status': 'OK', 'data': days}
+
+
+class AladhanHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, как у настоящего API
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts == ['__faults']:
+            server.faults.update(**{k: v for k, v in query.items() if k in FAULT_FIELDS})
+            return self._send(200, server.faults.as_dict())
+
+        server.count(next((part for part in parts if part != 'v1'), ''))
+        delay, outcome = server.faults.draw()
+        if outcome == 'timeout':
+            time.sleep(delay)
+            self.close_connection = True
+            return
+        if delay:
+            time.sleep(delay)
+        if outcome == 'error':
+            status = server.faults.error_status
+            return self._send(status, {'code': status, 'status': 'INJECTED_ERROR', 'data': 'Injected error'})
+
+        try:
+            body = server.respond(tuple(parts), query)
+        except (KeyError, ValueError) as e:
+            return self._send(400, {'code': 400, 'status': 'BAD_REQUEST', 'data': str(e)})
+        if body is None:
+            return self._send(404, {'code': 404, 'status': 'NOT_FOUND', 'data': 'Unknown endpoint'})
+        self._send(200, body)
+
+    def _send(self, status, body):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер заглушки, работающий в фоновом потоке.
+
+    Attributes:
+        faults (Faults): Параметры сбоев
+        requests_seen (dict): {эндпоинт: количество запросов}
+        url (str): base_url для PrayerTimesAPI
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, **faults):
+        super().__init__((host, port), AladhanHandler)
+        self.faults = Faults(**faults)
+        self.requests_seen = {}
+        self._counter_lock = threading.Lock()
+        self._bodies = {}  # Ответы кэшируются: замеряется клиент, а не расчет
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handle_error(self, request, client_address):
+        # Клиент, не дождавшийся задержанного ответа, закрывает соединение - это ожидаемо
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def count(self, endpoint):
+        with self._counter_lock:
+            self.requests_seen[endpoint] = self.requests_seen.get(endpoint, 0) + 1
+
+    def respond(self, parts, query):
+        """
+        Тело ответа для сегментов пути и параметров или None для неизвестного пути.
+
+        Raises:
+            ValueError: Некорректные параметры или неизвестный город
+        """
+        key = (parts, tuple(sorted(query.items())))
+        body = self._bodies.get(key)
+        if body is not None:
+            return body
+        endpoint = parts[1:] if parts[:1] == ('v1',) else parts
+        if endpoint == ('timingsByCity',):
+            body = timings_body(query)
+        elif endpoint[:1] == ('calendarByCity',):
+            if len(endpoint) == 3:
+                year, month = int(endpoint[1]), int(endpoint[2])
+            else:
+                year, month = int(query['year']), int(query['month'])
+            body = calendar_body(query, year, month)
+        else:
+            return None
+        body = self._bodies[key] = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        return body
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True,
+                                        name='aladhan-stub')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Aladhan API stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Response delay, s')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay up to, s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of error responses')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Share of unanswered requests')
+    parser.add_argument('--hang', type=float, default=30.0, help='How long unanswered requests hang, s')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        timeout_rate=args.timeout_rate, hang=args.hang, seed=args.seed)
+    print(f"Aladhan stub on {server.url} (faults: {server.faults.as_dict()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+"""
+Экспорт расписания молитв в ICS, CSV или JSON Lines без интерфейса Kivy.
+
+Расписания идут потоком: PrayerTimesManager.iter_schedules читает базу
+помесячно, строки собираются генераторами и сразу пишутся в вывод,
+поэтому память не растет с длиной диапазона. Чего нет в базе, загружается
+помесячными запросами к API (или считается локально при --source local
+и без сети). Дата хиджры, если ее нет в данных, считается локально.
+
+    ics   - по событию VEVENT на каждое время; TZID - часовой пояс места
+            расчета (или --tz, тогда времена переводятся в него) с
+            VTIMEZONE со смещениями зоны на экспортируемый диапазон, без
+            известной зоны - плавающее местное время. Времена, которых в
+            этот день нет (полярный день/ночь), пропускаются. UID
+            постоянный, поэтому повторный импорт обновляет события, а не
+            дублирует их;
+    csv   - строка на день: date, hijri и по столбцу на время;
+    jsonl - объект на день: {"date", "hijri", "timings"}.
+
+Запуск из корня репозитория:
+    python tools/export_timetable.py --from 2025-01-01 --to 2025-12-31 -f ics -o 2025.ics
+    python tools/export_timetable.py --source local --from 2025-01-01 --to 2029-12-31 \\
+        -f csv --names en > baku.csv
+    python tools/export_timetable.py --source local --city Paris --country France \\
+        --latitude 48.8566 --longitude 2.3522 --timezone Europe/Paris \\
+        --from 2025-01-01 --to 2025-12-31 -f ics -o paris.ics
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+from itertools import chain
+from datetime import date as date_cls, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.prayer_times import PRAYER_NAMES_PORTRAIT, PrayerTimesManager
+from data.schedule import normalize_date
+from logic.hijri import HijriCalendar
+from logic.prayer_calc import MISSING_TIME, TIMING_NAMES, get_timezone
+
+NAME_STYLES = {
+    'portrait': PRAYER_NAMES_PORTRAIT,
+    'en': {name: name for name in TIMING_NAMES},
+}
+
+
+def hijri_date(schedule, calendar):
+    """Дата хиджры 'DD-MM-YYYY' из данных расписания или из локального расчета."""
+    if schedule.hijri and 'date' in schedule.hijri:
+        return schedule.hijri['date']
+    hijri = calendar.to_api(schedule.date)
+    return hijri['date'] if hijri else ''
+
+
+def csv_rows(schedules, names, calendar):
+    """Строки CSV: заголовок, затем по строке на день."""
+    yield ['date', 'hijri', *(names[name] for name in TIMING_NAMES)]
+    for schedule in schedules:
+        timings = schedule.timings
+        yield [schedule.date, hijri_date(schedule, calendar), *(timings[name][:5] for name in TIMING_NAMES)]
+
+
+def jsonl_lines(schedules, names, calendar):
+    """Строки JSON Lines: по объекту на день."""
+    for schedule in schedules:
+        timings = schedule.timings
+        yield json.dumps({
+            'date': schedule.date,
+            'hijri': hijri_date(schedule, calendar),
+            'timings': {names[name]: timings[name][:5] for name in TIMING_NAMES},
+        }, ensure_ascii=False) + '\n'
+
+
+def format_offset(seconds):
+    """Смещение от UTC в секундах -> '+0400' (или '+053328' с секундами)."""
+    sign = '-' if seconds < 0 else '+'
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f'{sign}{hours:02d}{minutes:02d}' + (f'{seconds:02d}' if seconds else '')
+
+
+def timezone_transitions(tzid, first, last):
+    """
+    Смещения зоны на диапазон дат.
+
+    Смещение проверяется раз в сутки (в полдень UTC), а момент смены
+    уточняется делением пополам до секунды.
+
+    Args:
+        tzid (str): Часовой пояс ('Asia/Baku')
+        first, last (date): Диапазон дат включительно
+
+    Returns:
+        list: [(момент смены в секундах эпохи или None для начального,
+               смещение до, смещение после, datetime после смены)]
+    """
+    tz = get_timezone(tzid)
+
+    def at(ts):
+        return datetime.fromtimestamp(ts, tz)
+
+    def offset(ts):
+        return int(at(ts).utcoffset().total_seconds())
+
+    noon = datetime(first.year, first.month, first.day, 12, tzinfo=timezone.utc).timestamp() - 86400
+    end = datetime(last.year, last.month, last.day, 12, tzinfo=timezone.utc).timestamp() + 86400
+    current = offset(noon)
+    transitions = [(None, current, current, at(noon))]
+    while noon < end:
+        following = noon + 86400
+        if offset(following) != current:
+            low, high = noon, following
+            while high - low > 1:
+                middle = (low + high) // 2
+                low, high = (middle, high) if offset(middle) == current else (low, middle)
+            transitions.append((high, current, offset(high), at(high)))
+            current = offset(high)
+        noon = following
+    return transitions
+
+
+def vtimezone_lines(tzid, first, last):
+    """
+    Компонент VTIMEZONE для TZID событий (RFC 5545, 3.6.5).
+
+    Одна STANDARD-часть на начальное смещение и по части на каждую смену
+    смещения в диапазоне; для зон без перехода на летнее время это один
+    фиксированный блок.
+    """
+    lines = ['BEGIN:VTIMEZONE', f'TZID:{tzid}']
+    for moment, before, after, local in timezone_transitions(tzid, first, last):
+        kind = 'DAYLIGHT' if local.dst() else 'STANDARD'
+        # DTSTART части - местное время по смещению до смены
+        start = '19700101T000000' if moment is None else \
+            datetime.fromtimestamp(moment + before, timezone.utc).strftime('%Y%m%dT%H%M%S')
+        lines += [f'BEGIN:{kind}', f'DTSTART:{start}', f'TZOFFSETFROM:{format_offset(before)}',
+                  f'TZOFFSETTO:{format_offset(after)}']
+        name = local.tzname()
+        if name:
+            lines.append(f'TZNAME:{name}')
+        lines.append(f'END:{kind}')
+    lines.append('END:VTIMEZONE')
+    return lines
+
+
+def ics_lines(schedules, names, uid_suffix, tzid=None, stamp=None, span=None, source_tz=None):
+    """
+    Календарь iCalendar (RFC 5545) по частям: заголовок, события дня, окончание.
+
+    Args:
+        uid_suffix (str): Окончание UID событий (место и параметры расчета)
+        tzid (str): Часовой пояс ('Asia/Baku') или None - плавающее местное время
+        stamp (datetime): DTSTAMP событий (по умолчанию - сейчас)
+        span (tuple): (первая, последняя дата) для VTIMEZONE; по умолчанию - текущий год
+        source_tz: tzinfo времен в расписаниях, если он отличается от tzid;
+                   тогда времена переводятся в tzid
+    """
+    stamp = (stamp or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+    start = f'DTSTART;TZID={tzid}:' if tzid else 'DTSTART:'
+    target_tz = get_timezone(tzid) if tzid and source_tz is not None else None
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//MihrEzan//Prayer Times//EN', 'CALSCALE:GREGORIAN']
+    if tzid:
+        header.append(f'X-WR-TIMEZONE:{tzid}')
+        if span is None:
+            today = date_cls.today()
+            span = (today.replace(month=1, day=1), today.replace(month=12, day=31))
+        header.extend(vtimezone_lines(tzid, *span))
+    yield '\r\n'.join(header) + '\r\n'
+
+    summaries = {name: names[name].replace(',', '\\,').replace(';', '\\;') for name in TIMING_NAMES}
+    keys = {name: name.lower() for name in TIMING_NAMES}
+    for schedule in schedules:
+        timings = schedule.timings
+        day = schedule.date.replace('-', '')
+        next_day = None
+        maghrib = timings['Maghrib'][:5]
+        parts = []
+        for name in TIMING_NAMES:
+            value = timings[name][:5]
+            if value == MISSING_TIME:
+                continue  # Времени в этот день нет (полярный день/ночь)
+            event_day = day
+            if name == 'Midnight' and maghrib != MISSING_TIME and value < maghrib:
+                # Полночь после 00:00 относится к ночи после этого дня (как в PrayerIndex)
+                if next_day is None:
+                    next_day = (date_cls.fromisoformat(schedule.date) + timedelta(days=1)).strftime('%Y%m%d')
+                event_day = next_day
+            if target_tz is None:
+                moment = f'{event_day}T{value[:2]}{value[3:5]}00'
+            else:
+                local = datetime(int(event_day[:4]), int(event_day[4:6]), int(event_day[6:]),
+                                 int(value[:2]), int(value[3:5]), tzinfo=source_tz)
+                moment = local.astimezone(target_tz).strftime('%Y%m%dT%H%M%S')
+            parts.append(
+                f'BEGIN:VEVENT\r\nUID:{day}-{keys[name]}-{uid_suffix}\r\nDTSTAMP:{stamp}\r\n'
+                f'{start}{moment}\r\nSUMMARY:{summaries[name]}\r\n'
+                f'TRANSP:TRANSPARENT\r\nEND:VEVENT\r\n'
+            )
+        yield ''.join(parts)
+    yield 'END:VCALENDAR\r\n'
+
+
+def location_timezone(manager, schedule=None):
+    """
+    Часовой пояс места расчета менеджера.
+
+    Returns:
+        Зона локального расчета (имя IANA или смещение в часах), иначе
+        meta.timezone данных API из schedule, иначе None
+    """
+    calculator = manager.api if manager.api.is_local else manager.local
+    if calculator is not None:
+        return calculator.timezone
+    if schedule is not None:
+        return schedule.meta.get('timezone')
+    return None
+
+
+def export(manager, start_date, end_date, fmt, out, names='portrait', tzid=None, calendar=None):
+    """
+    Пишет расписание на диапазон дат в out потоком.
+
+    Args:
+        manager (PrayerTimesManager): Источник расписаний
+        fmt (str): 'ics', 'csv' или 'jsonl'
+        out: Текстовый поток (открытый с newline='')
+        names (str): 'portrait' (PRAYER_NAMES_PORTRAIT) или 'en'
+        tzid (str): Часовой пояс ICS; по умолчанию - зона места расчета,
+                    иначе времена переводятся из нее в tzid
+
+    Returns:
+        int: Количество выгруженных дней
+    """
+    names = NAME_STYLES[names]
+    calendar = calendar or HijriCalendar()
+    days = 0
+
+    def counted(schedules):
+        nonlocal days
+        for schedule in schedules:
+            days += 1
+            yield schedule
+
+    schedules = counted(manager.iter_schedules(start_date, end_date))
+    if fmt == 'csv':
+        csv.writer(out).writerows(csv_rows(schedules, names, calendar))
+    elif fmt == 'jsonl':
+        out.writelines(jsonl_lines(schedules, names, calendar))
+    elif fmt == 'ics':
+        span = (date_cls.fromisoformat(normalize_date(start_date)),
+                date_cls.fromisoformat(normalize_date(end_date)))
+        # Для данных API зона места известна только из meta первого дня
+        first = next(schedules, None)
+        if first is not None:
+            schedules = chain((first,), schedules)
+        zone = location_timezone(manager, first)
+        source_tz = None
+        if tzid is None:
+            # Числовое смещение не годится в TZID: тогда плавающее время
+            tzid = zone if isinstance(zone, str) else None
+        elif zone is not None and zone != tzid:
+            source_tz = get_timezone(zone)
+        out.writelines(ics_lines(schedules, names, f'{manager.fingerprint[:12]}@mihrezan', tzid,
+                                 span=span, source_tz=source_tz))
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return days
+
+
+def iso_date(value):
+    """Тип аргумента argparse: дата YYYY-MM-DD."""
+    try:
+        return date_cls.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def time_zone(value):
+    """Тип аргумента argparse: часовой пояс, известный get_timezone."""
+    try:
+        get_timezone(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"unknown time zone {value!r}")
+    return value
+
+
+def location_zone(value):
+    """Тип аргумента argparse: зона IANA или смещение в часах ('4', '-3.5')."""
+    try:
+        return float(value)
+    except ValueError:
+        return time_zone(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export prayer timetables to ICS, CSV or JSON Lines")
+    parser.add_argument('--from', dest='start', type=iso_date, required=True, help='First day, YYYY-MM-DD')
+    parser.add_argument('--to', dest='end', type=iso_date, required=True, help='Last day, YYYY-MM-DD (inclusive)')
+    parser.add_argument('-f', '--format', choices=('ics', 'csv', 'jsonl'), default='csv')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument('--names', choices=sorted(NAME_STYLES), default='portrait',
+                        help='Prayer names: portrait (Azerbaijani) or en')
+    parser.add_argument('--city', default='Baku')
+    parser.add_argument('--country', default='Azerbaijan')
+    parser.add_argument('--method', type=int, default=13)
+    parser.add_argument('--school', type=int, default=0)
+    parser.add_argument('--latitude', type=float, help='Location latitude (for cities without built-in coordinates)')
+    parser.add_argument('--longitude', type=float, help='Location longitude')
+    parser.add_argument('--timezone', type=location_zone,
+                        help='Location time zone, e.g. Europe/Paris or an offset in hours')
+    parser.add_argument('--source', choices=('api', 'local'), default='api')
+    parser.add_argument('--db', help='Prayer times database (default: the app cache)')
+    parser.add_argument('--tz', type=time_zone,
+                        help='ICS time zone, e.g. Europe/Berlin; times are converted to it '
+                             '(default: the location time zone)')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+    if args.start > args.end:
+        parser.error(f"--from {args.start} is after --to {args.end}")
+
+    if (args.latitude is None) != (args.longitude is None):
+        parser.error("--latitude and --longitude must be given together")
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    location = {key: getattr(args, key) for key in ('latitude', 'longitude', 'timezone')
+                if getattr(args, key) is not None}
+    try:
+        manager = PrayerTimesManager(args.city, args.country, args.method, args.source,
+                                     school=args.school, db_path=args.db, **location)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output:
+        out = open(args.output, 'w', encoding='utf-8', newline='')
+    else:
+        sys.stdout.reconfigure(encoding='utf-8', newline='')
+        out = sys.stdout
+    try:
+        days = export(manager, args.start, args.end, args.format, out, args.names, args.tz)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        manager.db.close()
+    print(f"{days} days exported", file=sys.stderr)
+    return 0 if days else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
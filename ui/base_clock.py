@@ -1,15 +1,97 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
 from kivy.uix.label import Label
+from kivy.core.text import Label as CoreLabel
 from kivy.core.window import Window
 from kivy.animation import Animation
 from kivy.clock import Clock
+from logic.metrics import get_metrics
 from logic.time_handler import TimeHandler
 
+metrics = get_metrics()
+
+
+def measure_text_width(text, font_name, font_size):
+    """Ширина строки в пикселях без растеризации текстуры"""
+    return CoreLabel(font_name=font_name, font_size=font_size).get_extents(text)[0]
+
+
+def fit_font_size(text, font_name, width, max_measurements=6):
+    """
+    Наибольший размер шрифта, при котором text помещается в width.
+    
+    Ширина строки почти пропорциональна размеру шрифта, поэтому каждое
+    измерение дает новую оценку size * width / measured. Оценка зажимается
+    в интервал [помещается, не помещается], а если выпадает из него -
+    берется середина (бисекция). Обычно хватает 2-3 измерений.
+    
+    Args:
+        text: Строка-шаблон для измерения
+        font_name: Путь к файлу шрифта
+        width: Доступная ширина в пикселях
+        max_measurements: Максимальное количество измерений
+    Returns:
+        float: Размер шрифта
+    """
+    with metrics.timer('ui.font_fit'):
+        return _fit_font_size(text, font_name, width, max_measurements)
+
+
+def _fit_font_size(text, font_name, width, max_measurements):
+    fits = overflows = None
+    size = width / 3.5  # Начальная оценка
+    for _ in range(max_measurements):
+        metrics.inc('ui.font_measure')
+        measured = measure_text_width(text, font_name, size)
+        if measured <= width:
+            fits = size
+            if width - measured < 1:
+                break  # Меньше пикселя до края
+        else:
+            overflows = size
+        if fits is not None and overflows is not None and overflows - fits < 0.5:
+            break
+        
+        size = size * width / max(measured, 1)
+        if fits is not None and overflows is not None and not fits < size < overflows:
+            size = (fits + overflows) / 2
+    
+    if fits is None:
+        # Не поместилось ни разу: берем пропорциональную оценку с запасом
+        return overflows * width / max(measure_text_width(text, font_name, overflows), 1) * 0.99
+    return fits
+
+
+@lru_cache(maxsize=32)
+def fitted_font_size(width, height, font_name, template):
+    """Размер шрифта для окна; повторные ориентации и размеры берутся из кэша"""
+    return fit_font_size(template, font_name, width)
+
+
 class BaseClockLabel(Label):
+    # В DSEG7 '!' - пустое место шириной с цифру, поэтому двоеточие
+    # отдельной метки ложится точно между цифрами основной
+    COLON_TEMPLATE = '!!:!!'
+    # Свойства, которые метка двоеточия повторяет за основной
+    COLON_MIRRORED = ('font_name', 'font_size', 'color', 'halign', 'valign',
+                      'text_size', 'padding', 'pos', 'size')
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.font_name = "fonts/DSEG7Classic-Bold.ttf"
         self.color = (0, 1, 0, 1)
         self.is_colon_visible = True
+        self._minute = None
+        
+        # Двоеточие - отдельная метка: мигание меняет только ее прозрачность,
+        # текстура цифр перестраивается лишь при смене минуты
+        self.colon_label = Label(text=self.COLON_TEMPLATE, size_hint=(None, None))
+        for name in self.COLON_MIRRORED:
+            setattr(self.colon_label, name, getattr(self, name))
+            self.bind(**{name: self.colon_label.setter(name)})
+        self.add_widget(self.colon_label)
         
         # Базовые настройки
         self.size_hint = (1, None)
@@ -17,7 +99,21 @@ class BaseClockLabel(Label):
         
         # Инициализация
         self.setup_style()
-        Window.bind(on_resize=self.on_window_resize)
+        self._attached = False
+        self.attach()
+    
+    def attach(self):
+        """Подписка на изменения окна (при показе виджета)"""
+        if not self._attached:
+            self._attached = True
+            Window.bind(on_resize=self.on_window_resize)
+            self.calculate_font_size()  # Окно могло измениться, пока виджет был скрыт
+    
+    def detach(self):
+        """Отписка от окна (при снятии виджета с экрана)"""
+        if self._attached:
+            self._attached = False
+            Window.unbind(on_resize=self.on_window_resize)
 
     def calculate_font_size(self):
         """Умная адаптация размера шрифта"""
@@ -26,24 +122,10 @@ class BaseClockLabel(Label):
         aspect_ratio = width / height
         
         if aspect_ratio > 1:  # Альбомная ориентация
-            font_size = width / 3.5  # Начальный размер
+            font_size = fitted_font_size(width, height, self.font_name, self.text_template())
             self.font_size = font_size
             self.text_size = (width, None)
             self.size = (width, height)
-            self.texture_update()
-            
-            # Сначала уменьшаем, если текст больше окна
-            while self.texture_size[0] > width:
-                font_size *= 0.99  # Уменьшаем на 1%
-                self.font_size = font_size
-                self.texture_update()
-                
-            # Теперь увеличиваем, если текст меньше окна
-            while self.texture_size[0] < width:
-                font_size *= 1.001  # Увеличиваем на 0.1%
-                self.font_size = font_size
-                self.texture_update()
-                
             return font_size
             
         else:  # Портретная ориентация - не трогаем
@@ -51,6 +133,11 @@ class BaseClockLabel(Label):
             self.font_size = font_size
             return font_size
                 
+    @staticmethod
+    def text_template():
+        """Самая широкая строка времени: все цифры DSEG7 заменены на 8"""
+        return re.sub(r'\d', '8', TimeHandler.get_formatted_time(True))
+                
     def setup_style(self):
         """Базовая настройка стиля"""
         self.size_hint = (1, 1)
@@ -60,8 +147,8 @@ class BaseClockLabel(Label):
         self.halign = 'center'
         self.valign = 'top'  # Прижимаем к верху
         
-        # Сначала устанавливаем текст
-        self.text = TimeHandler.get_formatted_time(self.is_colon_visible)
+        # Сначала устанавливаем текст (цифры без двоеточия)
+        self.update_digits(datetime.now())
         self.texture_update()
         
         # Потом считаем размер шрифта
@@ -76,10 +163,37 @@ class BaseClockLabel(Label):
         self.text_size = (Window.width, Window.height)
         self.texture_update()
     
+    def texture_update(self, *largs):
+        """Растеризация текста; замеряется, т.к. это самая дорогая часть тика"""
+        with metrics.timer('ui.texture_update'):
+            super().texture_update(*largs)
+    
+    def update_digits(self, now):
+        """Меняет текст цифр только при смене минуты"""
+        minute = (now.year, now.month, now.day, now.hour, now.minute)
+        if minute != self._minute:
+            self._minute = minute
+            self.text = TimeHandler.get_formatted_time(False, now)
+    
+    def set_colon_visible(self, visible):
+        """Показ двоеточия без перерисовки текстуры"""
+        self.is_colon_visible = visible
+        self.colon_label.opacity = 1 if visible else 0
+    
+    def update_clock(self, now):
+        """
+        Тик часов на границе полусекунды.
+        Args:
+            now: Время границы в секундах эпохи
+        """
+        # Двоеточие горит в первой половине каждой секунды
+        self.set_colon_visible(now % 1 < 0.5)
+        self.update_digits(datetime.fromtimestamp(now))
+    
     def toggle_colon_visibility(self):
         """Переключение видимости двоеточия"""
-        self.is_colon_visible = not self.is_colon_visible
-        self.text = TimeHandler.get_formatted_time(self.is_colon_visible)
+        self.set_colon_visible(not self.is_colon_visible)
+        self.update_digits(datetime.now())
         
     def on_window_resize(self, instance, width, height):
         """Обработка изменения размера окна"""
@@ -0,0 +1,24 @@
+# ui/colors.py
+"""
+Палитра часов: названия цветов из настроек -> RGBA.
+
+Вынесена из SettingsWindow, чтобы часы могли применить сохраненный цвет,
+не загружая окно настроек при запуске.
+"""
+
+COLORS = {
+    'lime': (0, 1, 0, 1),
+    'aqua': (0, 1, 1, 1),
+    'blue': (0, 0, 1, 1),
+    'red': (1, 0, 0, 1),
+    'yellow': (1, 1, 0, 1),
+    'magenta': (1, 0, 1, 1),
+    'pink': (1, 0.75, 0.8, 1),
+    'grey': (0.7, 0.7, 0.7, 1),
+    'white': (1, 1, 1, 1)
+}
+
+
+def get_color_tuple(color_name):
+    """Преобразование названия цвета в RGB"""
+    return COLORS.get(color_name, (0, 1, 0, 1))  # По умолчанию возвращаем Lime
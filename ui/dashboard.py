@@ -0,0 +1,129 @@
+# ui/dashboard.py
+import time
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.gridlayout import GridLayout
+from kivy.uix.label import Label
+
+from logic.dashboard import get_dashboard_model
+from logic.prayer_calc import TIMING_NAMES
+from data.database import get_settings_database
+from ui.colors import get_color_tuple
+
+# Короткие подписи столбцов (как PRAYER_NAMES_LANDSCAPE_AZ, без загрузки data.prayer_times)
+COLUMN_NAMES = {
+    'Midnight': 'THCD',
+    'Fajr': 'İMSK',
+    'Sunrise': 'GNƏŞ',
+    'Dhuhr': 'GÜNO',
+    'Asr': 'İKND',
+    'Maghrib': 'AXŞM',
+    'Isha': 'GECƏ'
+}
+
+TEXT_COLOR = (0.9, 0.9, 0.9, 1)
+HEADER_COLOR = (0.502, 0.502, 0, 1)  # Olive, как у дат
+NEXT_COLOR = (1, 0.843, 0, 1)  # Следующая молитва города
+
+
+class DashboardClock(Label):
+    """Текущее время в заголовке табло; текстура меняется раз в минуту."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_name = 'fonts/DSEG7Classic-Bold.ttf'
+        self.size_hint_y = 0.12
+
+    def update_clock(self, now):
+        text = time.strftime('%H:%M', time.localtime(now))
+        if text != self.text:
+            self.text = text
+
+    def attach(self):
+        pass
+
+    def detach(self):
+        pass
+
+
+class DashboardLayout(BoxLayout):
+    """
+    Табло с временами молитв для многих городов.
+
+    Строки рисуются из общей DashboardModel: при смене дня или следующей
+    молитвы города обновляются только метки его строки. Каждую секунду
+    работает только заголовок с часами (и тот перерисовывается раз в минуту).
+    """
+
+    def __init__(self, model=None, **kwargs):
+        super().__init__(orientation='vertical', padding=10, spacing=5, **kwargs)
+        self.model = model or get_dashboard_model()
+        self.db = get_settings_database()
+        self._attached = False
+
+        self.clock_label = DashboardClock()
+        saved_color = self.db.get_setting('color')
+        if saved_color:
+            self.clock_label.color = get_color_tuple(saved_color)
+        self.add_widget(self.clock_label)
+
+        self.grid = GridLayout(cols=len(TIMING_NAMES) + 1, spacing=(8, 2))
+        self._header = [self._cell('', HEADER_COLOR)]
+        self._header.extend(self._cell(COLUMN_NAMES[name], HEADER_COLOR) for name in TIMING_NAMES)
+        # Для каждого города: [название, время по TIMING_NAMES...]
+        self.cells = []
+        for city in self.model.cities:
+            row = [self._cell(city.name, HEADER_COLOR, halign='left')]
+            row.extend(self._cell('--:--') for _ in TIMING_NAMES)
+            self.cells.append(row)
+        for label in self._header:
+            self.grid.add_widget(label)
+        for row in self.cells:
+            for label in row:
+                self.grid.add_widget(label)
+        self.add_widget(self.grid)
+        self.grid.bind(size=self._update_font_sizes)
+
+    @staticmethod
+    def _cell(text, color=TEXT_COLOR, halign='center'):
+        label = Label(text=text, color=color, font_name='fonts/Oswald-Bold.ttf', halign=halign)
+        label.bind(size=label.setter('text_size'))
+        return label
+
+    def _update_font_sizes(self, *args):
+        """Размер шрифта от высоты строки; пересчитывается только при изменении размера."""
+        rows = len(self.cells) + 1
+        font_size = max(self.grid.height / rows * 0.6, 8)
+        self.clock_label.font_size = self.height * self.clock_label.size_hint_y * 0.8
+        for label in self._header:
+            label.font_size = font_size
+        for row in self.cells:
+            for label in row:
+                label.font_size = font_size
+
+    def attach(self):
+        """Подписка на модель и запуск ее таймера (при показе табло)"""
+        if not self._attached:
+            self._attached = True
+            self.model.bind(on_city_changed=self.update_row)
+            self.model.start()
+            for index, row in enumerate(self.model.rows):
+                self.update_row(self.model, index, row)
+
+    def detach(self):
+        """Отписка от модели (при снятии с экрана)"""
+        if self._attached:
+            self._attached = False
+            self.model.unbind(on_city_changed=self.update_row)
+            self.model.stop()
+
+    def update_row(self, model, index, row):
+        if row is None:
+            return
+        for label, name in zip(self.cells[index][1:], TIMING_NAMES):
+            text = row.timings[name]
+            color = NEXT_COLOR if name == row.next_prayer else TEXT_COLOR
+            if label.text != text:
+                label.text = text
+            if tuple(label.color) != color:
+                label.color = color
@@ -1,55 +1,52 @@
 from kivy.uix.label import Label
-from kivy.clock import Clock
-from datetime import datetime
 from kivy.metrics import sp
-from data.prayer_times import PrayerTimesManager, format_gregorian_date, format_hijri_date
+from logic.day_context import get_day_context
 
 class DateLabel(Label):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.font_name = 'Comfortaa-Bold'
+        self.font_name = 'fonts/Comfortaa-Bold.ttf'
         self.font_size = sp(20)
         self.color = (0.502, 0.502, 0, 1)  # Olive color
         self.size_hint = (None, None)
         self.size = (400, 30)
-        self.prayer_manager = PrayerTimesManager()
-        Clock.schedule_interval(self.update_date, 1)  # Обновление каждую секунду
+        # Общий контекст дня: метки подписываются на изменения, а не опрашивают данные
+        self.day_context = get_day_context()
+        self._attached = False
+
+    def attach(self):
+        """Подписка на контекст дня (при показе метки)"""
+        if not self._attached:
+            self._attached = True
+            self.day_context.bind(**{self.context_property: self.update_date})
+            self.update_date(self.day_context, getattr(self.day_context, self.context_property))
+
+    def detach(self):
+        """Отписка от контекста дня (при снятии метки с экрана)"""
+        if self._attached:
+            self._attached = False
+            self.day_context.unbind(**{self.context_property: self.update_date})
 
 class GregorianDateLabel(DateLabel):
+    context_property = 'gregorian_text'
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.pos_hint = {'center_x': 0.5, 'y': 0.65}  # Теперь григорианская дата внизу
-        self.update_date(0)
-
-    def update_date(self, dt):
-        current_date = datetime.now()
-        date_str = current_date.strftime("%d-%m-%Y")
-        weekday = current_date.strftime("%A")
-        
-        data = self.prayer_manager.get_prayer_times()
-        if data and 'data' in data:
-            timings = data['data'].get('timings', {})
-            if timings:
-                self.text = format_gregorian_date(date_str, weekday)
-        else:
-            self.text = format_gregorian_date(date_str, weekday)  # Запасной вариант
+        self.attach()
+
+    def update_date(self, context, text):
+        self.text = text
 
 class HijriDateLabel(DateLabel):
+    context_property = 'hijri_text'
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.pos_hint = {'center_x': 0.5, 'y': 0.7}  # Теперь хиджри наверху
         self.opacity = 0  # Начинаем скрытым
-        self.update_date(0)
-
-    def update_date(self, dt):
-        data = self.prayer_manager.get_prayer_times()
-        if data and 'data' in data:
-            date_data = data['data'].get('date', {})
-            if date_data and 'hijri' in date_data:
-                hijri = date_data['hijri']
-                self.text = f"{hijri['day']} {hijri['month']['en']} {hijri['year']}"
-                self.opacity = 1
-            else:
-                self.opacity = 0
-        else:
-            self.opacity = 0
+        self.attach()
+
+    def update_date(self, context, text):
+        self.text = text
+        self.opacity = 1 if text else 0
@@ -3,17 +3,17 @@ from kivy.uix.button import Button
 from kivy.uix.floatlayout import FloatLayout
 from kivy.core.window import Window
 from ui.base_clock import BaseClockLabel
-from ui.settings_window import SettingsWindow
-from data.database import SettingsDatabase
+from ui.colors import get_color_tuple
+from data.database import get_settings_database
 from ui.date_labels import GregorianDateLabel, HijriDateLabel
 
 class PortraitClockLayout(FloatLayout):
-    def __init__(self, **kwargs):
+    def __init__(self, clock_class=None, **kwargs):
         super().__init__(**kwargs)
-        self.db = SettingsDatabase()
+        self.db = get_settings_database()
         
-        # Создаем метку времени
-        self.clock_label = PortraitClockLabel()
+        # Создаем метку времени (PortraitClockLabel или PortraitSegmentClock)
+        self.clock_label = (clock_class or PortraitClockLabel)()
         self.add_widget(self.clock_label)
         
         # Добавляем григорианскую дату
@@ -40,10 +40,22 @@ class PortraitClockLayout(FloatLayout):
         # Применяем сохраненные настройки
         saved_color = self.db.get_setting('color')
         if saved_color:
-            self.clock_label.color = SettingsWindow.get_color_tuple(saved_color)
+            self.clock_label.color = get_color_tuple(saved_color)
+    
+    def attach(self):
+        """Подписка дочерних виджетов на окно и контекст дня"""
+        for widget in (self.clock_label, self.gregorian_date, self.hijri_date):
+            widget.attach()
+    
+    def detach(self):
+        """Отписка дочерних виджетов (при снятии с экрана)"""
+        for widget in (self.clock_label, self.gregorian_date, self.hijri_date):
+            widget.detach()
     
     def show_settings(self, instance):
         """Показать окно настроек"""
+        # Окно настроек загружается при первом открытии, а не при запуске
+        from ui.settings_window import SettingsWindow
         settings_window = SettingsWindow(self.db, self, self.apply_settings)
         settings_window.open()
     
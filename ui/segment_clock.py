@@ -0,0 +1,227 @@
+# ui/segment_clock.py
+"""
+Семисегментные часы, нарисованные инструкциями canvas.
+
+Label с шрифтом DSEG7 растеризует полноэкранную текстуру при каждом
+мигании двоеточия и изменении размера. Здесь каждый сегмент - это
+постоянный Mesh со своим Color: смена цифры или двоеточия только меняет
+прозрачность нужных сегментов, а изменение размера - один Translate и
+один Scale. Текстуры не создаются вовсе.
+"""
+
+from datetime import datetime
+
+from kivy.graphics import Color, Mesh, PopMatrix, PushMatrix, Scale, Translate
+from kivy.properties import ColorProperty, NumericProperty, OptionProperty
+from kivy.uix.widget import Widget
+
+from data.database import get_settings_database
+from logic.time_handler import TimeHandler
+from ui.colors import get_color_tuple
+
+# Геометрия в условных единицах: ширина и высота цифры, толщина сегмента,
+# зазор между сегментами, расстояние между цифрами и ширина места под двоеточие
+DIGIT_W, DIGIT_H, THICK, GAP = 10.0, 18.0, 2.0, 0.3
+SPACING, COLON_W = 3.0, 6.0
+TOTAL_W = 4 * DIGIT_W + 2 * SPACING + COLON_W
+TOTAL_H = DIGIT_H
+
+# Горящие сегменты (a-g) для каждой цифры
+DIGIT_SEGMENTS = {
+    '0': 'abcdef', '1': 'bc', '2': 'abdeg', '3': 'abcdg', '4': 'bcfg',
+    '5': 'acdfg', '6': 'acdefg', '7': 'abc', '8': 'abcdefg', '9': 'abcdfg',
+}
+SEGMENT_NAMES = 'abcdefg'
+
+
+def _horizontal(x0, x1, y):
+    """Шестиугольник горизонтального сегмента"""
+    h = THICK / 2
+    return [(x0, y), (x0 + h, y + h), (x1 - h, y + h), (x1, y), (x1 - h, y - h), (x0 + h, y - h)]
+
+
+def _vertical(x, y0, y1):
+    """Шестиугольник вертикального сегмента"""
+    h = THICK / 2
+    return [(x, y0), (x + h, y0 + h), (x + h, y1 - h), (x, y1), (x - h, y1 - h), (x - h, y0 + h)]
+
+
+def segment_polygons(x):
+    """
+    Многоугольники сегментов a-g цифры с левым краем в x.
+
+    Returns:
+        dict: {имя сегмента: [(x, y), ...]}
+    """
+    h = THICK / 2
+    left, right = x + h, x + DIGIT_W - h
+    top, middle, bottom = DIGIT_H - h, DIGIT_H / 2, h
+    return {
+        'a': _horizontal(left + GAP, right - GAP, top),
+        'b': _vertical(right, middle + GAP, top - GAP),
+        'c': _vertical(right, bottom + GAP, middle - GAP),
+        'd': _horizontal(left + GAP, right - GAP, bottom),
+        'e': _vertical(left, bottom + GAP, middle - GAP),
+        'f': _vertical(left, middle + GAP, top - GAP),
+        'g': _horizontal(left + GAP, right - GAP, middle),
+    }
+
+
+def _mesh(points):
+    vertices = []
+    for px, py in points:
+        vertices.extend((px, py, 0, 0))
+    return Mesh(vertices=vertices, indices=list(range(len(points))), mode='triangle_fan')
+
+
+class SegmentClock(Widget):
+    """
+    Часы HH:MM из четырех семисегментных цифр и двоеточия.
+
+    Интерфейс совпадает с BaseClockLabel: color, is_colon_visible,
+    toggle_colon_visibility(), поэтому виджет можно подставить вместо метки.
+
+    Attributes:
+        color: Цвет горящих сегментов
+        valign: Вертикальное выравнивание ('middle' или 'top')
+        fill: Доля ширины виджета, занимаемая часами
+        max_height: Наибольшая доля высоты виджета, занимаемая часами
+    """
+
+    color = ColorProperty([0, 1, 0, 1])
+    valign = OptionProperty('middle', options=['middle', 'top'])
+    fill = NumericProperty(0.98)
+    max_height = NumericProperty(1.0)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.is_colon_visible = True
+        self._digits = [None] * 4
+        self._segments = []  # [{имя сегмента: Color}] по позициям цифр
+
+        with self.canvas:
+            PushMatrix()
+            self._translate = Translate()
+            self._scale = Scale()
+            for position in range(4):
+                x = position * (DIGIT_W + SPACING) + (COLON_W if position >= 2 else 0)
+                colors = {}
+                for name, points in segment_polygons(x).items():
+                    colors[name] = Color(rgba=self._off_color())
+                    _mesh(points)
+                self._segments.append(colors)
+
+            colon_x = 2 * DIGIT_W + SPACING + (COLON_W - THICK) / 2
+            self._colon = Color(rgba=self.color)
+            for y in (DIGIT_H * 0.3, DIGIT_H * 0.7):
+                _mesh([(colon_x, y - THICK / 2), (colon_x + THICK, y - THICK / 2),
+                       (colon_x + THICK, y + THICK / 2), (colon_x, y + THICK / 2)])
+            PopMatrix()
+
+        self.bind(pos=self._update_transform, size=self._update_transform,
+                  valign=self._update_transform, fill=self._update_transform,
+                  max_height=self._update_transform)
+        self.update_time()
+
+    def attach(self):
+        """Внешних подписок нет: размер приходит от родителя"""
+
+    def detach(self):
+        """Внешних подписок нет"""
+
+    def _off_color(self):
+        return (self.color[0], self.color[1], self.color[2], 0)
+
+    def set_digits(self, digits):
+        """
+        Показывает четыре цифры, переключая только изменившиеся сегменты.
+
+        Args:
+            digits: Строка из четырех цифр, например '0930'
+        Returns:
+            int: Количество переключенных сегментов
+        """
+        changed = 0
+        for position, digit in enumerate(digits):
+            previous = self._digits[position]
+            if digit == previous:
+                continue
+            lit = DIGIT_SEGMENTS[digit]
+            was_lit = DIGIT_SEGMENTS[previous] if previous is not None else ''
+            for name in SEGMENT_NAMES:
+                if previous is None or (name in lit) != (name in was_lit):
+                    self._segments[position][name].a = self.color[3] if name in lit else 0
+                    changed += 1
+            self._digits[position] = digit
+        return changed
+
+    def update_time(self, now=None):
+        """Показывает текущее время (или время now - datetime)"""
+        current = TimeHandler.get_formatted_time(True, now)
+        return self.set_digits(current[:2] + current[3:])
+
+    def set_colon_visible(self, visible):
+        self.is_colon_visible = visible
+        self._colon.a = self.color[3] if visible else 0
+
+    def update_clock(self, now):
+        """
+        Тик часов на границе полусекунды.
+
+        Args:
+            now: Время границы в секундах эпохи
+        """
+        # Двоеточие горит в первой половине каждой секунды
+        self.set_colon_visible(now % 1 < 0.5)
+        self.update_time(datetime.fromtimestamp(now))
+
+    def toggle_colon_visibility(self):
+        """Переключение видимости двоеточия (и цифр, если сменилась минута)"""
+        self.set_colon_visible(not self.is_colon_visible)
+        self.update_time()
+
+    def on_color(self, instance, color):
+        """Перекрашивает сегменты, сохраняя их состояние"""
+        for position, colors in enumerate(self._segments):
+            lit = DIGIT_SEGMENTS.get(self._digits[position], '')
+            for name, instruction in colors.items():
+                instruction.rgba = color if name in lit else self._off_color()
+        self._colon.rgba = color if self.is_colon_visible else self._off_color()
+
+    def _update_transform(self, *args):
+        """Изменение размера: только Translate и Scale"""
+        scale = min(self.width * self.fill / TOTAL_W, self.height * self.max_height / TOTAL_H)
+        x = self.x + (self.width - TOTAL_W * scale) / 2
+        if self.valign == 'top':
+            y = self.top - TOTAL_H * scale
+        else:
+            y = self.y + (self.height - TOTAL_H * scale) / 2
+        self._translate.xy = (x, y)
+        self._scale.xyz = (scale, scale, 1)
+
+
+class LandscapeSegmentClock(SegmentClock):
+    """
+    Семисегментные часы для ландшафтной ориентации.
+    Замена LandscapeClockLabel с поддержкой настроек цвета.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.db = get_settings_database()
+        saved_color = self.db.get_setting('color')
+        if saved_color:
+            self.color = get_color_tuple(saved_color)
+
+    def apply_settings(self, color):
+        """Применение новых настроек цвета"""
+        self.color = color
+
+
+class PortraitSegmentClock(SegmentClock):
+    """Семисегментные часы для портретной ориентации (замена PortraitClockLabel)"""
+    def __init__(self, **kwargs):
+        kwargs.setdefault('valign', 'top')
+        kwargs.setdefault('fill', 0.9)
+        kwargs.setdefault('max_height', 0.3)
+        super().__init__(**kwargs)
+        self.pos_hint = {'center_x': 0.5, 'top': 1}
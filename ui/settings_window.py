@@ -20,6 +20,7 @@ from kivy.metrics import dp, sp
 from kivy.core.window import Window
 from kivy.clock import Clock
 from data.database import SettingsDatabase
+from ui.colors import COLORS, get_color_tuple
 import logging
 logger = logging.getLogger(__name__)
 
@@ -113,17 +114,7 @@ class SettingsWindow(ModalView):
     """
     
     # Список доступных цветов
-    colors = {
-        'lime': (0, 1, 0, 1),
-        'aqua': (0, 1, 1, 1),
-        'blue': (0, 0, 1, 1),
-        'red': (1, 0, 0, 1),
-        'yellow': (1, 1, 0, 1),
-        'magenta': (1, 0, 1, 1),
-        'pink': (1, 0.75, 0.8, 1),
-        'grey': (0.7, 0.7, 0.7, 1),
-        'white': (1, 1, 1, 1)
-    }
+    colors = COLORS
 
     def __init__(self, db, main_window, apply_callback, **kwargs):
         """
@@ -356,15 +347,4 @@ class SettingsWindow(ModalView):
     @staticmethod
     def get_color_tuple(color_name):
         """Преобразование названия цвета в RGB"""
-        colors = {
-            'lime': (0, 1, 0, 1),
-            'aqua': (0, 1, 1, 1),
-            'blue': (0, 0, 1, 1),
-            'red': (1, 0, 0, 1),
-            'yellow': (1, 1, 0, 1),
-            'magenta': (1, 0, 1, 1),
-            'pink': (1, 0.75, 0.8, 1),
-            'grey': (0.7, 0.7, 0.7, 1),
-            'white': (1, 1, 1, 1)
-        }
-        return colors.get(color_name, (0, 1, 0, 1))  # По умолчанию возвращаем Lime
+        return get_color_tuple(color_name)